@@ -0,0 +1,116 @@
+"""
+Measure the memory per match when many matches are hosted in one process
+
+The "before" numbers are of the layout before the game objects used `__slots__`:
+the attributes are kept in `__dict__`, the ball size is a list, and each game
+object has its own play area rect.
+
+Usage:
+    python -m benchmark.bench_memory [--num_matches 10000]
+"""
+import argparse
+import random
+import tracemalloc
+
+
+from src.game_object import Ball, Blocker, Platform
+from src.rect import Rect
+from src.simulation import PingPongSimulation
+from src.vector_game import VectorPingPong
+
+
+def measure_bytes_per_match(create_matches, num_matches):
+    """
+    Get the number of bytes allocated per match by `create_matches(num_matches)`
+    """
+    tracemalloc.start()
+    try:
+        start_size = tracemalloc.get_traced_memory()[0]
+        matches = create_matches(num_matches)
+        end_size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del matches
+    return (end_size - start_size) / num_matches
+
+
+def _without_slots(cls):
+    """
+    Get the copy of `cls` without `__slots__`, whose instances keep the attributes in `__dict__`
+    """
+    namespace = {name: value for name, value in vars(cls).items()
+                 if name != "__slots__" and name not in cls.__slots__}
+    return type(cls.__name__, cls.__bases__, namespace)
+
+
+DictBall, DictPlatform, DictBlocker = (_without_slots(cls) for cls in (Ball, Platform, Blocker))
+
+
+def _create_dict_game_objects(enable_slice_ball, init_vel, blocker_y, rng):
+    # The game objects in the layout before `__slots__`
+    ball = DictBall(Rect(0, 0, 200, 500), enable_slice_ball, init_vel=init_vel)
+    ball._size = [5, 5]
+    return (ball, DictPlatform((80, 420), Rect(0, 0, 200, 500), "1P"),
+            DictPlatform((80, 70), Rect(0, 0, 200, 500), "2P"),
+            DictBlocker(blocker_y, Rect(0, 0, 200, 500), rng))
+
+
+class DictPingPongSimulation(PingPongSimulation):
+    """
+    `PingPongSimulation` with the game objects in the layout before `__slots__`
+    """
+
+    def _create_init_scene(self):
+        self._ball, self._platform_1P, self._platform_2P, self._blocker = _create_dict_game_objects(
+            self._difficulty != "EASY", self._init_vel, 240 if self._difficulty == "HARD" else 1000,
+            self._random)
+        self._ball.stick_on_platform(self._platform_1P.rect, self._platform_2P.rect)
+
+
+def create_game_objects(num_matches):
+    """
+    Create the game objects of the matches like `PingPongSimulation` does,
+    sharing one random number generator
+    """
+    rng = random.Random(0)
+    matches = []
+    for _ in range(num_matches):
+        play_area_rect = Rect(0, 0, 200, 500)
+        matches.append((Ball(play_area_rect, True), Platform((80, 420), play_area_rect, "1P"),
+                        Platform((80, 70), play_area_rect, "2P"), Blocker(240, play_area_rect, rng)))
+    return matches
+
+
+def create_dict_game_objects(num_matches):
+    """
+    Create the game objects of the matches in the layout before `__slots__`
+    """
+    rng = random.Random(0)
+    return [_create_dict_game_objects(True, 7, 240, rng) for _ in range(num_matches)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the memory per match of the pingpong engines.")
+    parser.add_argument("--num_matches", type=int, default=10000, help="The number of matches to create.")
+    parser.add_argument("--difficulty", type=str, default="HARD", choices=["EASY", "NORMAL", "HARD"])
+    args = parser.parse_args()
+
+    # {name: (bytes per match before, bytes per match after)}
+    results = {
+        "PingPongSimulation": tuple(measure_bytes_per_match(
+            lambda n: [simulation_class(args.difficulty, 3, seed=i) for i in range(n)], args.num_matches)
+            for simulation_class in (DictPingPongSimulation, PingPongSimulation)),
+        # Without the random number generator of each match, which is about 2.5 KB
+        "game objects": (measure_bytes_per_match(create_dict_game_objects, args.num_matches),
+                         measure_bytes_per_match(create_game_objects, args.num_matches)),
+        "VectorPingPong": (None, measure_bytes_per_match(
+            lambda n: VectorPingPong(n, args.difficulty, 3, seed=0), args.num_matches)),
+    }
+    print("{:<20}{:>22}{:>22}{:>16}".format("", "before (bytes/match)", "after (bytes/match)", "matches/GB"))
+    for name, (before, after) in results.items():
+        print("{:<20}{:>22}{:>22.0f}{:>16.0f}".format(
+            name, "-" if before is None else "{:.0f}".format(before), after, 2 ** 30 / after))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,243 @@
+"""
+Measure the accuracy and the latency of the landing predictors against the engine
+
+The headless matches are played by the ML players. At every frame in which the
+ball flies toward a player, each predictor predicts the landing center of that
+player, and the prediction is compared with the actual landing center when the
+ball reaches the platform line. The predictions made before the ball is bounced
+back by the blocker are not counted. All the predictors registered in
+`ml.predict_logic` are measured, so the reported fastest predictor can be
+selected for the ML players with the PINGPONG_PREDICTOR environment variable.
+
+Usage:
+    python -m benchmark.bench_predictor_accuracy [--frames 20000] [--error_budget 3]
+"""
+import argparse
+import contextlib
+import io
+import json
+import random
+import time
+
+import numpy as np
+
+from mlgame.utils.enum import get_ai_name
+from src.simulation import PingPongSimulation
+from tournament import load_ml_play_class
+from ml.predict_logic import (
+    BALL_SIZE, PLATFORM_HEIGHT, PLATFORM_WIDTH, SCREEN_WIDTH, available_predictors, create_predictor
+)
+
+from .bench_suite import ML_PLAY_PATHS
+
+SIDES = (get_ai_name(0), get_ai_name(1))
+# The y of the ball when it reaches the platform line of each side
+LINE_Y = {SIDES[0]: 420 - BALL_SIZE, SIDES[1]: 70 + PLATFORM_HEIGHT}
+# The width of the groups of the ball y speed in the report
+SPEED_GROUP_SIZE = 5
+
+
+def predictor_names(landing_table_path=None):
+    """
+    Get the names of the registered predictors to be measured
+
+    The table predictor is measured only if the landing table is given.
+    """
+    return [name for name in available_predictors() if name != "table" or landing_table_path]
+
+
+def _predictor_options(name, landing_table_path):
+    return {"table_path": landing_table_path} if name == "table" else {}
+
+
+def _landing_center(ball_x):
+    return max(PLATFORM_WIDTH / 2, min(ball_x + BALL_SIZE / 2, SCREEN_WIDTH - PLATFORM_WIDTH / 2))
+
+
+def _is_coming(side, ball_speed_y):
+    return ball_speed_y > 0 if side == SIDES[0] else ball_speed_y < 0
+
+
+def run_rollouts(names, difficulty, num_frames, init_vel=7, seed=0, landing_table_path=None):
+    """
+    Play the matches for `num_frames` frames and collect the predictions
+
+    @param names The names of the predictors registered in `ml.predict_logic`
+
+    @return A tuple (errors, latencies). `errors` maps the predictor name to a list of
+            (ball y speed, absolute error) of each prediction, and `latencies` maps
+            the predictor name to the list of the nanoseconds of each call.
+    """
+    random.seed(seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        ais = {name: load_ml_play_class(path)(ai_name=name) for name, path in zip(SIDES, ML_PLAY_PATHS)}
+        game = PingPongSimulation(difficulty, game_over_score=1000000, init_vel=init_vel, seed=seed)
+
+        predictors = {name: {side: create_predictor(side, name, **_predictor_options(name, landing_table_path))
+                             for side in SIDES} for name in names}
+        errors = {name: [] for name in names}
+        latencies = {name: [] for name in names}
+        # The predictions of each side waiting for the ball to reach the platform line
+        pending = {side: [] for side in SIDES}
+        prev_blocker_x = None
+        blocker_speed_x = 0
+
+        for _ in range(num_frames):
+            scene_info = game.get_data_from_game_to_player()[SIDES[0]]
+
+            # Infer the blocker speed like the ML players
+            if scene_info["ball_served"]:
+                blocker_x = scene_info["blocker"][0]
+                if prev_blocker_x is not None:
+                    if blocker_x - prev_blocker_x > 2:
+                        blocker_speed_x = 5
+                    elif blocker_x - prev_blocker_x < -2:
+                        blocker_speed_x = -5
+                prev_blocker_x = blocker_x
+
+                ball_speed_y = scene_info["ball_speed"][1]
+                for name, side_predictors in predictors.items():
+                    for side, predictor in side_predictors.items():
+                        start_time = time.perf_counter_ns()
+                        predicted = predictor.predict(scene_info, blocker_speed_x)
+                        latencies[name].append(time.perf_counter_ns() - start_time)
+                        if _is_coming(side, ball_speed_y) and predicted is not None:
+                            pending[side].append((name, abs(ball_speed_y), predicted))
+            else:
+                prev_blocker_x = None
+                blocker_speed_x = 0
+
+            result = game.update({name: ai.update(scene_info, []) for name, ai in ais.items()})
+
+            scene_info = game.get_data_from_game_to_player()[SIDES[0]]
+            (ball_x, ball_y), ball_speed_y = scene_info["ball"], scene_info["ball_speed"][1]
+            for side in SIDES:
+                if not pending[side]:
+                    continue
+                if (ball_y >= LINE_Y[side]) if side == SIDES[0] else (ball_y <= LINE_Y[side]):
+                    actual = _landing_center(ball_x)
+                    for name, speed, predicted in pending[side]:
+                        errors[name].append((speed, abs(predicted - actual)))
+                    pending[side] = []
+                elif not _is_coming(side, ball_speed_y):
+                    # Bounced back by the blocker
+                    pending[side] = []
+
+            if result == "RESET":
+                for ai in ais.values():
+                    ai.reset()
+                for side_predictors in predictors.values():
+                    for predictor in side_predictors.values():
+                        predictor.reset()
+                pending = {side: [] for side in SIDES}
+                game.reset()
+
+    return errors, latencies
+
+
+def summarize(errors, latencies, error_budget):
+    """
+    Get the error distribution and the calls per second of each predictor
+
+    @return A dict mapping the predictor name to its summary
+    """
+    summaries = {}
+    for name, samples in errors.items():
+        speeds = np.array([speed for speed, _ in samples])
+        abs_errors = np.array([error for _, error in samples])
+        summary = {
+            "num_predictions": len(samples),
+            "calls_per_sec": len(latencies[name]) / (sum(latencies[name]) / 1e9),
+            "p99_latency_us": float(np.percentile(latencies[name], 99)) / 1e3,
+            "by_speed": {},
+        }
+        if len(samples):
+            summary.update(_error_stats(abs_errors, error_budget))
+            groups = (speeds - 1) // SPEED_GROUP_SIZE
+            for group in np.unique(groups):
+                low = int(group) * SPEED_GROUP_SIZE + 1
+                summary["by_speed"]["{}-{}".format(low, low + SPEED_GROUP_SIZE - 1)] = (
+                    _error_stats(abs_errors[groups == group], error_budget))
+        summaries[name] = summary
+    return summaries
+
+
+def _error_stats(abs_errors, error_budget):
+    return {
+        "count": len(abs_errors),
+        "mean_error": float(abs_errors.mean()),
+        "p50_error": float(np.percentile(abs_errors, 50)),
+        "p90_error": float(np.percentile(abs_errors, 90)),
+        "p99_error": float(np.percentile(abs_errors, 99)),
+        "max_error": float(abs_errors.max()),
+        "within_budget": float((abs_errors <= error_budget).mean()),
+    }
+
+
+def fastest_within_budget(report, min_within_budget):
+    """
+    Get the name of the fastest predictor whose predictions are within the
+    error budget at least `min_within_budget` of the time in every difficulty
+
+    @return The name of the predictor, or None if no predictor meets the budget
+    """
+    candidates = []
+    for name in next(iter(report.values())):
+        summaries = [difficulty_report[name] for difficulty_report in report.values()]
+        if all(summary.get("within_budget", 0) >= min_within_budget for summary in summaries):
+            calls_per_sec = min(summary["calls_per_sec"] for summary in summaries)
+            candidates.append((calls_per_sec, name))
+    return max(candidates)[1] if candidates else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the accuracy and the latency of the landing predictors.")
+    parser.add_argument("--difficulties", type=str, nargs="+", default=["EASY", "NORMAL", "HARD"],
+                        choices=["EASY", "NORMAL", "HARD"])
+    parser.add_argument("--frames", type=int, default=20000, help="The number of frames to play for each difficulty.")
+    parser.add_argument("--init_vel", type=int, default=7, help="The initial speed of the ball.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--error_budget", type=float, default=3,
+                        help="The error in pixels within which a prediction is accurate enough.")
+    parser.add_argument("--min_within_budget", type=float, default=0.95,
+                        help="The ratio of the predictions which must be within the error budget.")
+    parser.add_argument("--landing_table", type=str, default=None,
+                        help="The landing table built by `ml.landing_table`, which is also measured if given.")
+    parser.add_argument("--output", type=str, default=None, help="Write the report as JSON to this path.")
+    args = parser.parse_args()
+
+    names = predictor_names(args.landing_table)
+    report = {}
+    for difficulty in args.difficulties:
+        errors, latencies = run_rollouts(names, difficulty, args.frames, args.init_vel, args.seed,
+                                         args.landing_table)
+        report[difficulty] = summarize(errors, latencies, args.error_budget)
+
+    for difficulty, summaries in report.items():
+        print(difficulty)
+        print("  {:<12}{:>8}{:>10}{:>10}{:>10}{:>10}{:>12}{:>14}{:>12}".format(
+            "predictor", "count", "mean", "p50", "p90", "max", "in budget", "calls/sec", "p99 us"))
+        for name, summary in summaries.items():
+            if not summary["num_predictions"]:
+                continue
+            print("  {:<12}{:>8}{:>10.2f}{:>10.2f}{:>10.2f}{:>10.2f}{:>12.3f}{:>14.0f}{:>12.1f}".format(
+                name, summary["count"], summary["mean_error"], summary["p50_error"], summary["p90_error"],
+                summary["max_error"], summary["within_budget"], summary["calls_per_sec"],
+                summary["p99_latency_us"]))
+            for speed, stats in summary["by_speed"].items():
+                print("    {:<10}{:>8}{:>10.2f}{:>10.2f}{:>10.2f}{:>10.2f}{:>12.3f}".format(
+                    "vy " + speed, stats["count"], stats["mean_error"], stats["p50_error"],
+                    stats["p90_error"], stats["max_error"], stats["within_budget"]))
+
+    fastest = fastest_within_budget(report, args.min_within_budget)
+    print("Fastest predictor with {:.0%} of the errors within {} px: {}".format(
+        args.min_within_budget, args.error_budget, fastest or "none"))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"error_budget": args.error_budget, "min_within_budget": args.min_within_budget,
+                       "fastest_within_budget": fastest, "report": report}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Measure the cost of cloning the game state for lookahead search
+
+Usage:
+    python -m benchmark.bench_snapshot [--number 100000]
+"""
+import argparse
+import contextlib
+import copy
+import io
+import random
+import timeit
+
+from src.simulation import PingPongSimulation
+
+COMMANDS = ("MOVE_LEFT", "MOVE_RIGHT", "NONE", "SERVE_TO_LEFT", "SERVE_TO_RIGHT")
+
+
+def create_game_in_progress(difficulty="HARD", num_frames=300, seed=0):
+    """
+    Create a game and play it with random commands, so that the ball is in flight
+    """
+    game = PingPongSimulation(difficulty, 3, seed=seed)
+    command_random = random.Random(seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(num_frames):
+            result = game.update({"1P": command_random.choice(COMMANDS),
+                                  "2P": command_random.choice(COMMANDS)})
+            if result == "RESET":
+                game.reset()
+    return game
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the cost of snapshot/restore of PingPongSimulation.")
+    parser.add_argument("--number", type=int, default=100000, help="The number of calls to time.")
+    args = parser.parse_args()
+
+    game = create_game_in_progress()
+    state = game.snapshot()
+
+    results = {
+        "snapshot": timeit.timeit(game.snapshot, number=args.number),
+        "restore": timeit.timeit(lambda: game.restore(state), number=args.number),
+        "deepcopy": timeit.timeit(lambda: copy.deepcopy(game), number=args.number // 100) * 100,
+    }
+    for name, total_time in results.items():
+        print("{:<10}{:>10.2f} us/call".format(name, total_time / args.number * 1e6))
+
+
+if __name__ == '__main__':
+    main()
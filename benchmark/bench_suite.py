@@ -0,0 +1,340 @@
+"""
+Measure the throughput of the engines, the landing predictors, the ML players and the trainer
+
+The results are written as a flat JSON dict of metrics. The metrics ending with
+"_per_sec" are better if higher, and the ones ending with "_us" or "_sec" are
+better if lower. Compare the results with a stored baseline to flag the regressions.
+
+Usage:
+    python -m benchmark.bench_suite --output results.json
+    python -m benchmark.bench_suite --baseline baseline.json [--tolerance 0.1]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import pickle
+import platform
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from mlgame.utils.enum import get_ai_name
+from src.game import PingPong
+from src.simulation import PingPongSimulation
+from src.vector_env import VectorPingPongEnv
+from tournament import load_ml_play_class
+
+from .bench_snapshot import COMMANDS
+
+ML_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ml")
+ML_PLAY_PATHS = (
+    os.path.join(ML_FOLDER, "ml_play_P1_F74101115.py"),
+    os.path.join(ML_FOLDER, "ml_play_P2_F74101115.py"),
+)
+BENCHMARKS = ("engine", "env", "predictor", "ml_play", "trainer")
+
+
+def bench_engine(num_frames, init_vels=(3, 7, 11)):
+    """
+    Measure the frames per second of the headless `PingPong` with random commands
+    """
+    results = {}
+    for difficulty in ("EASY", "NORMAL", "HARD"):
+        for init_vel in init_vels:
+            game = PingPong(difficulty, game_over_score=1000000, init_vel=init_vel, seed=0)
+            command_random = random.Random(0)
+            commands = [{"1P": command_random.choice(COMMANDS), "2P": command_random.choice(COMMANDS)}
+                        for _ in range(1000)]
+            with contextlib.redirect_stdout(io.StringIO()):
+                start_time = time.perf_counter()
+                for i in range(num_frames):
+                    if game.update(commands[i % 1000]) == "RESET":
+                        game.reset()
+                elapsed_time = time.perf_counter() - start_time
+            results["engine/{}/init_vel={}/frames_per_sec".format(difficulty, init_vel)] = (
+                num_frames / elapsed_time)
+    return results
+
+
+def bench_env(num_steps, num_envs_list=(256, 1024, 4096)):
+    """
+    Measure the frames per second of `VectorPingPongEnv` with random actions
+    """
+    results = {}
+    for num_envs in num_envs_list:
+        env = VectorPingPongEnv(num_envs, "HARD", seed=0)
+        env.reset()
+        actions = np.random.default_rng(0).integers(0, 5, (64, num_envs, 2))
+        start_time = time.perf_counter()
+        for i in range(num_steps):
+            env.step(actions[i % 64])
+        elapsed_time = time.perf_counter() - start_time
+        results["env/HARD/num_envs={}/frames_per_sec".format(num_envs)] = num_envs * num_steps / elapsed_time
+    return results
+
+
+def record_states(num_frames, difficulty="HARD", seed=0):
+    """
+    Record the scene info of each frame of the matches played by the ML players
+
+    @return A list of (ai name, scene_info) in the order of the frames
+    """
+    random.seed(seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        ais = {get_ai_name(i): load_ml_play_class(path)(ai_name=get_ai_name(i))
+               for i, path in enumerate(ML_PLAY_PATHS)}
+        game = PingPongSimulation(difficulty, game_over_score=1000000, seed=seed)
+        states = []
+        while len(states) < num_frames:
+            scene_info = game.get_data_from_game_to_player()
+            commands = {}
+            for name, ai in ais.items():
+                states.append((name, dict(scene_info[name])))
+                commands[name] = ai.update(scene_info[name], [])
+            if game.update(commands) == "RESET":
+                for ai in ais.values():
+                    ai.reset()
+                game.reset()
+    return states[:num_frames]
+
+
+def bench_predictor(states, repeat):
+    """
+    Measure the calls per second and the p99 latency of each predictor
+    registered in `ml.predict_logic` over the recorded states
+
+    The metrics of the reference predictor are prefixed with "predictor/", and
+    the others with "predictor_<name>/". The table predictor is measured only
+    if the landing table has been built.
+    """
+    from ml.predict_logic import (
+        DEFAULT_LANDING_TABLE_PATH, available_predictors, create_predictor, get_predictor_stats,
+        reset_predictor_stats
+    )
+
+    states = [(side, scene_info) for side, scene_info in states if scene_info["ball_served"]]
+    results = {}
+    for name in available_predictors():
+        if name == "table" and not os.path.exists(DEFAULT_LANDING_TABLE_PATH):
+            continue
+        reset_predictor_stats()
+        # The stateful predictors track the ball over the frames, so the states are fed in order
+        predictors = {get_ai_name(i): create_predictor(get_ai_name(i), name) for i in range(2)}
+        latencies = []
+        for _ in range(repeat):
+            for predictor in predictors.values():
+                predictor.reset()
+            for side, scene_info in states:
+                start_time = time.perf_counter_ns()
+                predictors[side].predict(scene_info)
+                latencies.append(time.perf_counter_ns() - start_time)
+        prefix = "predictor/" if name == "reference" else "predictor_{}/".format(name)
+        results[prefix + "calls_per_sec"] = get_predictor_stats()[name].calls_per_sec
+        results[prefix + "p99_us"] = float(np.percentile(latencies, 99)) / 1e3
+    return results
+
+
+def bench_ml_play(states):
+    """
+    Measure the latency of `MLPlay.update` of each side over the recorded states
+    """
+    results = {}
+    for i, path in enumerate(ML_PLAY_PATHS):
+        name = get_ai_name(i)
+        with contextlib.redirect_stdout(io.StringIO()):
+            ai = load_ml_play_class(path)(ai_name=name)
+            latencies = []
+            for side, scene_info in states:
+                if side != name:
+                    continue
+                start_time = time.perf_counter_ns()
+                ai.update(scene_info, [])
+                latencies.append(time.perf_counter_ns() - start_time)
+        latencies.sort()
+        prefix = "ml_play/{}/".format(name)
+        results[prefix + "mean_us"] = sum(latencies) / len(latencies) / 1000
+        results[prefix + "p50_us"] = latencies[len(latencies) // 2] / 1000
+        results[prefix + "p99_us"] = latencies[len(latencies) * 99 // 100] / 1000
+        results[prefix + "model_loaded"] = ai.model is not None
+    return results
+
+
+def _write_training_data(folder, num_items, num_files=10):
+    """
+    Write random training data in the pickle format used before `TrainingRecorder`
+    """
+    data_random = random.Random(0)
+    items_per_file = num_items // num_files
+    for i in range(num_files):
+        data = [{
+            "side": "1P",
+            "command": data_random.choice(("MOVE_LEFT", "MOVE_RIGHT", "NONE")),
+            "features": {
+                "ball_x": data_random.randint(0, 195), "ball_y": data_random.randint(0, 495),
+                "ball_speed_x": data_random.choice((-7, 7)), "ball_speed_y": data_random.choice((-7, 7)),
+                "platform_1P_x": data_random.randint(0, 160), "platform_2P_x": data_random.randint(0, 160),
+                "blocker_x": data_random.randint(0, 170),
+                "predicted_center_calc": data_random.uniform(0, 200),
+                "blocker_speed_x": data_random.choice((-5, 5)),
+            },
+        } for _ in range(items_per_file)]
+        with open(os.path.join(folder, "data_{}.pickle".format(i)), "wb") as f:
+            pickle.dump(data, f)
+
+
+def _record_training_data(folder, num_items, num_rounds=10):
+    """
+    Record random training data with the `TrainingRecorder` of `pingpong_play_collect.py`
+    """
+    from ml.training_recorder import TrainingRecorder
+
+    data_random = random.Random(0)
+    recorder = TrainingRecorder(folder)
+    for _ in range(num_rounds):
+        for _ in range(num_items // num_rounds):
+            recorder.append({
+                "ball_x": data_random.randint(0, 195), "ball_y": data_random.randint(0, 495),
+                "ball_speed_x": data_random.choice((-7, 7)), "ball_speed_y": data_random.choice((-7, 7)),
+                "platform_1P_x": data_random.randint(0, 160), "platform_2P_x": data_random.randint(0, 160),
+                "blocker_x": data_random.randint(0, 170),
+                "predicted_center_calc": data_random.uniform(0, 200),
+                "blocker_speed_x": data_random.choice((-5, 5)),
+            }, data_random.choice(("MOVE_LEFT", "MOVE_RIGHT", "NONE")), "1P")
+        recorder.commit()
+
+
+def bench_trainer(sizes):
+    """
+    Measure the items per second of loading, preprocessing and fitting in
+    `pingpong_model_trainer.py` for each dataset size
+
+    "load" and "preprocess" are of the pickle files, and "load_recorded" is of
+    loading and preprocessing the data recorded by `TrainingRecorder`.
+    """
+    from ml import pingpong_model_trainer as trainer
+
+    results = {}
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as folder, contextlib.redirect_stdout(io.StringIO()):
+            _write_training_data(folder, size)
+            timings = {}
+            start_time = time.perf_counter()
+            all_game_data = trainer.load_data_from_pickle(folder)
+            timings["load"] = time.perf_counter() - start_time
+
+            start_time = time.perf_counter()
+            features, labels = trainer.preprocess_data(all_game_data, "1P")
+            timings["preprocess"] = time.perf_counter() - start_time
+
+            start_time = time.perf_counter()
+            trainer.train_model(features, labels)
+            timings["fit"] = time.perf_counter() - start_time
+
+        with tempfile.TemporaryDirectory() as folder, contextlib.redirect_stdout(io.StringIO()):
+            _record_training_data(folder, size)
+            start_time = time.perf_counter()
+            trainer.load_recorded_features(folder, "1P")
+            timings["load_recorded"] = time.perf_counter() - start_time
+        for stage, elapsed_time in timings.items():
+            results["trainer/{}/size={}/items_per_sec".format(stage, size)] = size / elapsed_time
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Get the metrics which are worse than the baseline by more than `tolerance`
+
+    @return A list of (metric, baseline value, value, relative change)
+    """
+    regressions = []
+    for metric, base_value in baseline["metrics"].items():
+        value = results["metrics"].get(metric)
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not base_value:
+            continue
+        change = (value - base_value) / base_value
+        if metric.endswith("_per_sec"):
+            is_regression = change < -tolerance
+        elif metric.endswith("_us") or metric.endswith("_sec"):
+            is_regression = change > tolerance
+        else:
+            continue
+        if is_regression:
+            regressions.append((metric, base_value, value, change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmarks of the pingpong game and the ML players.")
+    parser.add_argument("--only", type=str, nargs="+", default=BENCHMARKS, choices=BENCHMARKS,
+                        help="The benchmarks to run.")
+    parser.add_argument("--engine_frames", type=int, default=20000,
+                        help="The number of frames to run for each engine setting.")
+    parser.add_argument("--env_steps", type=int, default=300,
+                        help="The number of steps to run for each number of the vectorized matches.")
+    parser.add_argument("--num_states", type=int, default=20000,
+                        help="The number of recorded states for the predictor and the ML players.")
+    parser.add_argument("--predictor_repeat", type=int, default=5,
+                        help="The number of passes over the recorded states for the predictor.")
+    parser.add_argument("--trainer_sizes", type=int, nargs="+", default=[1000, 10000, 50000],
+                        help="The dataset sizes for the trainer.")
+    parser.add_argument("--output", type=str, default=None, help="Write the results to this JSON file.")
+    parser.add_argument("--baseline", type=str, default=None,
+                        help="Compare the results with this JSON file and exit with 1 on regressions.")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="The allowed relative slowdown against the baseline.")
+    args = parser.parse_args()
+
+    metrics = {}
+    skipped = {}
+    if "engine" in args.only:
+        metrics.update(bench_engine(args.engine_frames))
+    if "env" in args.only:
+        metrics.update(bench_env(args.env_steps))
+    if "predictor" in args.only or "ml_play" in args.only:
+        states = record_states(args.num_states)
+        if "predictor" in args.only:
+            metrics.update(bench_predictor(states, args.predictor_repeat))
+        if "ml_play" in args.only:
+            metrics.update(bench_ml_play(states))
+    if "trainer" in args.only:
+        try:
+            metrics.update(bench_trainer(args.trainer_sizes))
+        except Exception as e:
+            # scikit-learn is not in the requirements of the game
+            skipped["trainer"] = repr(e)
+
+    results = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "metrics": metrics,
+        "skipped": skipped,
+    }
+    for metric, value in metrics.items():
+        print("{:<48}{:>14.2f}".format(metric, value) if not isinstance(value, bool)
+              else "{:<48}{:>14}".format(metric, str(value)))
+    for name, reason in skipped.items():
+        print("{:<48}{:>14}  {}".format(name, "skipped", reason))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for metric, base_value, value, change in regressions:
+            print("REGRESSION {}: {:.2f} -> {:.2f} ({:+.1%})".format(metric, base_value, value, change))
+        if regressions:
+            sys.exit(1)
+        print("No regression against {}".format(args.baseline))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""
+Compare the latency per frame of sending the scene info to the AI processes
+through the pipes (pickling the dict for each player) and the shared memory
+
+Usage:
+    python -m benchmark.bench_transport [--num_matches 5] [--null_ai]
+"""
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+from mlgame.utils.enum import get_ai_name
+from src.shm_transport import SharedMemoryTransport, host_match, serve_ai
+from src.simulation import PingPongSimulation
+from tournament import load_ml_play_class
+
+from .bench_suite import ML_PLAY_PATHS
+
+
+class NullMLPlay:
+    """
+    The AI which does nothing, for measuring the transport only
+    """
+
+    def __init__(self, ai_name, *args, **kwargs):
+        pass
+
+    def update(self, scene_info, *args, **kwargs):
+        return "NONE"
+
+    def reset(self):
+        pass
+
+
+def _create_ai(player, null_ai, seed):
+    sys.stdout = open(os.devnull, "w")
+    random.seed(seed + player)
+    ml_play_class = NullMLPlay if null_ai else load_ml_play_class(ML_PLAY_PATHS[player])
+    return ml_play_class(ai_name=get_ai_name(player))
+
+
+def _pipe_ai_process(conn, player, null_ai, seed):
+    ai = _create_ai(player, null_ai, seed)
+    while True:
+        scene_info = conn.recv()
+        if scene_info is None:
+            break
+        conn.send(ai.update(scene_info, []))
+        if scene_info["status"] != "GAME_ALIVE":
+            ai.reset()
+
+
+def _shm_ai_process(name, num_slots, player, null_ai, seed):
+    ai = _create_ai(player, null_ai, seed)
+    transport = SharedMemoryTransport(name, num_slots, create=False)
+    serve_ai(transport, player, ai)
+    transport.close()
+
+
+def _host_match_pipe(game, conns):
+    num_frames = 0
+    while True:
+        scene_info = game.get_data_from_game_to_player()
+        for name, conn in conns.items():
+            conn.send(scene_info[name])
+        result = game.update({name: conn.recv() for name, conn in conns.items()})
+        num_frames += 1
+
+        if result in ("RESET", "QUIT"):
+            scene_info = game.get_data_from_game_to_player()
+            for name, conn in conns.items():
+                conn.send(scene_info[name])
+            for conn in conns.values():
+                conn.recv()
+            if result == "QUIT":
+                break
+            game.reset()
+    return num_frames
+
+
+def bench_pipe(game_params, num_matches, null_ai, seed):
+    num_frames = 0
+    elapsed_time = 0
+    for i in range(num_matches):
+        # Start the AIs for each match like `bench_shm`
+        conns = {}
+        processes = []
+        for player in range(2):
+            conn, ai_conn = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_pipe_ai_process, args=(ai_conn, player, null_ai, seed))
+            process.start()
+            conns[get_ai_name(player)] = conn
+            processes.append(process)
+
+        start_time = time.perf_counter()
+        num_frames += _host_match_pipe(PingPongSimulation(**game_params, seed=seed + i), conns)
+        elapsed_time += time.perf_counter() - start_time
+
+        for conn in conns.values():
+            conn.send(None)
+        for process in processes:
+            process.join()
+    return num_frames, elapsed_time
+
+
+def bench_shm(game_params, num_matches, null_ai, seed, num_slots=4):
+    num_frames = 0
+    elapsed_time = 0
+    for i in range(num_matches):
+        # The AIs are stopped at the end of each match by `host_match`
+        transport = SharedMemoryTransport(num_slots=num_slots)
+        processes = [multiprocessing.Process(target=_shm_ai_process,
+                                             args=(transport.name, num_slots, player, null_ai, seed))
+                     for player in range(2)]
+        for process in processes:
+            process.start()
+
+        start_time = time.perf_counter()
+        num_frames += host_match(PingPongSimulation(**game_params, seed=seed + i), transport)
+        elapsed_time += time.perf_counter() - start_time
+
+        for process in processes:
+            process.join()
+        transport.close()
+    return num_frames, elapsed_time
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the latency of the pipe and the shared-memory transport to the AI processes.")
+    parser.add_argument("--num_matches", type=int, default=5)
+    parser.add_argument("--difficulty", type=str, default="HARD", choices=["EASY", "NORMAL", "HARD"])
+    parser.add_argument("--null_ai", action="store_true",
+                        help="Use the AIs doing nothing to measure the transport only.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    game_params = {"difficulty": args.difficulty, "game_over_score": 3}
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = {
+            "pipe": bench_pipe(game_params, args.num_matches, args.null_ai, args.seed),
+            "shared memory": bench_shm(game_params, args.num_matches, args.null_ai, args.seed),
+        }
+    for name, (num_frames, elapsed_time) in results.items():
+        print("{:<15}{:>8} frames{:>10.1f} us/frame".format(name, num_frames, elapsed_time / num_frames * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,29 +1,97 @@
-from time import process_time
-import pygame
-
+import argparse
 import sys
+import time
 
 sys.path.append(r"../..")
 
-from mlgame.view.view import PygameView
-from mlgame.game.generic import quit_or_esc
 from src.game import PingPong
 
 FPS = 30
-if __name__ == '__main__':
+
+
+def run_with_view(game, fps, render_every, max_speed):
+    """
+    Play the game with the keyboard and draw every `render_every`-th frame
+
+    @return The number of the updated frames
+    """
+    import pygame
+    from mlgame.view.view import PygameView
+    from mlgame.game.generic import quit_or_esc
+
     pygame.init()
-    game = PingPong(difficulty="HARD", game_over_score=3)
-    scene_init_info_dict = game.get_scene_init_data()
-    game_view = PygameView(scene_init_info_dict)
+    game_view = PygameView(game.get_scene_init_data())
+    # One clock for the whole loop, so that `tick` can keep a fixed timestep
+    clock = pygame.time.Clock()
+    frame_count = 0
+    try:
+        while game.is_running and not quit_or_esc():
+            if not max_speed:
+                # Sleep instead of busy-waiting until the next timestep
+                clock.tick(fps)
+            result = game.update(game.get_keyboard_command())
+            frame_count += 1
+            if frame_count % render_every == 0:
+                game_view.draw(game.get_scene_progress_data())
+            if result == "RESET":
+                game.reset()
+                game_view.reset()
+    finally:
+        pygame.quit()
+    return frame_count
+
+
+def run_headless(game, fps, max_speed):
+    """
+    Run the game without the view. Both sides send no command,
+    so the ball is served automatically.
+
+    @return The number of the updated frames
+    """
+    commands = {"1P": "NONE", "2P": "NONE"}
+    timestep = 1 / fps
+    next_frame_time = time.perf_counter()
     frame_count = 0
-    while game.is_running and not quit_or_esc():
-        pygame.time.Clock().tick_busy_loop(FPS)
-        commands = game.get_keyboard_command()
-        result = game.update(commands)
-        game_progress_data = game.get_scene_progress_data()
-        game_view.draw(game_progress_data)
-        frame_count += 1
-        if result == "RESET":
-            game.reset()
-            game_view.reset()
-    pygame.quit()
+    try:
+        while game.is_running:
+            if not max_speed:
+                next_frame_time += timestep
+                delay = next_frame_time - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            result = game.update(commands)
+            frame_count += 1
+            if result == "RESET":
+                game.reset()
+    except KeyboardInterrupt:
+        pass
+    return frame_count
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Play the pingpong game.")
+    parser.add_argument("--difficulty", type=str, default="HARD", choices=["EASY", "NORMAL", "HARD"])
+    parser.add_argument("--game_over_score", type=int, default=3)
+    parser.add_argument("--init_vel", type=int, default=7)
+    parser.add_argument("--fps", type=int, default=FPS, help="The simulation frames per second.")
+    parser.add_argument("--render_every", type=int, default=1,
+                        help="Draw the scene every k-th frame.")
+    parser.add_argument("--headless", action="store_true", help="Run without the view.")
+    parser.add_argument("--max-speed", dest="max_speed", action="store_true",
+                        help="Run the simulation as fast as possible.")
+    parser.add_argument("--profile", type=str, default=None,
+                        help="Export the time of the phases of each frame to this JSON file at the end.")
+    args = parser.parse_args()
+
+    game = PingPong(difficulty=args.difficulty, game_over_score=args.game_over_score,
+                    init_vel=args.init_vel)
+    if args.profile:
+        game.enable_profiling(args.profile)
+    start_time = time.perf_counter()
+    if args.headless:
+        frame_count = run_headless(game, args.fps, args.max_speed)
+    else:
+        frame_count = run_with_view(game, args.fps, max(args.render_every, 1), args.max_speed)
+    elapsed_time = time.perf_counter() - start_time
+    print("{} frames in {:.2f} s, {:.1f} FPS".format(
+        frame_count, elapsed_time, frame_count / elapsed_time if elapsed_time > 0 else 0))
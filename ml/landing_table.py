@@ -0,0 +1,156 @@
+# ml/landing_table.py
+"""
+預先計算的落點查表 (EASY / NORMAL 沒有 Blocker 時使用)
+
+非 HARD 模式的 scene_info 中 Blocker 固定為 (0, 0)，落點只取決於球的 x, y, 速度和 side。
+可能出現的速度很少：發球、切球和加速之後 |ball_speed_x| 只會是 |ball_speed_y| 或 |ball_speed_y| + 3，
+所以可以把所有狀態的落點預先算好存成檔案，預測時用 mmap 載入後查表一次即可。
+
+建立查表:
+    python -m ml.landing_table --output ml/landing_table.npy
+"""
+import argparse
+import time
+
+import numpy as np
+
+from ml.predict_logic import (
+    PLATFORM_WIDTH, PLATFORM_HEIGHT, BALL_SIZE, SCREEN_WIDTH,
+    predict_pingpong_landing_batch, predict_pingpong_landing_fast
+)
+
+PLATFORM_1P_Y = 420
+PLATFORM_2P_Y = 70
+SIDES = ("1P", "2P")
+# 查表涵蓋的球 y 座標: 兩個平台之間
+Y_MIN = PLATFORM_2P_Y + PLATFORM_HEIGHT
+Y_MAX = PLATFORM_1P_Y - BALL_SIZE
+NUM_X = SCREEN_WIDTH - BALL_SIZE + 1
+# |ball_speed_x| - |ball_speed_y| 可能的值，和 x 的方向組成查表的一個維度
+SPEED_X_OFFSETS = (0, 3)
+# 兩方的速度都超過 40 時平手，所以 |ball_speed_y| 最多是 41
+DEFAULT_MAX_SPEED = 41
+
+# 落點以 0.01 像素為單位存成 uint16
+SCALE = 100
+# 無法預測，使用當前平台中心
+FALLBACK = int(np.iinfo(np.uint16).max)
+# 球不是往自己的平台飛 (predict_pingpong_landing 回傳 None)
+NO_PREDICTION = FALLBACK - 1
+
+
+def _speed_x_index(ball_speed_x, ball_speed_y_abs):
+    # 回傳 ball_speed_x 在查表中的索引，不在查表中則回傳 -1
+    offset = abs(ball_speed_x) - ball_speed_y_abs
+    if offset == 0:
+        index = 0
+    elif offset == 3:
+        index = 1
+    else:
+        return -1
+    return index * 2 + (ball_speed_x > 0)
+
+
+def build_landing_table(max_speed=DEFAULT_MAX_SPEED):
+    """
+    計算所有狀態的落點 (blocker 在 (0, 0)、速度 0)
+
+    Returns:
+        uint16 陣列，形狀為 (2, max_speed, 4, Y_MAX - Y_MIN + 1, NUM_X)，
+        維度依序是 side、|ball_speed_y| - 1、ball_speed_x、ball_y - Y_MIN、ball_x
+    """
+    ys = np.arange(Y_MIN, Y_MAX + 1)
+    xs = np.arange(NUM_X)
+    ball_y, ball_x = (a.ravel() for a in np.meshgrid(ys, xs, indexing="ij"))
+    # 平台放在畫面外，讓後備值 (平台中心) 成為負數，和真正的落點區分開
+    platform_x = -1000
+
+    table = np.empty((len(SIDES), max_speed, len(SPEED_X_OFFSETS) * 2, len(ys), len(xs)), dtype=np.uint16)
+    for side_index, side in enumerate(SIDES):
+        direction_y = 1 if side == "1P" else -1
+        for speed_y_abs in range(1, max_speed + 1):
+            for offset_index, offset in enumerate(SPEED_X_OFFSETS):
+                for direction_x in (-1, 1):
+                    speed_x = (speed_y_abs + offset) * direction_x
+                    predicted = predict_pingpong_landing_batch(
+                        side, ball_x, ball_y, speed_x, speed_y_abs * direction_y,
+                        platform_x, platform_x, 0, 0, PLATFORM_1P_Y, PLATFORM_2P_Y)
+                    values = np.where(np.isnan(predicted), NO_PREDICTION,
+                                      np.where(predicted < 0, FALLBACK, np.round(predicted * SCALE)))
+                    speed_x_index = _speed_x_index(speed_x, speed_y_abs)
+                    table[side_index, speed_y_abs - 1, speed_x_index] = values.reshape(len(ys), len(xs))
+    return table
+
+
+class LandingTable:
+    """
+    以 mmap 載入的落點查表
+
+    predict 的參數和回傳值與 predict_pingpong_landing 相同。查表以 predict_pingpong_landing_batch 建立，
+    落點和參考版最多相差 WALL_ERROR × 撞牆次數，再加上存成 0.01 像素的捨入誤差 0.5 / SCALE。
+    查表沒有涵蓋的狀態 (HARD 模式的 Blocker、其他速度或位置) 改用 predict_pingpong_landing_fast 計算。
+    """
+
+    def __init__(self, path, fallback_predict=predict_pingpong_landing_fast):
+        table = np.load(path, mmap_mode="r")
+        if table.dtype != np.uint16 or table.ndim != 5 or table.shape[3:] != (Y_MAX - Y_MIN + 1, NUM_X):
+            raise ValueError(f"'{path}' 不是有效的落點查表。")
+        self.max_speed = table.shape[1]
+        self.fallback_predict = fallback_predict
+        self._table = table
+        # 用一維的 memoryview 查表比 numpy 的索引快
+        self._values = memoryview(table).cast("B").cast("H")
+        side_stride, speed_y_stride, speed_x_stride, self._y_stride, _ = (
+            stride // table.itemsize for stride in table.strides)
+        # (side, ball_speed_x, ball_speed_y) 在查表中的起始位置
+        self._offsets = {}
+        for side_index, side in enumerate(SIDES):
+            direction_y = 1 if side == "1P" else -1
+            for speed_y_abs in range(1, self.max_speed + 1):
+                for offset in SPEED_X_OFFSETS:
+                    for direction_x in (-1, 1):
+                        speed_x = (speed_y_abs + offset) * direction_x
+                        self._offsets[side, speed_x, speed_y_abs * direction_y] = (
+                            side_index * side_stride + (speed_y_abs - 1) * speed_y_stride +
+                            _speed_x_index(speed_x, speed_y_abs) * speed_x_stride)
+
+    def predict(self, scene_info, side, blocker_current_speed_x=0):
+        blocker_pos = scene_info.get("blocker")
+        ball_speed = scene_info.get("ball_speed")
+        offset = None
+        if (ball_speed is not None and blocker_current_speed_x == 0 and blocker_pos and blocker_pos[0] == 0 and
+                scene_info["platform_1P"][1] == PLATFORM_1P_Y and scene_info["platform_2P"][1] == PLATFORM_2P_Y):
+            offset = self._offsets.get((side, *ball_speed))
+        ball_x, ball_y = scene_info["ball"]
+        if offset is None or not 0 <= ball_x < NUM_X or not Y_MIN <= ball_y <= Y_MAX:
+            return self.fallback_predict(scene_info, side, blocker_current_speed_x)
+
+        value = self._values[offset + (ball_y - Y_MIN) * self._y_stride + ball_x]
+        if value == FALLBACK:
+            return scene_info[f"platform_{side}"][0] + PLATFORM_WIDTH / 2
+        if value == NO_PREDICTION:
+            return None
+        return value / SCALE
+
+    def close(self):
+        self._values.release()
+        self._table = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="建立 EASY / NORMAL 模式的落點查表。")
+    parser.add_argument("--output", type=str, required=True,
+                        help="查表檔案名稱 (例如, ./ml/landing_table.npy)。")
+    parser.add_argument("--max_speed", type=int, default=DEFAULT_MAX_SPEED,
+                        help="查表涵蓋的最大 |ball_speed_y|。")
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    table = build_landing_table(args.max_speed)
+    np.save(args.output, table)
+    print(f"查表已儲存至 {args.output}: 形狀 {table.shape}, {table.nbytes / 2 ** 20:.1f} MB, "
+          f"耗時 {time.perf_counter() - start_time:.1f} 秒。")
+
+
+if __name__ == '__main__':
+    main()
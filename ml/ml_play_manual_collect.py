@@ -1,10 +1,7 @@
 # ml/ml_play_manual_collect.py
 import pygame
-import pickle
-import datetime
-import os
-import numpy as np # 需要 numpy 來處理特徵
-from ml.predict_logic import predict_pingpong_landing
+from ml.predict_logic import create_predictor
+from ml.training_recorder import TrainingRecorder
 
 class MLPlay:
     def __init__(self, ai_name, *args, **kwargs):
@@ -13,13 +10,12 @@ class MLPlay:
         """
         self.side = ai_name
         self.player_no = int(ai_name.strip('P'))
-        self.data_buffer = []
-        
+        # 落點預測器: 用 predictor 參數或環境變數 PINGPONG_PREDICTOR 指定 (見 ml.predict_logic)
+        self.predictor = create_predictor(self.side, kwargs.get("predictor"))
 
-        # 創建資料夾 (如果不存在) - 手動數據建議存到不同地方
+        # 數據以欄為單位附加到資料夾中 (資料夾不存在時建立) - 手動數據建議存到不同地方
         self.data_folder = f"pingpong_manual_data_{self.side}"
-        if not os.path.exists(self.data_folder):
-            os.makedirs(self.data_folder)
+        self.recorder = TrainingRecorder(self.data_folder)
         print(f"[{self.side}] Manual Data Collection AI initialized. Data will be saved to '{self.data_folder}'")
         print(f"[{self.side}] Controls: Serve: Q/E (2P), ./ (1P) | Move: A/D (2P), Left/Right Arrow (1P)")
 
@@ -42,10 +38,11 @@ class MLPlay:
                 should_save = True
                 print(f"[{self.side}] Game Won! Preparing to save manual data...")
 
-            if should_save and self.data_buffer:
-                 timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S_%f')
-                 filename = os.path.join(self.data_folder, f"manual_data_win_{timestamp}.pickle")
-                 self.save_data_to_pickle(filename)
+            if should_save and len(self.recorder):
+                 num_rows = self.recorder.commit()
+                 print(f"[{self.side}] Manual data saved to '{self.data_folder}' ({num_rows} frames, {self.recorder.num_rows} in total)")
+            else:
+                 self.recorder.discard()
             return "RESET"
 
         # 2. Determine command from keyboard input
@@ -75,7 +72,7 @@ class MLPlay:
                 command = "NONE"
 
         # 3. Calculate predicted landing point (仍然需要計算，因為它是特徵之一)
-        predicted_center = predict_pingpong_landing(scene_info, self.side)
+        predicted_center = self.predictor.predict(scene_info)
         my_platform_x = scene_info[f"platform_{self.side}"][0]
         my_platform_center = my_platform_x + 40 / 2
 
@@ -101,11 +98,8 @@ class MLPlay:
                      "predicted_center_calc": pred_center_feature
                  }
 
-                 self.data_buffer.append({
-                     "features": features,
-                     "command": command, # 儲存手動指令
-                     "side": self.side
-                 })
+                 # 沒有推斷 Blocker 速度，blocker_speed_x 記為 NaN，訓練時會被略過
+                 self.recorder.append(features, command, self.side) # 儲存手動指令
 
  
 
@@ -115,19 +109,6 @@ class MLPlay:
         """
         Reset the status and clear buffer.
         """
-        self.data_buffer = [] # 清空 buffer，數據在遊戲勝利時已儲存
+        self.recorder.discard() # 丟棄未儲存的數據，數據在遊戲勝利時已儲存
+        self.predictor.reset()
         # print(f"[{self.side}] Resetting Manual AI state.")
-
-    def save_data_to_pickle(self, filename):
-        """
-        Save the collected manual data buffer to a pickle file.
-        """
-        if not self.data_buffer:
-             print(f"[{self.side}] No manual data to save for this round.")
-             return
-        try:
-            with open(filename, "wb") as f:
-                pickle.dump(self.data_buffer, f)
-            print(f"[{self.side}] Manual data saved to {filename} ({len(self.data_buffer)} frames)")
-        except Exception as e:
-            print(f"[{self.side}] Error saving manual data to {filename}: {e}")
\ No newline at end of file
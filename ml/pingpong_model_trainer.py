@@ -7,6 +7,12 @@ from sklearn.metrics import accuracy_score
 import os
 import glob
 import argparse
+import sys
+
+# 以 python ml/pingpong_model_trainer.py 執行時也能匯入 ml 套件
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml.training_recorder import FEATURE_KEYS, SIDES, has_recorded_data, load_recorded_data
 
 def load_data_from_pickle(folder_path):
     """Loads all pickle files from a specified folder."""
@@ -79,6 +85,62 @@ def preprocess_data(all_game_data, target_side):
     return np.array(features), np.array(labels)
 
 
+def _recorded_row_mask(columns, start, stop, side_index):
+    # 目標玩家且沒有缺少特徵 (NaN) 的列，和 preprocess_data 一樣略過缺少特徵的數據
+    mask = columns["side"][start:stop] == side_index
+    for key in FEATURE_KEYS:
+        mask &= ~np.isnan(columns[key][start:stop])
+    return mask
+
+
+def load_recorded_features(folder_path, target_side, chunk_size=1 << 20):
+    """
+    用 memmap 載入 TrainingRecorder 記錄的數據，為目標玩家提取特徵和標籤。
+
+    每次只處理每個分片的 chunk_size 列，先算出選取的列數，再把選取的列直接填入預先配置的陣列，
+    不會把所有欄複製成一個完整的特徵矩陣。
+    """
+    shards = load_recorded_data(folder_path)
+    print(f"Found {sum(len(columns['side']) for columns in shards)} recorded items "
+          f"in {len(shards)} shards of folder '{folder_path}'.")
+    side_index = SIDES.index(target_side)
+    chunks = [(columns, start, min(start + chunk_size, len(columns["side"])))
+              for columns in shards for start in range(0, len(columns["side"]), chunk_size)]
+    num_selected = sum(int(np.count_nonzero(_recorded_row_mask(columns, start, stop, side_index)))
+                       for columns, start, stop in chunks)
+
+    features = np.empty((num_selected, len(FEATURE_KEYS)), dtype=np.float64)
+    # command 的索引和 preprocess_data 的 command_map 相同
+    labels = np.empty(num_selected, dtype=np.int64)
+    offset = 0
+    for columns, start, stop in chunks:
+        mask = _recorded_row_mask(columns, start, stop, side_index)
+        count = int(np.count_nonzero(mask))
+        for i, key in enumerate(FEATURE_KEYS):
+            features[offset:offset + count, i] = columns[key][start:stop][mask]
+        labels[offset:offset + count] = columns["command"][start:stop][mask]
+        offset += count
+    print(f"預處理完成。為玩家 {target_side} 提取了 {len(labels)} 個有效數據點。")
+    return features, labels
+
+
+def recompute_predicted_center(features, target_side):
+    """用目前的預測函數重新計算特徵中的 predicted_center_calc (例如修正預測函數之後)。"""
+    # 只有 --recompute_prediction 才需要預測函數
+    from ml.predict_logic import predict_pingpong_landing_batch
+
+    (ball_x, ball_y, ball_speed_x, ball_speed_y, platform_1P_x, platform_2P_x,
+     blocker_x, _, blocker_speed_x) = features.T
+    predicted = predict_pingpong_landing_batch(
+        target_side, ball_x, ball_y, ball_speed_x, ball_speed_y,
+        platform_1P_x, platform_2P_x, blocker_x, blocker_speed_x)
+    # 和收集數據時一樣，無法預測時使用當前平台中心
+    my_platform_x = platform_1P_x if target_side == "1P" else platform_2P_x
+    features[:, 7] = np.where(np.isnan(predicted), my_platform_x + 20, predicted)
+    print(f"已重新計算 {len(features)} 筆數據的 predicted_center_calc。")
+    return features
+
+
 def train_model(features, labels):
     """訓練 KNN 模型並評估準確率 (使用固定的 n_neighbors=5)。"""
     N_NEIGHBORS = 9 # <--- 直接在這裡設定 K 值
@@ -129,20 +191,27 @@ def save_model(model, filename):
 def main():
     parser = argparse.ArgumentParser(description="訓練乒乓球 KNN 模型。")
     parser.add_argument("--data_folder", type=str, required=True,
-                        help="包含遊戲數據 pickle 檔案的資料夾路徑 (例如, ./ml/pingpong_data_1P)。")
+                        help="包含遊戲數據的資料夾路徑 (例如, ./ml/pingpong_data_1P)，"
+                             "可以是 TrainingRecorder 記錄的數據或舊的 pickle 檔案。")
     parser.add_argument("--side", type=str, required=True, choices=['1P', '2P'],
                         help="為哪個玩家訓練模型 (1P 或 2P)。")
     parser.add_argument("--output_model", type=str, required=True,
                         help="訓練好的模型檔案名稱 (例如, ./ml/model_P1_YourStudentID.pickle)。")
+    parser.add_argument("--recompute_prediction", action="store_true",
+                        help="用目前的預測函數重新計算 predicted_center_calc 特徵。")
     # 移除 neighbors 參數解析
     # parser.add_argument("--neighbors", type=int, default=5, help="KNN 的鄰居數量 (預設: 5)。")
     args = parser.parse_args()
 
-    all_game_data = load_data_from_pickle(args.data_folder)
-    if not all_game_data: return
-
-    features, labels = preprocess_data(all_game_data, args.side)
+    if has_recorded_data(args.data_folder):
+        features, labels = load_recorded_features(args.data_folder, args.side)
+    else:
+        all_game_data = load_data_from_pickle(args.data_folder)
+        if not all_game_data: return
+        features, labels = preprocess_data(all_game_data, args.side)
     if features.size == 0: return
+    if args.recompute_prediction:
+        features = recompute_predicted_center(features, args.side)
 
     # 調用修改後的 train_model，不再傳遞 neighbors 參數
     model, accuracy = train_model(features, labels)
@@ -1,11 +1,8 @@
 # ml/pingpong_play_collect.py
-import pickle
-import datetime
-import os
 import random
-import numpy as np
-# 導入需要 blocker_current_speed_x 的預測函數
-from ml.predict_logic import predict_pingpong_landing
+# 導入需要 blocker_current_speed_x 的預測器
+from ml.predict_logic import create_predictor
+from ml.training_recorder import TrainingRecorder
 
 class MLPlay:
     def __init__(self, ai_name, *args, **kwargs):
@@ -14,17 +11,14 @@ class MLPlay:
         """
         self.side = ai_name
         self.player_no = int(ai_name.strip('P'))
-        self.data_buffer = []
         self.prev_blocker_x = None # <--- 新增: 儲存上一幀 Blocker 的 X 座標
         self.blocker_speed_x = 0   # <--- 新增: 推斷出的 Blocker 速度 (初始為 0)
+        # 預設用 trajectory (球沒有偏離軌跡時重用上次的預測)，可用 predictor 參數或環境變數 PINGPONG_PREDICTOR 指定
+        self.predictor = create_predictor(self.side, kwargs.get("predictor"), default="trajectory")
 
-        # 創建資料夾 (如果不存在)
+        # 數據以欄為單位附加到資料夾中 (資料夾不存在時建立)
         self.data_folder = f"pingpong_data_{self.side}"
-        if not os.path.exists(self.data_folder):
-            try:
-                os.makedirs(self.data_folder)
-            except FileExistsError:
-                pass
+        self.recorder = TrainingRecorder(self.data_folder)
         print(f"[{self.side}] 資料收集 AI 初始化。獲勝數據將儲存至 '{self.data_folder}'")
 
     def update(self, scene_info, *args, **kwargs):
@@ -46,12 +40,11 @@ class MLPlay:
                 should_save = True
                 print(f"[{self.side}] 遊戲獲勝！準備儲存數據...")
 
-            if should_save and self.data_buffer:
-                 timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S_%f')
-                 filename = os.path.join(self.data_folder, f"data_win_{timestamp}.pickle")
-                 self.save_data_to_pickle(filename)
-            elif self.data_buffer:
-                 self.data_buffer = []
+            if should_save and len(self.recorder):
+                 num_rows = self.recorder.commit()
+                 print(f"[{self.side}] 已儲存 {num_rows} 筆數據至 '{self.data_folder}' (共 {self.recorder.num_rows} 筆)。")
+            else:
+                 self.recorder.discard()
             # --- 儲存邏輯結束 ---
 
             return "RESET"
@@ -88,7 +81,7 @@ class MLPlay:
 
         if "ball_speed" in scene_info:
              # 調用預測函數，傳入推斷出的 Blocker 速度
-             predicted_center = predict_pingpong_landing(scene_info, self.side, self.blocker_speed_x) # <--- 傳入速度
+             predicted_center = self.predictor.predict(scene_info, self.blocker_speed_x) # <--- 傳入速度
         # else: predicted_center remains None
 
         if predicted_center is not None:
@@ -126,66 +119,17 @@ class MLPlay:
                      "blocker_speed_x": self.blocker_speed_x # <--- 新增: 也收集推斷出的 Blocker 速度作為特徵
                  }
 
-                 self.data_buffer.append({
-                     "features": features,
-                     "command": command,
-                     "side": self.side
-                 })
+                 self.recorder.append(features, command, self.side)
 
         return command
 
     def reset(self):
         """
-        重置狀態。數據緩衝區在遊戲非獲勝結束時已清空。
+        重置狀態。獲勝局的數據在遊戲結束時已儲存。
         """
-        self.data_buffer = [] # 確保每次 Reset 都清空緩衝區
+        self.recorder.discard() # 確保每次 Reset 都丟棄未儲存的數據
         self.prev_blocker_x = None # 重置 Blocker 位置追蹤
         self.blocker_speed_x = 0   # 重置 Blocker 速度推斷
+        self.predictor.reset()
         # print(f"[{self.side}] 重置 AI 狀態。")
         pass
-
-    def save_data_to_pickle(self, filename):
-        """
-        將收集到的數據緩衝區儲存到 pickle 文件並打印樣本數據。
-        """
-        if not self.data_buffer:
-             print(f"[{self.side}] 沒有要儲存的獲勝局數據 (緩衝區為空)。")
-             return
-
-        # --- 在儲存前打印一些樣本數據 ---
-        print(f"[{self.side}] 儲存數據至 {filename}. 緩衝區大小: {len(self.data_buffer)}")
-        print("-" * 20 + " 樣本數據 " + "-" * 20)
-        sample_indices = list(range(min(5, len(self.data_buffer)))) + \
-                         list(range(max(0, len(self.data_buffer)-5), len(self.data_buffer)))
-        printed_indices = set()
-
-        for i in sample_indices:
-            if i not in printed_indices and i < len(self.data_buffer):
-                 data_point = self.data_buffer[i]
-                 if not isinstance(data_point, dict): continue
-                 print(f"  index {i}:")
-                 print(f"    Side: {data_point.get('side', 'N/A')}")
-                 print(f"    Command: {data_point.get('command', 'N/A')}")
-                 features = data_point.get('features')
-                 if features and isinstance(features, dict):
-                      print(f"    Features:")
-                      for key, value in features.items():
-                           if isinstance(value, (float, np.floating)):
-                               print(f"      {key}: {value:.2f}")
-                           else:
-                                print(f"      {key}: {value}")
-                 else:
-                      print(f"    Features: 無效或缺失")
-                 printed_indices.add(i)
-        print("-" * (40 + len(" 樣本數據 ")))
-        # --- 打印結束 ---
-
-        # 執行儲存
-        try:
-            with open(filename, "wb") as f:
-                pickle.dump(self.data_buffer, f)
-            print(f"[{self.side}] 獲勝局數據成功儲存至 {filename}")
-        except Exception as e:
-            print(f"[{self.side}] 儲存數據至 {filename} 時發生錯誤: {e}")
-        finally:
-             self.data_buffer = [] # 儲存後清空 buffer
\ No newline at end of file
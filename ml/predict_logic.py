@@ -1,5 +1,7 @@
 # ml/predict_logic.py
 import math
+import os
+import time
 
 # --- 常數定義 ---
 SCREEN_WIDTH = 200
@@ -161,4 +163,513 @@ def predict_pingpong_landing(scene_info, side, blocker_current_speed_x=0): # 新
         return target_platform_center_x
     else:
         # 循環結束仍未預測成功
-        return my_platform_x + PLATFORM_WIDTH / 2
\ No newline at end of file
+        return my_platform_x + PLATFORM_WIDTH / 2
+
+# --- 封閉式 (closed-form) 落點預測 ---
+# 球在兩面牆之間的反彈可以直接用折返 (fold) 計算，不需要逐個事件模擬。
+# 參考版的迴圈在撞牆後會把球放在 0.01 或 SCREEN_WIDTH - BALL_SIZE - 0.01，再飛到另一面牆
+# (0 或 SCREEN_WIDTH - BALL_SIZE)，所以兩次撞牆之間飛行的距離是 WALL_SPAN。
+# 參考版只在球到達或超過牆時才把球移回牆內，浮點誤差讓球停在牆內一點點 (例如 194.99999999999997) 時
+# 不會移回，之後的飛行距離就多了 0.01，所以封閉式的結果和參考版最多相差 WALL_ERROR × 撞牆次數。
+WALL_SPAN = SCREEN_WIDTH - BALL_SIZE - 0.01
+WALL_ERROR = 0.01
+# 參考版用 0.01 判斷事件是否同時發生。事件時間太接近時結果取決於這些細節，
+# 這時直接使用參考版，確保結果相同。
+TIE_MARGIN = 0.03
+MAX_SIMULATION_STEPS = 30
+
+
+def predict_pingpong_landing_fast(scene_info, side, blocker_current_speed_x=0):
+    """
+    與 predict_pingpong_landing 相同的預測，但以封閉式計算球撞牆後的位置，
+    不用逐步模擬每次撞牆。
+
+    只有在球經過 Blocker 的高度前撞牆時，才需要逐次更新 Blocker 位置 (和參考版一樣每次撞牆更新一次)。
+    事件時間太接近 (TIE_MARGIN 內) 時改用參考版 predict_pingpong_landing。
+    參數和回傳值與 predict_pingpong_landing 相同，落點最多相差 WALL_ERROR × 撞牆次數 (見 WALL_SPAN)。
+    """
+    ball_x, ball_y = scene_info["ball"]
+    platform_1P_x, platform_1P_y = scene_info["platform_1P"]
+    platform_2P_x, platform_2P_y = scene_info["platform_2P"]
+    blocker_pos = scene_info.get("blocker")
+
+    if "ball_speed" not in scene_info:
+        if side == "1P": return platform_1P_x + PLATFORM_WIDTH / 2
+        if side == "2P": return platform_2P_x + PLATFORM_WIDTH / 2
+        return None
+    ball_speed_x, ball_speed_y = scene_info["ball_speed"]
+
+    if side == "1P":
+        platform_y_target = platform_1P_y - BALL_SIZE
+        my_platform_x = platform_1P_x
+        if ball_speed_y <= 0: return None
+    elif side == "2P":
+        platform_y_target = platform_2P_y + PLATFORM_HEIGHT
+        my_platform_x = platform_2P_x
+        if ball_speed_y >= 0: return None
+    else:
+        raise ValueError("Invalid player side. Use '1P' or '2P'.")
+
+    fallback = my_platform_x + PLATFORM_WIDTH / 2
+    wall_x = SCREEN_WIDTH - BALL_SIZE
+
+    # --- 1. 到達平台的時間 ---
+    time_to_platform = (platform_y_target - ball_y) / ball_speed_y
+    if time_to_platform <= -0.001:
+        # 球已經過了平台，參考版只會撞牆直到步數用完
+        return fallback
+    time_to_platform = max(0, time_to_platform)
+
+    # --- 2. 第一次撞牆的時間，之後每 wall_period 撞一次牆 ---
+    speed_x_abs = abs(ball_speed_x)
+    first_wall_time = math.inf
+    if ball_speed_x > 0:
+        first_wall_time = (wall_x - ball_x) / ball_speed_x
+    elif ball_speed_x < 0:
+        first_wall_time = -ball_x / ball_speed_x
+    if first_wall_time <= 0.001:
+        # 球正往牆外移動，之後不會再撞牆
+        first_wall_time = math.inf
+    wall_period = WALL_SPAN / speed_x_abs if speed_x_abs else math.inf
+
+    if _is_near_wall(time_to_platform, first_wall_time, wall_period, speed_x_abs):
+        return predict_pingpong_landing(scene_info, side, blocker_current_speed_x)
+
+    steps = 1  # 到達平台的那一步
+
+    # --- 3. 經過 Blocker 的高度 ---
+    if blocker_pos:
+        time_to_blocker = math.inf
+        if ball_speed_y > 0 and ball_y < BLOCKER_Y_TOP + BLOCKER_HEIGHT:
+            time_to_blocker = (BLOCKER_Y_TOP - BALL_SIZE - ball_y) / ball_speed_y
+        elif ball_speed_y < 0 and ball_y > BLOCKER_Y_TOP:
+            time_to_blocker = (BLOCKER_Y_TOP + BLOCKER_HEIGHT - ball_y) / ball_speed_y
+
+        if 0.001 < time_to_blocker < math.inf:
+            if (abs(time_to_blocker - time_to_platform) < TIE_MARGIN or
+                    _is_near_wall(time_to_blocker, first_wall_time, wall_period, speed_x_abs)):
+                return predict_pingpong_landing(scene_info, side, blocker_current_speed_x)
+
+            # Blocker 和參考版一樣在每一步 (每次撞牆) 更新一次，撞牆時停在牆邊並反向
+            num_walls = _num_walls_before(time_to_blocker, first_wall_time, wall_period)
+            blocker_x = float(blocker_pos[0])
+            blocker_speed_x = float(blocker_current_speed_x)
+            last_time = 0
+            for j in range(num_walls + 1):
+                event_time = first_wall_time + j * wall_period if j < num_walls else time_to_blocker
+                blocker_x += blocker_speed_x * (event_time - last_time)
+                if blocker_x <= 0 or blocker_x >= SCREEN_WIDTH - BLOCKER_WIDTH:
+                    blocker_speed_x *= -1
+                    blocker_x = max(0, min(blocker_x, SCREEN_WIDTH - BLOCKER_WIDTH))
+                last_time = event_time
+
+            x = _x_at(time_to_blocker, num_walls, ball_x, ball_speed_x, first_wall_time, wall_period)
+            left, right = blocker_x - BALL_SIZE, blocker_x + BLOCKER_WIDTH
+            if abs(x - left) < TIE_MARGIN * 10 or abs(x - right) < TIE_MARGIN * 10:
+                return predict_pingpong_landing(scene_info, side, blocker_current_speed_x)
+            if left < x < right:
+                # 撞到 Blocker 後球往回飛，參考版最後會用完步數
+                return fallback
+            steps += 1
+
+    # --- 4. 到達平台時的位置 ---
+    num_walls = _num_walls_before(time_to_platform, first_wall_time, wall_period)
+    steps += num_walls
+    if steps > MAX_SIMULATION_STEPS:
+        return fallback
+
+    target_ball_center_x = _x_at(
+        time_to_platform, num_walls, ball_x, ball_speed_x, first_wall_time, wall_period) + BALL_SIZE / 2
+    return max(PLATFORM_WIDTH / 2, min(target_ball_center_x, SCREEN_WIDTH - PLATFORM_WIDTH / 2))
+
+
+def _num_walls_before(t, first_wall_time, wall_period):
+    # 時間 t 之前撞牆的次數
+    if t <= first_wall_time:
+        return 0
+    return int((t - first_wall_time) // wall_period) + 1
+
+
+def _is_near_wall(t, first_wall_time, wall_period, speed_x_abs):
+    # 檢查 t 附近是否有撞牆事件 (考慮撞牆位置 0.01 的誤差累積)
+    if first_wall_time == math.inf:
+        return False
+    k = _num_walls_before(t, first_wall_time, wall_period)
+    margin = TIE_MARGIN + (k + 1) * 0.02 / speed_x_abs
+    for j in (k - 1, k):
+        if j >= 0 and abs(first_wall_time + j * wall_period - t) < margin:
+            return True
+    return False
+
+
+def _x_at(t, num_walls, ball_x, ball_speed_x, first_wall_time, wall_period):
+    # 經過 num_walls 次撞牆後，球在時間 t 的 x 座標
+    if num_walls == 0:
+        return ball_x + ball_speed_x * t
+    elapsed = t - first_wall_time - (num_walls - 1) * wall_period
+    # 最後一次撞到的是右牆嗎?
+    if (ball_speed_x > 0) == (num_walls % 2 == 1):
+        return SCREEN_WIDTH - BALL_SIZE - 0.01 - abs(ball_speed_x) * elapsed
+    return 0.01 + abs(ball_speed_x) * elapsed
+
+
+
+# --- 跨幀重用預測結果的落點預測器 ---
+class TrajectoryPredictor:
+    """
+    快取上一次預測時球的軌跡。球在兩次反彈之間沿直線等速移動，落點不會改變，
+    所以只有在球或 Blocker 偏離快取的軌跡時 (反彈、加速、切球、Blocker 反彈或變速) 才重新預測。
+
+    hits / misses 記錄使用快取和重新預測的次數。
+    """
+
+    def __init__(self, side, predict=predict_pingpong_landing):
+        """
+        Args:
+            side: "1P" 或 "2P"
+            predict: 實際計算落點的函數，參數和 predict_pingpong_landing 相同
+        """
+        self.side = side
+        self.predict_landing = predict
+        self.hits = 0
+        self.misses = 0
+        self._cache = None
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def reset(self):
+        """清除快取的軌跡 (每回合結束時呼叫)，保留計數。"""
+        self._cache = None
+
+    def predict(self, scene_info, blocker_current_speed_x=0):
+        """
+        預測落點，參數和回傳值與 predict_pingpong_landing 相同 (side 在建構時指定)。
+        """
+        frame = scene_info.get("frame")
+        ball_speed = scene_info.get("ball_speed")
+        if frame is None or ball_speed is None:
+            self.misses += 1
+            self._cache = None
+            return self.predict_landing(scene_info, self.side, blocker_current_speed_x)
+
+        ball_speed = tuple(ball_speed)
+        ball_x, ball_y = scene_info["ball"]
+        blocker_pos = scene_info.get("blocker")
+        blocker_x = blocker_pos[0] if blocker_pos else None
+
+        cache = self._cache
+        if cache is not None:
+            (cached_frame, cached_ball_x, cached_ball_y, cached_ball_speed,
+             cached_blocker_x, cached_blocker_speed_x, predicted) = cache
+            elapsed = frame - cached_frame
+            # 球和 Blocker 都還在快取的直線軌跡上，而且球還沒越過平台
+            if (ball_speed == cached_ball_speed and
+                    (predicted is None or not self._has_passed_platform(scene_info, ball_y, ball_speed[1])) and
+                    blocker_current_speed_x == cached_blocker_speed_x and
+                    ball_x == cached_ball_x + ball_speed[0] * elapsed and
+                    ball_y == cached_ball_y + ball_speed[1] * elapsed and
+                    (blocker_x == cached_blocker_x if blocker_x is None or cached_blocker_x is None
+                     else blocker_x == cached_blocker_x + blocker_current_speed_x * elapsed)):
+                self.hits += 1
+                return predicted
+
+        self.misses += 1
+        predicted = self.predict_landing(scene_info, self.side, blocker_current_speed_x)
+        my_platform_center = scene_info[f"platform_{self.side}"][0] + PLATFORM_WIDTH / 2
+        if predicted == my_platform_center:
+            # 無法預測時回傳的是當前平台中心，會隨平台移動，不能快取
+            self._cache = None
+        else:
+            self._cache = (frame, ball_x, ball_y, ball_speed,
+                           blocker_x, blocker_current_speed_x, predicted)
+        return predicted
+
+    def _has_passed_platform(self, scene_info, ball_y, ball_speed_y):
+        # 和 predict_pingpong_landing 一樣的判斷，越過平台後會回傳後備值
+        if self.side == "1P":
+            platform_y_target = scene_info["platform_1P"][1] - BALL_SIZE
+        else:
+            platform_y_target = scene_info["platform_2P"][1] + PLATFORM_HEIGHT
+        return ball_speed_y != 0 and (platform_y_target - ball_y) / ball_speed_y <= -0.001
+
+
+# --- 批次 (NumPy) 落點預測 ---
+def predict_pingpong_landing_batch(side, ball_x, ball_y, ball_speed_x, ball_speed_y,
+                                   platform_1P_x, platform_2P_x, blocker_x=None, blocker_speed_x=0,
+                                   platform_1P_y=420, platform_2P_y=70):
+    """
+    一次預測多筆狀態的落點，和 predict_pingpong_landing_fast 的計算相同 (和參考版的誤差也相同)，
+    用在重新計算或補齊大量資料的 predicted_center_calc 特徵。
+
+    各個事件 (撞牆、經過 Blocker、到達平台) 以遮罩 (mask) 對所有資料同時處理，
+    事件時間太接近的資料才逐筆交給參考版 predict_pingpong_landing。
+    Args:
+        side: "1P" 或 "2P"，或是每筆資料的 side 陣列
+        ball_x, ball_y, ball_speed_x, ball_speed_y: 球的位置和速度陣列
+        platform_1P_x, platform_2P_x: 平台的 X 座標陣列
+        blocker_x: Blocker 的 X 座標陣列，負值 (收集資料時的 -1) 或 None 表示沒有 Blocker
+        blocker_speed_x: Blocker 的水平速度陣列 (+5, -5, 或 0)
+    Returns:
+        預測的平台中心 X 座標陣列 (float64)，predict_pingpong_landing 回傳 None 的位置為 NaN
+    """
+    import numpy as np
+
+    ball_x, ball_y, speed_x, speed_y, platform_1P_x, platform_2P_x = np.broadcast_arrays(
+        *(np.asarray(a, dtype=np.float64) for a in
+          (ball_x, ball_y, ball_speed_x, ball_speed_y, platform_1P_x, platform_2P_x)))
+    shape = ball_x.shape
+    is_1P = np.broadcast_to(np.asarray(side) == "1P", shape)
+    if blocker_x is None:
+        blocker_x = np.full(shape, -1.0)
+    blocker_x = np.broadcast_to(np.asarray(blocker_x, dtype=np.float64), shape)
+    blocker_speed_x = np.broadcast_to(np.asarray(blocker_speed_x, dtype=np.float64), shape)
+    has_blocker = blocker_x >= 0
+
+    platform_y_target = np.where(is_1P, platform_1P_y - BALL_SIZE, platform_2P_y + PLATFORM_HEIGHT)
+    fallback = np.where(is_1P, platform_1P_x, platform_2P_x) + PLATFORM_WIDTH / 2
+    result = np.full(shape, np.nan)
+    # 球不是往自己的平台飛時無法預測 (NaN)
+    todo = np.where(is_1P, speed_y > 0, speed_y < 0)
+    # 需要交給參考版計算的資料
+    use_reference = np.zeros(shape, dtype=bool)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # --- 1. 到達平台的時間 ---
+        time_to_platform = (platform_y_target - ball_y) / speed_y
+        passed = todo & (time_to_platform <= -0.001)
+        result[passed] = fallback[passed]
+        todo &= ~passed
+        time_to_platform = np.maximum(time_to_platform, 0)
+
+        # --- 2. 撞牆的時間 ---
+        speed_x_abs = np.abs(speed_x)
+        first_wall_time = np.where(speed_x > 0, (SCREEN_WIDTH - BALL_SIZE - ball_x) / speed_x,
+                                   np.where(speed_x < 0, -ball_x / speed_x, np.inf))
+        first_wall_time[~(first_wall_time > 0.001)] = np.inf
+        wall_period = WALL_SPAN / speed_x_abs
+
+        def num_walls_before(t):
+            return np.where(t <= first_wall_time, 0,
+                            np.floor((t - first_wall_time) / wall_period) + 1).astype(np.int64)
+
+        def is_near_wall(t):
+            k = num_walls_before(t)
+            margin = TIE_MARGIN + (k + 1) * 0.02 / speed_x_abs
+            near_next = np.abs(first_wall_time + k * wall_period - t) < margin
+            near_prev = (k >= 1) & (np.abs(first_wall_time + (k - 1) * wall_period - t) < margin)
+            return np.isfinite(first_wall_time) & (near_next | near_prev)
+
+        def x_at(t, num_walls):
+            elapsed = t - first_wall_time - (num_walls - 1) * wall_period
+            from_right_wall = (speed_x > 0) == (num_walls % 2 == 1)
+            return np.where(num_walls == 0, ball_x + speed_x * t,
+                            np.where(from_right_wall,
+                                     SCREEN_WIDTH - BALL_SIZE - 0.01 - speed_x_abs * elapsed,
+                                     0.01 + speed_x_abs * elapsed))
+
+        use_reference |= todo & is_near_wall(time_to_platform)
+        todo &= ~use_reference
+        steps = np.ones(shape, dtype=np.int64)
+
+        # --- 3. 經過 Blocker 的高度 ---
+        time_to_blocker = np.where(
+            (speed_y > 0) & (ball_y < BLOCKER_Y_TOP + BLOCKER_HEIGHT),
+            (BLOCKER_Y_TOP - BALL_SIZE - ball_y) / speed_y,
+            np.where((speed_y < 0) & (ball_y > BLOCKER_Y_TOP),
+                     (BLOCKER_Y_TOP + BLOCKER_HEIGHT - ball_y) / speed_y, np.inf))
+        crossing = todo & has_blocker & (time_to_blocker > 0.001) & np.isfinite(time_to_blocker)
+        tie = crossing & ((np.abs(time_to_blocker - time_to_platform) < TIE_MARGIN) |
+                          is_near_wall(time_to_blocker))
+        use_reference |= tie
+        crossing &= ~tie
+
+        if crossing.any():
+            # Blocker 和參考版一樣在每一步 (每次撞牆) 更新一次
+            num_walls = num_walls_before(time_to_blocker)
+            sim_blocker_x = blocker_x.copy()
+            sim_blocker_speed_x = blocker_speed_x.copy()
+            last_time = np.zeros(shape)
+            for j in range(int(num_walls[crossing].max()) + 1):
+                stepping = crossing & (j <= num_walls)
+                event_time = np.where(j < num_walls, first_wall_time + j * wall_period, time_to_blocker)
+                next_x = sim_blocker_x + sim_blocker_speed_x * (event_time - last_time)
+                bounced = stepping & ((next_x <= 0) | (next_x >= SCREEN_WIDTH - BLOCKER_WIDTH))
+                sim_blocker_speed_x[bounced] *= -1
+                next_x = np.clip(next_x, 0, SCREEN_WIDTH - BLOCKER_WIDTH, out=next_x, where=bounced)
+                sim_blocker_x[stepping] = next_x[stepping]
+                last_time[stepping] = event_time[stepping]
+
+            x = x_at(time_to_blocker, num_walls)
+            left, right = sim_blocker_x - BALL_SIZE, sim_blocker_x + BLOCKER_WIDTH
+            near_edge = crossing & ((np.abs(x - left) < TIE_MARGIN * 10) | (np.abs(x - right) < TIE_MARGIN * 10))
+            use_reference |= near_edge
+            crossing &= ~near_edge
+            # 撞到 Blocker 後球往回飛，參考版最後會用完步數
+            hit = crossing & (left < x) & (x < right)
+            result[hit] = fallback[hit]
+            todo &= ~(use_reference | hit)
+            steps += crossing & ~hit
+
+        # --- 4. 到達平台時的位置 ---
+        num_walls = num_walls_before(time_to_platform)
+        too_many_steps = todo & (steps + num_walls > MAX_SIMULATION_STEPS)
+        result[too_many_steps] = fallback[too_many_steps]
+        todo &= ~too_many_steps
+        target_ball_center_x = x_at(time_to_platform, num_walls) + BALL_SIZE / 2
+        result[todo] = np.clip(target_ball_center_x[todo], PLATFORM_WIDTH / 2, SCREEN_WIDTH - PLATFORM_WIDTH / 2)
+
+    # --- 5. 事件時間太接近的資料交給參考版 ---
+    for i in zip(*np.nonzero(use_reference)):
+        scene_info = {
+            "ball": (ball_x[i], ball_y[i]),
+            "ball_speed": (speed_x[i], speed_y[i]),
+            "platform_1P": (platform_1P_x[i], platform_1P_y),
+            "platform_2P": (platform_2P_x[i], platform_2P_y),
+            "blocker": (blocker_x[i], BLOCKER_Y_TOP) if has_blocker[i] else None,
+        }
+        predicted = predict_pingpong_landing(scene_info, "1P" if is_1P[i] else "2P", blocker_speed_x[i])
+        result[i] = np.nan if predicted is None else predicted
+    return result
+
+
+# --- 落點預測器登錄表 ---
+# MLPlay 沒有指定預測器時，依序使用環境變數 PINGPONG_PREDICTOR 和各腳本的預設值
+PREDICTOR_ENV_VAR = "PINGPONG_PREDICTOR"
+DEFAULT_PREDICTOR = "reference"
+DEFAULT_LANDING_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "landing_table.npy")
+
+_predictor_factories = {}
+_predictor_stats = {}
+_landing_tables = {}
+
+
+class PredictorStats:
+    """一個預測器實作累計的呼叫次數和時間 (所有 side 和實例合計)"""
+    __slots__ = ("calls", "total_ns")
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ns = 0
+
+    @property
+    def mean_us(self):
+        return self.total_ns / self.calls / 1e3 if self.calls else 0.0
+
+    @property
+    def calls_per_sec(self):
+        return self.calls / (self.total_ns / 1e9) if self.total_ns else 0.0
+
+
+class LandingPredictor:
+    """
+    由 create_predictor 建立的預測器
+
+    predict 的參數和回傳值與 predict_pingpong_landing 相同 (side 在建構時指定)，
+    每次呼叫的次數和時間累計到該實作的 PredictorStats。
+    有狀態的實作 (例如 trajectory, shadow) 需要每一幀呼叫 predict，並在每回合結束時呼叫 reset。
+    """
+
+    def __init__(self, name, side, impl, stats):
+        self.name = name
+        self.side = side
+        self.impl = impl
+        self.stats = stats
+        self._predict = getattr(impl, "predict", impl)
+        self._reset = getattr(impl, "reset", None)
+
+    def predict(self, scene_info, blocker_current_speed_x=0):
+        start_time = time.perf_counter_ns()
+        predicted = self._predict(scene_info, blocker_current_speed_x)
+        stats = self.stats
+        stats.total_ns += time.perf_counter_ns() - start_time
+        stats.calls += 1
+        return predicted
+
+    def reset(self):
+        if self._reset is not None:
+            self._reset()
+
+
+def register_predictor(name, factory):
+    """
+    登錄一個落點預測器實作
+    Args:
+        name: 預測器名稱
+        factory: factory(side, **options) 回傳 predict(scene_info, blocker_current_speed_x=0) 函數，
+                 或有 predict (以及 reset) 方法的物件
+    """
+    _predictor_factories[name] = factory
+    _predictor_stats.setdefault(name, PredictorStats())
+
+
+def available_predictors():
+    """回傳所有登錄的預測器名稱"""
+    return list(_predictor_factories)
+
+
+def get_predictor_name(name=None, default=DEFAULT_PREDICTOR):
+    """依序使用 name、環境變數 PINGPONG_PREDICTOR 和 default 決定預測器名稱"""
+    return name or os.environ.get(PREDICTOR_ENV_VAR) or default
+
+
+def create_predictor(side, name=None, default=DEFAULT_PREDICTOR, **options):
+    """
+    建立 side 使用的落點預測器
+    Args:
+        side: "1P" 或 "2P"
+        name: 預測器名稱，None 時使用環境變數 PINGPONG_PREDICTOR 或 default
+        options: 傳給實作的參數 (例如 table 的 table_path)
+    Returns:
+        LandingPredictor
+    """
+    if side not in ("1P", "2P"):
+        raise ValueError("Invalid player side. Use '1P' or '2P'.")
+    name = get_predictor_name(name, default)
+    if name not in _predictor_factories:
+        raise ValueError(f"Unknown predictor '{name}'. Available predictors: {', '.join(_predictor_factories)}")
+    return LandingPredictor(name, side, _predictor_factories[name](side, **options), _predictor_stats[name])
+
+
+def get_predictor_stats():
+    """回傳 {預測器名稱: PredictorStats}"""
+    return dict(_predictor_stats)
+
+
+def reset_predictor_stats():
+    for stats in _predictor_stats.values():
+        stats.calls = 0
+        stats.total_ns = 0
+
+
+def _stateless_factory(predict):
+    def factory(side):
+        def predict_side(scene_info, blocker_current_speed_x=0):
+            return predict(scene_info, side, blocker_current_speed_x)
+        return predict_side
+    return factory
+
+
+def _shadow_factory(side, max_frames=1000):
+    # shadow_predictor 匯入本模組，所以在建立時才匯入
+    from ml.shadow_predictor import ShadowPredictor
+    return ShadowPredictor(side, max_frames)
+
+
+def _table_factory(side, table_path=DEFAULT_LANDING_TABLE_PATH):
+    # 同一個查表檔案只載入一次，由所有預測器共用
+    from ml.landing_table import LandingTable
+    table = _landing_tables.get(table_path)
+    if table is None:
+        table = _landing_tables[table_path] = LandingTable(table_path)
+    return _stateless_factory(table.predict)(side)
+
+
+register_predictor("reference", _stateless_factory(predict_pingpong_landing))
+register_predictor("fast", _stateless_factory(predict_pingpong_landing_fast))
+register_predictor("trajectory", lambda side: TrajectoryPredictor(side))
+register_predictor("trajectory_fast", lambda side: TrajectoryPredictor(side, predict_pingpong_landing_fast))
+register_predictor("shadow", _shadow_factory)
+register_predictor("table", _table_factory)
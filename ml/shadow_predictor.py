@@ -0,0 +1,174 @@
+# ml/shadow_predictor.py
+"""
+用遊戲本身的物理 (src/game_object.py) 模擬球的移動來預測落點
+
+predict_logic 的預測用浮點數計算球的軌跡，不考慮每 100 幀的加速、
+遊戲以整數移動 Rect 的方式和球撞到 Blocker 邊角的反彈。這裡用和遊戲相同的
+Ball 和 Blocker 往前模擬，直到球到達自己平台的高度，同時得到撞擊前還有幾幀。
+球直線飛行、不會碰撞也不會加速的幀一次跳過 (和 PingPongSimulation.step_n 的 event_driven 相同)，
+所以每次預測只需要模擬少數幾幀。
+"""
+import random
+from collections import namedtuple
+
+from src.game_object import Ball, Blocker, Platform
+from src.rect import Rect
+from ml.predict_logic import (
+    SCREEN_WIDTH, SCREEN_HEIGHT, BALL_SIZE, PLATFORM_WIDTH, PLATFORM_HEIGHT, BLOCKER_Y_TOP
+)
+
+PLATFORM_1P_Y = 420
+PLATFORM_2P_Y = 70
+# 遊戲中發球後每 100 幀加速一次
+SPEED_UP_INTERVAL = 100
+
+# center: 預測的平台中心 X 座標，球到不了自己的平台高度時為 None
+# frames: 球到達平台高度前還要更新幾幀，center 為 None 時也是 None
+ShadowPrediction = namedtuple("ShadowPrediction", ["center", "frames"])
+
+
+class _ShadowBall(Ball):
+    """
+    和 Ball 相同，但只對 y 範圍和球這一幀的移動範圍重疊的物體做碰撞檢查
+    """
+    __slots__ = ()
+
+    def _check_ball_hit_sprites(self, sprites):
+        # 碰撞檢查會把物體的 Rect 擴大 1 像素
+        top = min(self.last_pos.y, self.rect.y) - 1
+        bottom = max(self.last_pos.y, self.rect.y) + self.rect.height + 1
+        for sprite in sprites:
+            if (sprite.rect.y <= bottom and top <= sprite.rect.bottom and
+                    self._physics.moving_collide_or_contact(self, sprite)):
+                return sprite
+        return None
+
+
+class ShadowPredictor:
+    """
+    以遊戲物理模擬的落點預測器
+
+    predict 的參數和回傳值與 predict_pingpong_landing 相同 (side 在建構時指定)，
+    最後一次預測撞擊前的幀數存在 frames_until_impact。
+    加速的時間點由發球的幀數決定，所以每一幀都要呼叫 predict 或 simulate，
+    讓預測器記錄發球的幀數。
+    """
+
+    def __init__(self, side, max_frames=1000):
+        """
+        Args:
+            side: "1P" 或 "2P"
+            max_frames: 最多模擬的幀數
+        """
+        if side not in ("1P", "2P"):
+            raise ValueError("Invalid player side. Use '1P' or '2P'.")
+        self.side = side
+        self.max_frames = max_frames
+        self.frames_until_impact = None
+        self._ball_served_frame = None
+
+        play_area_rect = Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)
+        self._ball = _ShadowBall(play_area_rect, True)
+        # 只模擬到球到達平台的高度為止，所以平台放在畫面外
+        self._platforms = (Platform((0, -1000), play_area_rect, "1P"),
+                           Platform((0, -1000), play_area_rect, "2P"))
+        self._blocker = Blocker(BLOCKER_Y_TOP, play_area_rect, random.Random(0))
+
+    def reset(self):
+        """每回合結束時呼叫"""
+        self._ball_served_frame = None
+        self.frames_until_impact = None
+
+    def predict(self, scene_info, blocker_current_speed_x=0):
+        """
+        預測平台中心的目標 X 座標。球不是往自己的平台飛時回傳 None，
+        球在到達平台前被 Blocker 彈回時回傳當前平台中心。
+        """
+        prediction = self.simulate(scene_info, blocker_current_speed_x)
+        self.frames_until_impact = prediction.frames
+        if prediction.center is not None:
+            return prediction.center
+        if not scene_info["ball_served"] or not self._is_coming(scene_info["ball_speed"][1]):
+            return None
+        return scene_info[f"platform_{self.side}"][0] + PLATFORM_WIDTH / 2
+
+    def simulate(self, scene_info, blocker_current_speed_x=0) -> ShadowPrediction:
+        """
+        從 scene_info 的狀態往前模擬，直到球到達自己平台的高度
+        """
+        if not scene_info["ball_served"]:
+            self._ball_served_frame = None
+            return ShadowPrediction(None, None)
+        frame = scene_info["frame"]
+        if self._ball_served_frame is None or self._ball_served_frame > frame:
+            # 沒有看到發球時，從第一個看到的幀開始計算加速
+            self._ball_served_frame = frame
+
+        ball_speed_x, ball_speed_y = scene_info["ball_speed"]
+        if not self._is_coming(ball_speed_y):
+            return ShadowPrediction(None, None)
+
+        ball = self._ball
+        ball.rect.x, ball.rect.y = scene_info["ball"]
+        ball.last_pos.topleft = ball.rect.topleft
+        ball._speed = [ball_speed_x, ball_speed_y]
+
+        blocker = self._blocker
+        blocker_pos = scene_info.get("blocker")
+        if blocker_pos and blocker_pos[1] == BLOCKER_Y_TOP:
+            blocker.rect.x, blocker.rect.y = blocker_pos
+            blocker._speed[0] = blocker_current_speed_x
+            sprites = (blocker,)
+        else:
+            # 非 HARD 模式的 scene_info 中 Blocker 是 (0, 0)，和遊戲一樣把 Blocker 放在畫面外
+            blocker.rect.y = 1000
+            blocker._speed[0] = 0
+            sprites = ()
+        platform_1P, platform_2P = self._platforms
+
+        if self.side == "1P":
+            line_y = PLATFORM_1P_Y - BALL_SIZE
+        else:
+            line_y = PLATFORM_2P_Y + PLATFORM_HEIGHT
+        frames_since_serve = frame - self._ball_served_frame
+
+        frames = 0
+        while frames < self.max_frames:
+            speed_x, speed_y = ball._speed
+            if not self._is_coming(speed_y):
+                # 被 Blocker 彈回，到不了自己的平台
+                return ShadowPrediction(None, None)
+
+            # --- 直線飛行的幀一次跳過 ---
+            if self.side == "1P":
+                frames_before_line = (line_y - 1 - ball.rect.y) // speed_y
+            else:
+                frames_before_line = (ball.rect.y - line_y - 1) // -speed_y
+            free_frames = min(
+                SPEED_UP_INTERVAL - 1 - (frames_since_serve + frames) % SPEED_UP_INTERVAL,
+                ball.frames_before_contact(sprites), frames_before_line, self.max_frames - frames)
+            if free_frames > 0:
+                ball.fast_forward(free_frames)
+                if blocker._speed[0]:
+                    blocker.fast_forward(free_frames)
+                frames += free_frames
+                continue
+
+            # --- 和 PingPongSimulation._update_frame 相同的順序更新一幀 ---
+            frames += 1
+            blocker.move()
+            if (frames_since_serve + frames) % SPEED_UP_INTERVAL == 0:
+                ball.speed_up()
+            ball.move()
+            ball.check_bouncing(platform_1P, platform_2P, blocker)
+
+            y = ball.rect.y
+            if (y >= line_y) if self.side == "1P" else (y <= line_y):
+                # 遊戲在這一幀判斷球是否被平台接住，接住時只修正球的 y，x 就是這一幀的位置
+                center = max(PLATFORM_WIDTH / 2, min(ball.rect.x + BALL_SIZE / 2, SCREEN_WIDTH - PLATFORM_WIDTH / 2))
+                return ShadowPrediction(center, frames)
+
+        return ShadowPrediction(None, None)
+
+    def _is_coming(self, ball_speed_y):
+        return ball_speed_y > 0 if self.side == "1P" else ball_speed_y < 0
@@ -0,0 +1,211 @@
+# ml/training_recorder.py
+"""
+以欄為單位 (columnar) 串流儲存訓練數據
+
+每一幀的數據是固定的 11 欄: 訓練使用的 9 個特徵 (FEATURE_KEYS)、指令和 side。
+數據先寫入預先配置的 NumPy 區塊，一回合確定要保存時才附加到每一欄各自的檔案，
+檔案只會附加不會改寫。訓練時用 np.memmap 直接映射每一欄，不需要逐筆解析 pickle。
+
+多個程序 (例如同時進行的多場比賽) 可能記錄到同一個資料夾，所以每個程序只寫入以程序 ID
+命名的分片 (shard) 子資料夾，不會有兩個程序附加同一個檔案。同一個程序中的所有 TrainingRecorder
+(每一回合或每個玩家各自建立的也一樣) 都附加到同一個分片，不會每次產生一組新的小檔案。
+
+資料夾結構:
+    schema.json                  欄位名稱和型別
+    <分片名稱>/<欄位名稱>.bin      該分片該欄的所有數據 (little-endian，依序排列)
+"""
+import json
+import os
+import threading
+
+import numpy as np
+
+# 和 pingpong_model_trainer 相同的特徵順序
+FEATURE_KEYS = (
+    "ball_x", "ball_y", "ball_speed_x", "ball_speed_y",
+    "platform_1P_x", "platform_2P_x", "blocker_x",
+    "predicted_center_calc",
+    "blocker_speed_x",
+)
+COMMANDS = ("MOVE_LEFT", "MOVE_RIGHT", "NONE")
+SIDES = ("1P", "2P")
+COLUMNS = tuple((key, "<f8") for key in FEATURE_KEYS) + (("command", "u1"), ("side", "u1"))
+
+SCHEMA_FILENAME = "schema.json"
+SCHEMA_VERSION = 1
+DEFAULT_CHUNK_SIZE = 4096
+
+# (程序 ID, 資料夾的絕對路徑) 對應這個程序寫入的 _Shard
+_shards = {}
+_shards_lock = threading.Lock()
+
+
+def _column_path(folder, name):
+    return os.path.join(folder, f"{name}.bin")
+
+
+def _write_schema(folder):
+    # 先寫到暫存檔再取代，其他程序不會讀到寫了一半的 schema.json
+    temp_path = os.path.join(folder, f"{SCHEMA_FILENAME}.{os.getpid()}.tmp")
+    with open(temp_path, "w") as f:
+        json.dump({"version": SCHEMA_VERSION, "columns": COLUMNS}, f)
+    os.replace(temp_path, os.path.join(folder, SCHEMA_FILENAME))
+
+
+def _check_schema(folder):
+    # 資料夾中沒有 schema.json 時回傳 False，不相容時拋出 ValueError
+    schema_path = os.path.join(folder, SCHEMA_FILENAME)
+    if not os.path.exists(schema_path):
+        return False
+    with open(schema_path) as f:
+        schema = json.load(f)
+    if schema.get("version") != SCHEMA_VERSION or [tuple(c) for c in schema.get("columns", ())] != list(COLUMNS):
+        raise ValueError(f"'{folder}' 中的訓練數據格式不相容。")
+    return True
+
+
+def _shard_folders(folder):
+    # 有數據的分片子資料夾，加上分片之前直接記錄在資料夾中的數據
+    shards = sorted(entry.path for entry in os.scandir(folder)
+                    if entry.is_dir() and os.path.exists(_column_path(entry.path, COLUMNS[0][0])))
+    if os.path.exists(_column_path(folder, COLUMNS[0][0])):
+        shards.insert(0, folder)
+    return shards
+
+
+def _num_complete_rows(folder):
+    # 寫入中斷時各欄的長度可能不同，只使用每一欄都寫完的列
+    return min(os.path.getsize(_column_path(folder, name)) // np.dtype(dtype).itemsize
+               if os.path.exists(_column_path(folder, name)) else 0
+               for name, dtype in COLUMNS)
+
+
+class _Shard:
+    """一個程序在一個資料夾中附加數據的分片，由同一個程序的 TrainingRecorder 共用"""
+
+    def __init__(self, folder):
+        # 程序 ID 只會在原本的程序結束後被重用，所以同名的分片不會同時被兩個程序寫入
+        self.folder = os.path.join(folder, f"shard_{os.getpid()}")
+        os.makedirs(self.folder, exist_ok=True)
+        # 截掉上次中斷時只寫了一部分的列
+        self.num_rows = _num_complete_rows(self.folder)
+        for name, dtype in COLUMNS:
+            with open(_column_path(self.folder, name), "ab") as f:
+                f.truncate(self.num_rows * np.dtype(dtype).itemsize)
+        # 不同執行緒的 commit 不能交錯寫入各欄
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def get(folder):
+        """取得這個程序在 folder 中的分片 (fork 出的子程序會建立自己的分片)"""
+        key = (os.getpid(), os.path.abspath(folder))
+        with _shards_lock:
+            shard = _shards.get(key)
+            if shard is None:
+                shard = _shards[key] = _Shard(folder)
+            return shard
+
+
+class TrainingRecorder:
+    """
+    把每一幀的數據記錄到一個資料夾
+
+    append 的數據先放在記憶體中的區塊，commit 時才寫入檔案，discard 時丟棄，
+    所以可以只保存獲勝局的數據。數據附加到這個程序的分片子資料夾，
+    同一個程序的 TrainingRecorder 共用分片，不同程序不會共用。
+    """
+
+    def __init__(self, folder, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Args:
+            folder: 儲存數據的資料夾，已有數據時接在後面
+            chunk_size: 每個區塊的列數
+        """
+        self.folder = folder
+        self.chunk_size = chunk_size
+        os.makedirs(folder, exist_ok=True)
+        if not _check_schema(folder):
+            _write_schema(folder)
+        self._shard = _Shard.get(folder)
+
+        self._chunks = [self._new_chunk()]
+        self._size = 0  # 目前區塊已使用的列數
+
+    @property
+    def shard_folder(self):
+        """這個程序寫入的分片子資料夾"""
+        return self._shard.folder
+
+    @property
+    def num_rows(self):
+        """分片中已 commit 的列數"""
+        return self._shard.num_rows
+
+    def __len__(self):
+        """尚未 commit 的列數"""
+        return (len(self._chunks) - 1) * self.chunk_size + self._size
+
+    def _new_chunk(self):
+        return {name: np.empty(self.chunk_size, dtype=dtype) for name, dtype in COLUMNS}
+
+    def append(self, features, command, side):
+        """
+        記錄一幀的數據
+        Args:
+            features: 特徵名稱對應數值的 dict，缺少的特徵記為 NaN
+            command: COMMANDS 之一
+            side: "1P" 或 "2P"
+        """
+        if self._size == self.chunk_size:
+            self._chunks.append(self._new_chunk())
+            self._size = 0
+        chunk, i = self._chunks[-1], self._size
+        for key in FEATURE_KEYS:
+            chunk[key][i] = features.get(key, np.nan)
+        chunk["command"][i] = COMMANDS.index(command)
+        chunk["side"][i] = SIDES.index(side)
+        self._size += 1
+
+    def commit(self):
+        """把尚未 commit 的列附加到檔案，回傳寫入的列數"""
+        num_rows = len(self)
+        if num_rows:
+            sizes = [self.chunk_size] * (len(self._chunks) - 1) + [self._size]
+            shard = self._shard
+            with shard.lock:
+                for name, _ in COLUMNS:
+                    with open(_column_path(shard.folder, name), "ab") as f:
+                        for chunk, size in zip(self._chunks, sizes):
+                            f.write(chunk[name][:size].tobytes())
+                shard.num_rows += num_rows
+        self.discard()
+        return num_rows
+
+    def discard(self):
+        """丟棄尚未 commit 的列"""
+        del self._chunks[1:]
+        self._size = 0
+
+
+def has_recorded_data(folder):
+    """資料夾中是否有 TrainingRecorder 記錄的數據"""
+    return _check_schema(folder)
+
+
+def load_recorded_data(folder):
+    """
+    用 np.memmap 唯讀映射資料夾中所有分片的數據
+    Returns:
+        每個有數據的分片一個 dict，把欄位名稱對應到一維陣列，
+        command 和 side 是 COMMANDS 和 SIDES 的索引
+    """
+    if not _check_schema(folder):
+        raise FileNotFoundError(f"'{folder}' 中沒有 {SCHEMA_FILENAME}。")
+    shards = []
+    for shard_folder in _shard_folders(folder):
+        num_rows = _num_complete_rows(shard_folder)
+        if num_rows:
+            shards.append({
+                name: np.memmap(_column_path(shard_folder, name), dtype=dtype, mode="r", shape=(num_rows,))
+                for name, dtype in COLUMNS})
+    return shards
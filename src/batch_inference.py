@@ -0,0 +1,117 @@
+"""
+The inference service batching the model predictions of many concurrent matches
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class BatchInferenceService:
+    """
+    Collect the feature vectors submitted by the matches, call `model.predict`
+    once on the batch, and send the predictions back to each match
+
+    A batch is predicted when it has `max_batch_size` rows, or when the first
+    pending request has waited for `max_delay` seconds, so no match is stalled
+    longer than that by waiting for the others.
+    """
+
+    def __init__(self, model, max_batch_size=512, max_delay=0.001):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.num_batches = 0
+        self.num_rows = 0
+
+        self._requests = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def submit(self, features) -> Future:
+        """
+        Submit the feature vectors in the shape (n, num_features)
+
+        @return A future of the predictions of the rows
+        """
+        future = Future()
+        self._requests.put((np.asarray(features), future))
+        return future
+
+    def predict(self, features):
+        """
+        Get the predictions of the feature vectors like `model.predict`,
+        blocking until the batch containing them is predicted
+        """
+        return self.submit(features).result()
+
+    def close(self):
+        """
+        Stop the service after the pending requests are predicted
+        """
+        self._requests.put(None)
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _serve(self):
+        is_closed = False
+        while not is_closed:
+            request = self._requests.get()
+            if request is None:
+                break
+
+            batch = [request]
+            num_rows = len(request[0])
+            deadline = time.perf_counter() + self.max_delay
+            while num_rows < self.max_batch_size:
+                timeout = deadline - time.perf_counter()
+                try:
+                    request = (self._requests.get(timeout=timeout) if timeout > 0
+                               else self._requests.get_nowait())
+                except queue.Empty:
+                    break
+                if request is None:
+                    is_closed = True
+                    break
+                batch.append(request)
+                num_rows += len(request[0])
+
+            self._predict_batch(batch)
+
+    def _predict_batch(self, batch):
+        try:
+            predictions = self.model.predict(np.concatenate([features for features, _ in batch]))
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        self.num_batches += 1
+        self.num_rows += len(predictions)
+        start = 0
+        for features, future in batch:
+            future.set_result(predictions[start:start + len(features)])
+            start += len(features)
+
+
+class BatchedModel:
+    """
+    The stand-in of a model for `MLPlay`, whose `predict` goes through the
+    `BatchInferenceService`
+
+    Set it as the model of an `MLPlay` object to share one service among matches
+    played in different threads.
+    """
+
+    def __init__(self, service: BatchInferenceService):
+        self._service = service
+
+    def predict(self, features):
+        return self._service.predict(features)
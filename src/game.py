@@ -1,186 +1,32 @@
-import random
-
-import pygame
-
-from mlgame.game.paia_game import PaiaGame, GameStatus, GameResultState
+from mlgame.game.paia_game import PaiaGame
 from mlgame.utils.enum import get_ai_name
-from mlgame.view.decorator import check_game_progress, check_game_result
+from mlgame.view.decorator import check_game_progress
 from mlgame.view.view_model import create_text_view_data, Scene, create_scene_progress_data
-from .game_object import (
-    Ball, Blocker, Platform, PlatformAction, SERVE_BALL_ACTIONS
-)
-
-DRAW_BALL_SPEED = 40
-
-
-class PingPong(PaiaGame):
-
-    def __init__(self, difficulty, game_over_score,user_num=2,init_vel=7,*args,**kwargs):
-        super().__init__(user_num=user_num)
-        self._difficulty = difficulty
-        self._score = [0, 0]
-        self._game_over_score = game_over_score
-        self._frame_count = 0
-        self._game_status = GameStatus.GAME_ALIVE
-        self._ball_served = False
-        self._ball_served_frame = 0
-        self._init_vel = init_vel
-        self.scene = Scene(width=200, height=500, color="#424242", bias_x=0, bias_y=0)
-        self._create_init_scene()
-    def _create_init_scene(self):
-        self._draw_group = pygame.sprite.RenderPlain()
-
-        enable_slice_ball = False if self._difficulty == "EASY" else True
-        self._ball = Ball(pygame.Rect(0, 0, 200, 500), enable_slice_ball, self._draw_group, init_vel=self._init_vel)
-        self._platform_1P = Platform((80, 420),
-                                     pygame.Rect(0, 0, 200, 500), "1P", self._draw_group)
-        self._platform_2P = Platform((80, 70),
-                                     pygame.Rect(0, 0, 200, 500), "2P", self._draw_group)
-
-        if self._difficulty != "HARD":
-            # Put the blocker at the end of the world
-            self._blocker = Blocker(1000, pygame.Rect(0, 0, 200, 500), self._draw_group)
-        else:
-            self._blocker = Blocker(240, pygame.Rect(0, 0, 200, 500), self._draw_group)
-
-        # Initialize the position of the ball
-        self._ball.stick_on_platform(self._platform_1P.rect, self._platform_2P.rect)
-
-    def update(self, commands):
-        ai_1p_cmd = commands[get_ai_name(0)]
-        ai_2p_cmd = commands[get_ai_name(1)]
-        command_1P = (PlatformAction(ai_1p_cmd)
-                      if ai_1p_cmd in PlatformAction.__members__ else PlatformAction.NONE)
-        command_2P = (PlatformAction(ai_2p_cmd)
-                      if ai_2p_cmd in PlatformAction.__members__ else PlatformAction.NONE)
-
-        self._frame_count += 1
-        self._platform_1P.move(command_1P)
-        self._platform_2P.move(command_2P)
-        self._blocker.move()
-
-        if not self._ball_served:
-            self._wait_for_serving_ball(command_1P, command_2P)
-        else:
-            self._ball_moving()
-
-        if self.get_game_status() != GameStatus.GAME_ALIVE:
-            if self._game_over(self.get_game_status()):
-                self._print_result()
-                self._game_status = GameStatus.GAME_OVER
-                return "QUIT"
-            return "RESET"
-
-        if not self.is_running:
-            return "QUIT"
-
-    def _game_over(self, status):
-        """
-        Check if the game is over
-        """
-        if status == GameStatus.GAME_1P_WIN:
-            self._score[0] += 1
-        elif status == GameStatus.GAME_2P_WIN:
-            self._score[1] += 1
-        else:  # Draw game
-            self._score[0] += 1
-            self._score[1] += 1
-
-        is_game_over = (self._score[0] == self._game_over_score or
-                        self._score[1] == self._game_over_score)
-
-        return is_game_over
-
-    def _print_result(self):
-        """
-        Print the result
-        """
-        if self._score[0] > self._score[1]:
-            win_side = "1P"
-        elif self._score[0] == self._score[1]:
-            win_side = "No one"
-        else:
-            win_side = "2P"
-
-        print("{} wins! Final score: {}-{}".format(win_side, *self._score))
-
-    def _wait_for_serving_ball(self, action_1P: PlatformAction, action_2P: PlatformAction):
-        self._ball.stick_on_platform(self._platform_1P.rect, self._platform_2P.rect)
-
-        target_action = action_1P if self._ball.serve_from_1P else action_2P
+from .game_object import Platform, PlatformAction
+from .simulation import PingPongSimulation
 
-        # Force to serve the ball after 150 frames
-        if (self._frame_count >= 150 and
-                target_action not in SERVE_BALL_ACTIONS):
-            target_action = random.choice(SERVE_BALL_ACTIONS)
+KEYFRAME_INTERVAL = 150
 
-        if target_action in SERVE_BALL_ACTIONS:
-            self._ball.serve(target_action)
-            self._ball_served = True
-            self._ball_served_frame = self._frame_count
 
-    def _ball_moving(self):
-        # Speed up the ball every 200 frames
-        if (self._frame_count - self._ball_served_frame) % 100 == 0:
-            # speed up per 100 frames
-            self._ball.speed_up()
+class PingPong(PingPongSimulation, PaiaGame):
+    """
+    The pingpong game for mlgame
 
-        self._ball.move()
-        self._ball.check_bouncing(self._platform_1P, self._platform_2P, self._blocker)
+    The game rules are in `PingPongSimulation`. This class adds the view data
+    for rendering and the keyboard control, which is the only part needing pygame.
+    """
 
-    def get_data_from_game_to_player(self) -> dict:
-        to_players_data = {}
-        scene_info = {
-            "frame": self._frame_count,
-            "status": self.get_game_status(),
-            "ball": self._ball.pos,
-            "ball_speed": self._ball.speed,
-            "ball_served":self._ball_served,
-            "serving_side":"1P" if self._ball.serve_from_1P else "2P",
-            "platform_1P": self._platform_1P.pos,
-            "platform_2P": self._platform_2P.pos
-        }
-
-        if self._difficulty == "HARD":
-            scene_info["blocker"] = self._blocker.pos
-        else:
-            scene_info["blocker"] = (0, 0)
-
-        to_players_data[get_ai_name(0)] = scene_info
-        to_players_data[get_ai_name(1)] = scene_info
-
-        return to_players_data
-
-    def get_game_status(self):
-        if self._ball.rect.top > self._platform_1P.rect.bottom:
-            self._game_status = GameStatus.GAME_2P_WIN
-        elif self._ball.rect.bottom < self._platform_2P.rect.top:
-            self._game_status = GameStatus.GAME_1P_WIN
-        elif abs(min(self._ball.speed, key=abs)) > DRAW_BALL_SPEED:
-            self._game_status = GameStatus.GAME_DRAW
-        else:
-            self._game_status = GameStatus.GAME_ALIVE
-
-        return self._game_status
-
-    def reset(self):
-        print("reset pingpong")
-        self._frame_count = 0
-        self._game_status = GameStatus.GAME_ALIVE
-        self._ball_served = False
-        self._ball_served_frame = 0
-        self._ball.reset()
-        self._platform_1P.reset()
-        self._platform_2P.reset()
-        self._blocker.reset()
-
-        # Initialize the position of the ball
-        self._ball.stick_on_platform(self._platform_1P.rect, self._platform_2P.rect)
+    def __init__(self, difficulty, game_over_score,user_num=2,init_vel=7,seed=None,
+                 keyframe_interval=KEYFRAME_INTERVAL,*args,**kwargs):
+        PaiaGame.__init__(self, user_num=user_num)
+        PingPongSimulation.__init__(self, difficulty, game_over_score, init_vel=init_vel, seed=seed)
+        self.scene = Scene(width=200, height=500, color="#424242", bias_x=0, bias_y=0)
 
-    @property
-    def is_running(self):
-        # print(self.get_game_status())
-        return self._game_status != GameStatus.GAME_OVER
+        # The states for `get_scene_progress_delta`
+        self._keyframe_interval = keyframe_interval
+        self._delta_count = 0
+        self._last_object_pos = []
+        self._last_text_values = ()
 
     def get_scene_init_data(self) -> dict:
         scene_init_data = {"scene": self.scene.__dict__, "assets": [
@@ -190,7 +36,8 @@ class PingPong(PaiaGame):
 
     @check_game_progress
     def get_scene_progress_data(self) -> dict:
-        game_obj_list = [obj.get_object_data for obj in self._draw_group]
+        game_obj_list = [obj.get_object_data for obj in
+                         (self._ball, self._platform_1P, self._platform_2P, self._blocker)]
 
         create_1p_score = create_text_view_data("1P: " + str(self._score[0]),
                                                 1,
@@ -216,70 +63,55 @@ class PingPong(PaiaGame):
                                                     foreground=foreground)
         return scene_progress
 
-    @check_game_result
-    def get_game_result(self) -> dict:
-        attachment = []
-        if self._score[0] > self._score[1]:
-            attachment = [
-                {
-                    "player": get_ai_name(0),
-                    "rank": 1,
-                    "score": self._score[0],
-                    "status": "GAME_PASS",
-                    "ball_speed": self._ball.speed,
-                },
-                {
-                    "player": get_ai_name(1),
-                    "rank": 2,
-                    "score": self._score[1],
-                    "status": "GAME_OVER",
-                    "ball_speed": self._ball.speed,
-                },
-
-            ]
-        elif self._score[0] < self._score[1]:
-            attachment = [
-                {
-                    "player": get_ai_name(0),
-                    "rank": 2,
-                    "score": self._score[0],
-                    "status": "GAME_OVER",
-                    "ball_speed": self._ball.speed,
-                },
-                {
-                    "player": get_ai_name(1),
-                    "rank": 1,
-                    "score": self._score[1],
-                    "status": "GAME_PASS",
-                    "ball_speed": self._ball.speed,
-
-                },
-            ]
-        else:
-            attachment = [
-                {
-                    "player": get_ai_name(0),
-                    "rank": 1,
-                    "score": self._score[0],
-                    "status": "GAME_DRAW",
-                    "ball_speed": self._ball.speed,
-                },
-                {
-                    "player": get_ai_name(1),
-                    "rank": 1,
-                    "score": self._score[1],
-                    "status": "GAME_DRAW",
-                    "ball_speed": self._ball.speed,
-                },
-            ]
-        return {
-            "frame_used": self._frame_count,
-            "state": GameResultState.FINISH,
-            "attachment": attachment
+    def get_scene_progress_delta(self) -> dict:
+        """
+        Get the scene progress data in the delta mode
 
-        }
+        Every `keyframe_interval` calls, a keyframe is emitted, which is the full data
+        of `get_scene_progress_data` with `"keyframe": True`. Otherwise, only the changed
+        fields of the objects in "object_list" and the texts in "foreground" are emitted,
+        keyed by their index. Use `apply_scene_progress_delta` to rebuild the full data.
+        """
+        game_objs = (self._ball, self._platform_1P, self._platform_2P, self._blocker)
+        text_values = (self._score[0], self._score[1], self._ball.speed)
+
+        is_keyframe = self._delta_count % self._keyframe_interval == 0
+        self._delta_count += 1
+        if is_keyframe:
+            self._last_object_pos = [obj.rect.topleft for obj in game_objs]
+            self._last_text_values = text_values
+            scene_progress = self.get_scene_progress_data()
+            scene_progress["keyframe"] = True
+            return scene_progress
+
+        object_delta = {}
+        for i, obj in enumerate(game_objs):
+            pos = obj.rect.topleft
+            last_pos = self._last_object_pos[i]
+            if pos != last_pos:
+                fields = {}
+                if pos[0] != last_pos[0]:
+                    fields["x"] = pos[0]
+                if pos[1] != last_pos[1]:
+                    fields["y"] = pos[1]
+                object_delta[i] = fields
+                self._last_object_pos[i] = pos
+
+        foreground_delta = {}
+        if text_values != self._last_text_values:
+            text_contents = ("1P: " + str(text_values[0]), "2P: " + str(text_values[1]),
+                             "Speed: " + str(text_values[2]))
+            for i, value in enumerate(text_values):
+                if value != self._last_text_values[i]:
+                    foreground_delta[i] = {"content": text_contents[i]}
+            self._last_text_values = text_values
+
+        return {"frame": self._frame_count, "keyframe": False,
+                "object_list": object_delta, "foreground": foreground_delta}
 
     def get_keyboard_command(self) -> dict:
+        import pygame
+
         cmd_1P = ""
         cmd_2P = ""
 
@@ -312,3 +144,22 @@ class PingPong(PaiaGame):
 
         return {ai_1p: cmd_1P, ai_2p: cmd_2P}
 
+
+def apply_scene_progress_delta(scene_progress, delta):
+    """
+    Rebuild the full scene progress data from the output of `PingPong.get_scene_progress_delta`
+
+    @param scene_progress The full data of the previous frame. It will be updated in place.
+           It can be None before receiving the first keyframe.
+    @param delta The delta or the keyframe of this frame
+    @return The full data of this frame
+    """
+    if delta["keyframe"]:
+        return delta
+
+    scene_progress["frame"] = delta["frame"]
+    for key in ("object_list", "foreground"):
+        for index, fields in delta[key].items():
+            # The index becomes a string if the delta is serialized to JSON
+            scene_progress[key][int(index)].update(fields)
+    return scene_progress
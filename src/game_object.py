@@ -1,10 +1,10 @@
 import random
 
-import pygame
-
-from mlgame.game import physics
 from mlgame.utils.enum import StringEnum, auto
 
+from . import physics
+from .rect import Rect
+
 PLATFORM_W = 40
 PLATFORM_H = 10
 
@@ -20,20 +20,19 @@ class PlatformAction(StringEnum):
 SERVE_BALL_ACTIONS = (PlatformAction.SERVE_TO_LEFT, PlatformAction.SERVE_TO_RIGHT)
 
 
-class Platform(pygame.sprite.Sprite):
+class Platform:
+    __slots__ = ("_play_area_rect", "_shift_speed", "_speed", "_init_pos", "rect", "_color")
+
     COLOR_1P = "#D6465C"  # Red
     COLOR_2P = "#5495FF"  # Blue
 
-    def __init__(self, init_pos: tuple, play_area_rect: pygame.Rect,
-                 side, *groups):
-        super().__init__(*groups)
-
+    def __init__(self, init_pos: tuple, play_area_rect: Rect, side):
         self._play_area_rect = play_area_rect
         self._shift_speed = 5
         self._speed = [0, 0]
         self._init_pos = init_pos
 
-        self.rect = pygame.Rect(*init_pos, PLATFORM_W, PLATFORM_H)
+        self.rect = Rect(*init_pos, PLATFORM_W, PLATFORM_H)
 
         if side == "1P":
             self._color = Platform.COLOR_1P
@@ -62,6 +61,33 @@ class Platform(pygame.sprite.Sprite):
 
         self.rect.move_ip(*self._speed)
 
+    def position_after(self, move_action: PlatformAction, num_frames):
+        """
+        Get the x position and the x speed after moving with the same action
+        for `num_frames` frames without changing the platform
+
+        The platform keeps moving until it reaches the border of the play area.
+        """
+        if move_action == PlatformAction.MOVE_LEFT:
+            distance = self.rect.left - self._play_area_rect.left
+            direction = -1
+        elif move_action == PlatformAction.MOVE_RIGHT:
+            distance = self._play_area_rect.right - self.rect.right
+            direction = 1
+        else:
+            return self.rect.x, 0
+
+        # The number of frames in which the border is not reached yet
+        num_moves = min(num_frames, max(0, -(-distance // self._shift_speed)))
+        speed_x = direction * self._shift_speed if num_moves == num_frames else 0
+        return self.rect.x + direction * self._shift_speed * num_moves, speed_x
+
+    def fast_forward(self, move_action: PlatformAction, num_frames):
+        """
+        Move the platform with the same action for `num_frames` frames at once
+        """
+        self.rect.x, self._speed[0] = self.position_after(move_action, num_frames)
+
     @property
     def get_object_data(self):
         return {"type": "rect",
@@ -73,15 +99,17 @@ class Platform(pygame.sprite.Sprite):
                 "color": self._color}
 
 
-class Blocker(pygame.sprite.Sprite):
-    def __init__(self, init_pos_y, play_area_rect: pygame.Rect, *groups):
-        super().__init__(*groups)
+class Blocker:
+    __slots__ = ("_rng", "_play_area_rect", "_speed", "rect", "_color")
 
+    def __init__(self, init_pos_y, play_area_rect: Rect, rng: random.Random = random):
+        # The random number generator of the match
+        self._rng = rng
         self._play_area_rect = play_area_rect
-        self._speed = [random.choice((5, -5)), 0]
+        self._speed = [self._rng.choice((5, -5)), 0]
 
-        self.rect = pygame.Rect(
-            random.randrange(0, play_area_rect.width - 10, 20), init_pos_y, 30, 20)
+        self.rect = Rect(
+            self._rng.randrange(0, play_area_rect.width - 10, 20), init_pos_y, 30, 20)
         # self.image = self._create_surface()
         self._color = "#D5E000"
 
@@ -90,11 +118,11 @@ class Blocker(pygame.sprite.Sprite):
         return self.rect.topleft
 
     def reset(self):
-        self.rect.x = random.randrange(0, self._play_area_rect.width - 10, 20)
-        self._speed = [random.choice((5, -5)), 0]
+        self.rect.x = self._rng.randrange(0, self._play_area_rect.width - 10, 20)
+        self._speed = [self._rng.choice((5, -5)), 0]
 
     def move(self):
-        self.rect.move_ip(self._speed)
+        self.rect.move_ip(*self._speed)
 
         if self.rect.left <= self._play_area_rect.left:
             self.rect.left = self._play_area_rect.left
@@ -103,6 +131,44 @@ class Blocker(pygame.sprite.Sprite):
             self.rect.right = self._play_area_rect.right
             self._speed[0] *= -1
 
+    def position_after(self, num_frames):
+        """
+        Get the x position and the x speed after `num_frames` frames
+        without changing the blocker
+        """
+        x, speed_x = self.rect.x, self._speed[0]
+        left = self._play_area_rect.left
+        span = self._play_area_rect.width - self.rect.width
+        shift = abs(speed_x)
+
+        # Move frame by frame until the blocker is aligned to the walls,
+        # which only happens at the first few frames after reset.
+        while num_frames > 0 and not (
+                span % shift == 0 and (x - left) % shift == 0 and 0 <= x - left <= span and
+                not (x == left and speed_x < 0) and not (x == left + span and speed_x > 0)):
+            x += speed_x
+            if x <= left:
+                x = left
+                speed_x *= -1
+            elif x + self.rect.width >= self._play_area_rect.right:
+                x = self._play_area_rect.right - self.rect.width
+                speed_x *= -1
+            num_frames -= 1
+
+        # The blocker bounces between the walls in a period of `2 * span`,
+        # so the position on the unfolded route decides the position and the direction.
+        route_pos = x - left if speed_x > 0 else 2 * span - (x - left)
+        route_pos = (route_pos + shift * num_frames) % (2 * span)
+        if route_pos < span:
+            return left + route_pos, shift
+        return left + 2 * span - route_pos, -shift
+
+    def fast_forward(self, num_frames):
+        """
+        Move the blocker for `num_frames` frames at once
+        """
+        self.rect.x, self._speed[0] = self.position_after(num_frames)
+
     @property
     def get_object_data(self):
         return {"type": "rect",
@@ -114,22 +180,28 @@ class Blocker(pygame.sprite.Sprite):
                 "color": self._color}
 
 
-class Ball(pygame.sprite.Sprite):
-    def __init__(self, play_area_rect: pygame.Rect, enable_slide_ball: bool, *groups, init_vel=7):
-        super().__init__(*groups)
+class Ball:
+    __slots__ = ("_init_vel", "_play_area_rect", "_speed", "_size", "_do_slide_ball",
+                 "serve_from_1P", "rect", "_color", "last_pos")
+
+    # The physics functions used in `check_bouncing`.
+    # It is replaced by the profiler when the game is profiled.
+    _physics = physics
+
+    def __init__(self, play_area_rect: Rect, enable_slide_ball: bool, init_vel=7):
         self._init_vel = init_vel
         self._play_area_rect = play_area_rect
         self._speed = [0, 0]
-        self._size = [5, 5]
+        self._size = (5, 5)
         self._do_slide_ball = enable_slide_ball
 
         self.serve_from_1P = True
 
-        self.rect = pygame.Rect(0, 0, *self._size)
+        self.rect = Rect(0, 0, *self._size)
         # self.image = self._create_surface()
         self._color = "#42E27E"
         # Used in additional collision detection
-        self.last_pos = pygame.Rect(self.rect)
+        self.last_pos = self.rect.copy()
 
     @property
     def pos(self):
@@ -171,7 +243,49 @@ class Ball(pygame.sprite.Sprite):
 
     def move(self):
         self.last_pos.topleft = self.rect.topleft
-        self.rect.move_ip(self._speed)
+        self.rect.move_ip(*self._speed)
+
+    def fast_forward(self, num_frames):
+        """
+        Move the ball without bouncing for `num_frames` frames at once
+        """
+        self.last_pos.topleft = (self.rect.x + self._speed[0] * (num_frames - 1),
+                                 self.rect.y + self._speed[1] * (num_frames - 1))
+        self.rect.move_ip(self._speed[0] * num_frames, self._speed[1] * num_frames)
+
+    def frames_before_contact(self, sprites):
+        """
+        Get the number of the following frames in which the ball surely doesn't
+        contact the border of the play area or any of `sprites`
+
+        The sprites only move horizontally, so the ball can't contact a sprite
+        if the vertical range swept by the ball doesn't overlap the sprite.
+        """
+        x, y = self.rect.x, self.rect.y
+        width, height = self.rect.width, self.rect.height
+        speed_x, speed_y = self._speed
+        area = self._play_area_rect
+        num_frames = []
+
+        if speed_x > 0:
+            num_frames.append((area.right - width - x - 1) // speed_x)
+        elif speed_x < 0:
+            num_frames.append((x - area.left - 1) // -speed_x)
+
+        if speed_y > 0:
+            num_frames.append((area.bottom - height - y - 1) // speed_y)
+            for sprite in sprites:
+                # Skip the sprite above the ball
+                if y <= sprite.rect.bottom:
+                    num_frames.append((sprite.rect.top - height - y - 1) // speed_y)
+        elif speed_y < 0:
+            num_frames.append((y - area.top - 1) // -speed_y)
+            for sprite in sprites:
+                # Skip the sprite below the ball
+                if y + height >= sprite.rect.top:
+                    num_frames.append((y - sprite.rect.bottom - 1) // -speed_y)
+
+        return max(0, min(num_frames, default=0))
 
     def speed_up(self):
         self._speed[0] += 1 if self._speed[0] > 0 else -1
@@ -181,16 +295,16 @@ class Ball(pygame.sprite.Sprite):
                        blocker: Blocker):
         # If the ball hits the play_area, adjust the position first
         # and preserve the speed after bouncing.
-        hit_box = physics.rect_break_or_contact_box(self.rect, self._play_area_rect)
+        hit_box = self._physics.rect_break_or_contact_box(self.rect, self._play_area_rect)
         if hit_box:
             self.rect, speed_after_hit_box = (
-                physics.bounce_in_box(self.rect, self._speed, self._play_area_rect))
+                self._physics.bounce_in_box(self.rect, self._speed, self._play_area_rect))
 
         # If the ball hits the specified sprites, adjust the position again
         # and preserve the speed after bouncing.
         hit_sprite = self._check_ball_hit_sprites((platform_1p, platform_2p, blocker))
         if hit_sprite:
-            self.rect, speed_after_bounce = physics.bounce_off(
+            self.rect, speed_after_bounce = self._physics.bounce_off(
                 self.rect, self._speed,
                 hit_sprite.rect, hit_sprite._speed)
 
@@ -217,7 +331,7 @@ class Ball(pygame.sprite.Sprite):
                 Return None, if none of them is hit by the ball.
         """
         for sprite in sprites:
-            if physics.moving_collide_or_contact(self, sprite):
+            if self._physics.moving_collide_or_contact(self, sprite):
                 return sprite
 
         return None
@@ -0,0 +1,232 @@
+"""
+The pygame-free port of the helper functions in `mlgame.game.physics` used by the game
+
+The points are plain (x, y) tuples and the rects are `src.rect.Rect`.
+"""
+import math
+
+from .rect import Rect
+
+
+def moving_collide_or_contact(moving_sprite, sprite) -> bool:
+    """
+    Check if the moving sprite collides or contacts another sprite.
+
+    @param moving_sprite The object that moves in the scene.
+           It must contain `rect` and `last_pos` attributes, which both are `Rect`.
+    @param sprite The object that will be collided or contacted by `moving_sprite`.
+           It must contain `rect` attribute, which is also `Rect`.
+    """
+    # Generate the routine of 4 corners of the moving sprite
+    move_rect = moving_sprite.rect
+    move_last_pos = moving_sprite.last_pos
+    routines = (
+        (move_last_pos.topleft, move_rect.topleft),
+        (move_last_pos.topright, move_rect.topright),
+        (move_last_pos.bottomleft, move_rect.bottomleft),
+        (move_last_pos.bottomright, move_rect.bottomright)
+    )
+
+    # Check any of routines collides the rect
+    ## Take the bottom and right into account
+    rect_expanded = sprite.rect.inflate(1, 1)
+    for routine in routines:
+        # Exclude the case that the `moving_sprite` goes from the surface of `sprite`
+        if (not rect_expanded.collidepoint(routine[0]) and
+                rect_collideline(sprite.rect, routine)):
+            return True
+
+    return False
+
+
+def line_intersect(line_a, line_b) -> bool:
+    """
+    Check if two line segments intersect
+
+    @param line_a A tuple (point, point) representing both end points
+           of line segment
+    @param line_b Same as `line_a`
+    """
+    # line_a and line_b have the same end point
+    if (line_a[0] == line_b[0] or
+            line_a[1] == line_b[0] or
+            line_a[0] == line_b[1] or
+            line_a[1] == line_b[1]):
+        return True
+
+    # See `mlgame.game.physics.line_intersect` for the derivation
+    v0_x, v0_y = line_a[1][0] - line_a[0][0], line_a[1][1] - line_a[0][1]
+    v1_x, v1_y = line_b[1][0] - line_b[0][0], line_b[1][1] - line_b[0][1]
+    det = v0_x * v1_y - v0_y * v1_x
+    # Two line segments are parallel
+    if det == 0:
+        return False
+
+    du_x, du_y = line_a[0][0] - line_b[0][0], line_a[0][1] - line_b[0][1]
+    s_det = v1_x * du_y - v1_y * du_x
+    t_det = v0_x * du_y - v0_y * du_x
+
+    if ((det > 0 and 0 <= s_det <= det and 0 <= t_det <= det) or
+            (det < 0 and det <= s_det <= 0 and det <= t_det <= 0)):
+        return True
+
+    return False
+
+
+def rect_collideline(rect: Rect, line) -> bool:
+    """
+    Check if line segment intersects with a rect
+
+    @param rect The Rect of the target rectangle
+    @param line A tuple (point, point) representing both end points
+           of line segment
+    """
+    # Either of line ends is in the target rect.
+    rect_expanded = rect.inflate(1, 1)  # Take the bottom and right line into account
+    if rect_expanded.collidepoint(line[0]) or rect_expanded.collidepoint(line[1]):
+        return True
+
+    line_top = (rect.topleft, rect.topright)
+    line_bottom = (rect.bottomleft, rect.bottomright)
+    line_left = (rect.topleft, rect.bottomleft)
+    line_right = (rect.topright, rect.bottomright)
+
+    return (line_intersect(line_top, line) or
+            line_intersect(line_bottom, line) or
+            line_intersect(line_left, line) or
+            line_intersect(line_right, line))
+
+
+def rect_break_or_contact_box(rect: Rect, box: Rect):
+    """
+    Determine if the `rect` breaks the `box` or it contacts the border of `box`
+
+    @param rect The Rect of the target rectangle
+    @param box The target box
+    """
+    return (
+        rect.left <= box.left or
+        rect.right >= box.right or
+        rect.top <= box.top or
+        rect.bottom >= box.bottom)
+
+
+def bounce_off_ip(bounce_obj_rect: Rect, bounce_obj_speed,
+                  hit_obj_rect: Rect, hit_obj_speed):
+    """
+    Calculate the speed and position of the `bounce_obj` after it bounces off the `hit_obj`.
+    The position of `bounce_obj_rect` and the value of `bounce_obj_speed` will be updated.
+
+    This function should be called only when two objects are colliding.
+
+    @param bounce_obj_rect The Rect of the bouncing object
+    @param bounce_obj_speed The 2D speed vector of the bouncing object.
+    @param hit_obj_rect The Rect of the hit object
+    @param hit_obj_speed The 2D speed vector of the hit object
+    """
+    # Treat the hit object as an unmovable object
+    speed_diff_x = bounce_obj_speed[0] - hit_obj_speed[0]
+    speed_diff_y = bounce_obj_speed[1] - hit_obj_speed[1]
+
+    # The relative position between top and bottom, and left and right
+    # of two objects at the last frame
+    rect_diff_bT_hB = hit_obj_rect.bottom - bounce_obj_rect.top + speed_diff_y
+    rect_diff_bB_hT = hit_obj_rect.top - bounce_obj_rect.bottom + speed_diff_y
+    rect_diff_bL_hR = hit_obj_rect.right - bounce_obj_rect.left + speed_diff_x
+    rect_diff_bR_hL = hit_obj_rect.left - bounce_obj_rect.right + speed_diff_x
+
+    # Get the surface distance from the bouncing object to the hit object
+    # and the new position for the bouncing object if it really hit the object
+    # according to their relative position
+    ## The bouncing object is at the bottom
+    if rect_diff_bT_hB < 0 and rect_diff_bB_hT < 0:
+        surface_diff_y = rect_diff_bT_hB
+        extract_pos_y = hit_obj_rect.bottom
+    ## The bouncing object is at the top
+    elif rect_diff_bT_hB > 0 and rect_diff_bB_hT > 0:
+        surface_diff_y = rect_diff_bB_hT
+        extract_pos_y = hit_obj_rect.top - bounce_obj_rect.height
+    else:
+        surface_diff_y = -1 if speed_diff_y > 0 else 1
+        extract_pos_y = bounce_obj_rect.y
+
+    ## The bouncing object is at the right
+    if rect_diff_bL_hR < 0 and rect_diff_bR_hL < 0:
+        surface_diff_x = rect_diff_bL_hR
+        extract_pos_x = hit_obj_rect.right
+    ## The bouncing object is at the left
+    elif rect_diff_bL_hR > 0 and rect_diff_bR_hL > 0:
+        surface_diff_x = rect_diff_bR_hL
+        extract_pos_x = hit_obj_rect.left - bounce_obj_rect.width
+    else:
+        surface_diff_x = -1 if speed_diff_x > 0 else 1
+        extract_pos_x = bounce_obj_rect.x
+
+    # Calculate the duration to hit the surface for x and y coordination.
+    # It never hits the surface along the axis with zero relative speed, so the
+    # other axis decides the bounce.
+    time_hit_y = surface_diff_y / speed_diff_y if speed_diff_y else -math.inf
+    time_hit_x = surface_diff_x / speed_diff_x if speed_diff_x else -math.inf
+
+    if time_hit_y >= 0 and time_hit_y >= time_hit_x:
+        bounce_obj_speed[1] *= -1
+        bounce_obj_rect.y = extract_pos_y
+
+    if time_hit_x >= 0 and time_hit_y <= time_hit_x:
+        bounce_obj_speed[0] *= -1
+        bounce_obj_rect.x = extract_pos_x
+
+
+def bounce_off(bounce_obj_rect: Rect, bounce_obj_speed,
+               hit_obj_rect: Rect, hit_obj_speed):
+    """
+    The alternative version of `bounce_off_ip`. The function returns the result
+    instead of updating the value of `bounce_obj_rect` and `bounce_obj_speed`.
+
+    @return A tuple (`new_bounce_obj_rect`, `new_bounce_obj_speed`)
+    """
+    new_bounce_obj_rect = bounce_obj_rect.copy()
+    new_bounce_obj_speed = bounce_obj_speed.copy()
+
+    bounce_off_ip(new_bounce_obj_rect, new_bounce_obj_speed,
+                  hit_obj_rect, hit_obj_speed)
+
+    return new_bounce_obj_rect, new_bounce_obj_speed
+
+
+def bounce_in_box_ip(bounce_obj_rect: Rect, bounce_obj_speed, box_rect: Rect):
+    """
+    Bounce the object if it hits the border of the box.
+    The speed and the position of the `bounce_obj` will be updated.
+
+    @param bounce_obj_rect The Rect of the bouncing object
+    @param bounce_obj_speed The 2D speed vector of the bouncing object.
+    """
+    if bounce_obj_rect.left <= box_rect.left:
+        bounce_obj_rect.left = box_rect.left
+        bounce_obj_speed[0] *= -1
+    elif bounce_obj_rect.right >= box_rect.right:
+        bounce_obj_rect.right = box_rect.right
+        bounce_obj_speed[0] *= -1
+
+    if bounce_obj_rect.top <= box_rect.top:
+        bounce_obj_rect.top = box_rect.top
+        bounce_obj_speed[1] *= -1
+    elif bounce_obj_rect.bottom >= box_rect.bottom:
+        bounce_obj_rect.bottom = box_rect.bottom
+        bounce_obj_speed[1] *= -1
+
+
+def bounce_in_box(bounce_obj_rect: Rect, bounce_obj_speed, box_rect: Rect):
+    """
+    The alternative version of `bounce_in_box_ip`. The function returns the result
+    instead of updating the value of `bounce_obj_rect` and `bounce_obj_speed`.
+
+    @return A tuple (new_bounce_obj_rect, new_bounce_obj_speed)
+    """
+    new_bounce_obj_rect = bounce_obj_rect.copy()
+    new_bounce_obj_speed = bounce_obj_speed.copy()
+
+    bounce_in_box_ip(new_bounce_obj_rect, new_bounce_obj_speed, box_rect)
+
+    return new_bounce_obj_rect, new_bounce_obj_speed
@@ -0,0 +1,142 @@
+"""
+The opt-in profiler of the phases of the game update
+"""
+import json
+from functools import wraps
+from time import perf_counter_ns
+from types import SimpleNamespace
+
+from . import physics
+
+# The physics functions called by `Ball.check_bouncing`
+PHYSICS_PHASES = (
+    "rect_break_or_contact_box", "bounce_in_box", "moving_collide_or_contact", "bounce_off")
+
+
+class PhaseProfiler:
+    """
+    Record the number of calls and the histogram of the time of each phase
+
+    The phases are timed by replacing the class of the instances with a subclass
+    having the timed methods, so the game is not slowed down if it is not profiled.
+    The time is put into the power-of-two buckets in nanoseconds.
+    """
+
+    def __init__(self):
+        # {phase: [num_calls, total_ns, min_ns, max_ns, {bucket: count}]}
+        self._phases = {}
+        # The (object, original class) replaced by `instrument`
+        self._instrumented = []
+
+    def record(self, phase, elapsed_ns):
+        stats = self._phases.get(phase)
+        if stats is None:
+            stats = self._phases[phase] = [0, 0, elapsed_ns, elapsed_ns, {}]
+        stats[0] += 1
+        stats[1] += elapsed_ns
+        if elapsed_ns < stats[2]:
+            stats[2] = elapsed_ns
+        if elapsed_ns > stats[3]:
+            stats[3] = elapsed_ns
+        bucket = elapsed_ns.bit_length()
+        stats[4][bucket] = stats[4].get(bucket, 0) + 1
+
+    def timed(self, phase, func, after=None):
+        """
+        Get the wrapper of `func` recording the time of each call as `phase`
+
+        @param after The function called with the return value of `func` after
+               the time is recorded, which is not included in the time
+        """
+        record = self.record
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = perf_counter_ns()
+            try:
+                result = func(*args, **kwargs)
+            finally:
+                record(phase, perf_counter_ns() - start)
+            if after is not None:
+                after(result)
+            return result
+
+        return wrapper
+
+    def instrument(self, obj, methods, after=None, **attributes):
+        """
+        Replace the methods of `obj` with the timed wrappers
+
+        The class of `obj` is replaced instead of setting the attributes
+        on the instance, so that it also works with the classes using `__slots__`.
+
+        @param obj The object to be profiled
+        @param methods A dict mapping the method name to the phase
+        @param after The function called with the return value after each timed call
+        @param attributes The other class attributes to be overridden
+        """
+        cls = type(obj)
+        namespace = {name: self.timed(phase, getattr(cls, name), after) for name, phase in methods.items()}
+        namespace.update(attributes)
+        if hasattr(cls, "__slots__"):
+            namespace["__slots__"] = ()
+        obj.__class__ = type(cls.__name__, (cls,), namespace)
+        self._instrumented.append((obj, cls))
+
+    def instrument_game(self, game, after_update=None):
+        """
+        Time the phases of `PingPongSimulation.update` and the data for the players
+        and the view of `game`
+
+        `step_n` is timed as its own phase. The frames advanced by it are not
+        counted as "update", but its "Platform.move", "Blocker.move" and
+        "Ball.check_bouncing" of the frames updated one by one are counted.
+        The frames skipped by its event-driven fast-forward are not counted in any phase.
+
+        @param after_update The function called with the return value of `update`
+               and `step_n` after their time is recorded
+        """
+        self.instrument(game._platform_1P, {"move": "Platform.move"})
+        self.instrument(game._platform_2P, {"move": "Platform.move"})
+        self.instrument(game._blocker, {"move": "Blocker.move"})
+        self.instrument(game._ball, {"check_bouncing": "Ball.check_bouncing"},
+                        _physics=SimpleNamespace(**{
+                            name: self.timed("physics." + name, getattr(physics, name))
+                            for name in PHYSICS_PHASES}))
+        self.instrument(game, {
+            name: name for name in ("update", "step_n")
+            if hasattr(game, name)}, after_update)
+        self.instrument(game, {
+            name: name for name in ("get_game_status", "get_data_from_game_to_player",
+                                    "get_scene_progress_data")
+            if hasattr(game, name)})
+
+    def restore(self):
+        """
+        Remove the timed wrappers installed by `instrument`
+        """
+        for obj, cls in reversed(self._instrumented):
+            obj.__class__ = cls
+        self._instrumented.clear()
+
+    def to_dict(self) -> dict:
+        """
+        Get the statistics of the phases
+
+        The key of the histogram is the upper bound of the bucket in nanoseconds.
+        """
+        return {
+            phase: {
+                "calls": num_calls,
+                "total_ns": total_ns,
+                "mean_ns": total_ns / num_calls,
+                "min_ns": min_ns,
+                "max_ns": max_ns,
+                "histogram": {str(1 << bucket): count for bucket, count in sorted(histogram.items())},
+            }
+            for phase, (num_calls, total_ns, min_ns, max_ns, histogram) in self._phases.items()
+        }
+
+    def export_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
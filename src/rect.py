@@ -0,0 +1,109 @@
+"""
+A lightweight rectangle which behaves like `pygame.Rect` for the game simulation
+"""
+
+
+class Rect:
+    """
+    The integer rectangle storing the top-left position and the size
+
+    Only the subset of `pygame.Rect` used by the game objects is provided,
+    so that the simulation doesn't need to import pygame.
+    """
+    __slots__ = ("x", "y", "width", "height")
+
+    def __init__(self, x, y, width, height):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+
+    def __repr__(self):
+        return "<Rect({}, {}, {}, {})>".format(self.x, self.y, self.width, self.height)
+
+    def __eq__(self, other):
+        return (isinstance(other, Rect) and
+                (self.x, self.y, self.width, self.height) ==
+                (other.x, other.y, other.width, other.height))
+
+    @property
+    def left(self):
+        return self.x
+
+    @left.setter
+    def left(self, value):
+        self.x = value
+
+    @property
+    def right(self):
+        return self.x + self.width
+
+    @right.setter
+    def right(self, value):
+        self.x = value - self.width
+
+    @property
+    def top(self):
+        return self.y
+
+    @top.setter
+    def top(self, value):
+        self.y = value
+
+    @property
+    def bottom(self):
+        return self.y + self.height
+
+    @bottom.setter
+    def bottom(self, value):
+        self.y = value - self.height
+
+    @property
+    def centerx(self):
+        return self.x + self.width // 2
+
+    @centerx.setter
+    def centerx(self, value):
+        self.x = value - self.width // 2
+
+    @property
+    def topleft(self):
+        return self.x, self.y
+
+    @topleft.setter
+    def topleft(self, value):
+        self.x, self.y = value
+
+    @property
+    def topright(self):
+        return self.x + self.width, self.y
+
+    @property
+    def bottomleft(self):
+        return self.x, self.y + self.height
+
+    @property
+    def bottomright(self):
+        return self.x + self.width, self.y + self.height
+
+    def copy(self):
+        return Rect(self.x, self.y, self.width, self.height)
+
+    def move_ip(self, x, y):
+        self.x += x
+        self.y += y
+
+    def inflate(self, x, y):
+        """
+        Get a new rect with the size changed by (x, y) around the center.
+        The offset is truncated toward zero like `pygame.Rect.inflate`.
+        """
+        return Rect(self.x - int(x / 2), self.y - int(y / 2),
+                    self.width + x, self.height + y)
+
+    def collidepoint(self, point):
+        """
+        Check if the point is in the rect. The right and bottom border are excluded.
+        """
+        return (self.x <= point[0] < self.x + self.width and
+                self.y <= point[1] < self.y + self.height)
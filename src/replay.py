@@ -0,0 +1,118 @@
+"""
+The compact binary replay format of the pingpong game
+
+A replay file is a fixed-size header followed by fixed-width frame records,
+so the reader can memory-map the file and seek to any frame directly.
+"""
+import mmap
+import struct
+from collections import namedtuple
+
+from mlgame.game.paia_game import GameStatus
+from .game_object import PlatformAction
+
+MAGIC = b"PPRP"
+VERSION = 1
+
+# magic, version, record size, difficulty, init_vel, game_over_score, has seed, seed
+HEADER = struct.Struct("<4sHHBHHBq")
+# frame, ball x, ball y, ball speed x, ball speed y, platform 1P x, platform 2P x,
+# blocker x, command 1P, command 2P, status, ball served
+RECORD = struct.Struct("<IhhhhhhhBBBB")
+
+DIFFICULTIES = ("EASY", "NORMAL", "HARD")
+# The commands and the status are stored as the index in these tuples
+ACTIONS = tuple(PlatformAction)
+STATUSES = (GameStatus.GAME_ALIVE, GameStatus.GAME_1P_WIN, GameStatus.GAME_2P_WIN,
+            GameStatus.GAME_DRAW, GameStatus.GAME_OVER)
+
+ReplayFrame = namedtuple("ReplayFrame", (
+    "frame", "ball_x", "ball_y", "ball_speed_x", "ball_speed_y",
+    "platform_1P_x", "platform_2P_x", "blocker_x",
+    "command_1P", "command_2P", "status", "ball_served"))
+
+
+class ReplayRecorder:
+    """
+    Write the frame records of a match to a replay file
+    """
+
+    def __init__(self, path, difficulty, init_vel, game_over_score, seed=None):
+        self._file = open(path, "wb")
+        self._file.write(HEADER.pack(
+            MAGIC, VERSION, RECORD.size, DIFFICULTIES.index(difficulty), init_vel, game_over_score,
+            seed is not None, seed if seed is not None else 0))
+        self._action_index = {action: i for i, action in enumerate(ACTIONS)}
+        self._status_index = {status: i for i, status in enumerate(STATUSES)}
+
+    def record(self, game, command_1P: PlatformAction, command_2P: PlatformAction):
+        """
+        Write the record of the frame just updated by `game`
+        """
+        ball = game._ball
+        self._file.write(RECORD.pack(
+            game._frame_count, ball.rect.x, ball.rect.y, ball._speed[0], ball._speed[1],
+            game._platform_1P.rect.x, game._platform_2P.rect.x, game._blocker.rect.x,
+            self._action_index[command_1P], self._action_index[command_2P],
+            self._status_index[game._game_status], game._ball_served))
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ReplayReader:
+    """
+    Read a replay file by memory-mapping it
+
+    The frames are accessed by the index in the file, like `reader[i]` or iterating
+    the reader, without loading the whole file. The values of the commands and the
+    status in a `ReplayFrame` are the indices in `ACTIONS` and `STATUSES`.
+    """
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, version, record_size, difficulty, self.init_vel, self.game_over_score,
+         has_seed, seed) = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            self.close()
+            raise ValueError("'{}' is not a supported replay file".format(path))
+
+        self.difficulty = DIFFICULTIES[difficulty]
+        self.seed = seed if has_seed else None
+        self._num_frames = (len(self._mmap) - HEADER.size) // RECORD.size
+
+    def __len__(self):
+        return self._num_frames
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._num_frames
+        if not 0 <= index < self._num_frames:
+            raise IndexError("replay frame index out of range")
+        return ReplayFrame._make(RECORD.unpack_from(self._mmap, HEADER.size + index * RECORD.size))
+
+    def __iter__(self):
+        records = memoryview(self._mmap)[HEADER.size:HEADER.size + self._num_frames * RECORD.size]
+        try:
+            for record in RECORD.iter_unpack(records):
+                yield ReplayFrame._make(record)
+        finally:
+            records.release()
+
+    def close(self):
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,230 @@
+"""
+The shared-memory transport of the scene info and the commands between
+the game process and the AI processes
+
+The game writes the scene info of each frame into a fixed-layout ring buffer
+once, and both AI processes read it from the shared memory without pickling.
+Each AI writes its command back into its own slot of the same frame.
+"""
+import os
+import struct
+import time
+from multiprocessing import shared_memory
+
+from mlgame.utils.enum import get_ai_name
+from .game_object import PlatformAction
+from .replay import ACTIONS, STATUSES
+
+# The sequence number of a slot, which is written after the content of the slot
+SEQ = struct.Struct("<q")
+# frame, status, ball served, serving from 1P, ball x, ball y, ball speed x, ball speed y,
+# platform 1P x, platform 1P y, platform 2P x, platform 2P y, blocker x, blocker y
+OBSERVATION = struct.Struct("<iBBBxiiiiiiiiii")
+# The command is the index in `ACTIONS`
+COMMAND = struct.Struct("<B7x")
+OBSERVATION_SLOT_SIZE = SEQ.size + OBSERVATION.size
+COMMAND_SLOT_SIZE = SEQ.size + COMMAND.size
+
+# The frame of the observation telling the AIs to stop
+STOP_FRAME = -1
+# The sequence number of a slot being written
+WRITING = -1
+
+NUM_PLAYERS = 2
+_ACTION_CODES = {action.value: i for i, action in enumerate(ACTIONS)}
+_NONE_CODE = _ACTION_CODES[PlatformAction.NONE.value]
+_STATUS_CODES = {status: i for i, status in enumerate(STATUSES)}
+# `time.sleep(0)` doesn't give up the time slice on Linux, but `os.sched_yield` is
+# not available on Windows
+_yield_cpu = getattr(os, "sched_yield", lambda: time.sleep(0))
+
+
+class SharedMemoryTransport:
+    """
+    The ring buffer of the observations and the commands in a shared memory block
+
+    The block has `num_slots` observation slots followed by `num_slots` command
+    slots for each player. A slot starts with its sequence number, which is set to
+    `WRITING` while the content is written and to the frame sequence after that.
+    """
+
+    def __init__(self, name=None, num_slots=4, create=True):
+        """
+        @param name The name of the shared memory block. A new name is generated if
+               it is None and `create` is True.
+        @param num_slots The number of the frames in the ring buffer
+        @param create Create a new block in the game process, or attach to the existing
+               block in the AI process
+        """
+        self.num_slots = num_slots
+        self._command_offset = OBSERVATION_SLOT_SIZE * num_slots
+        size = self._command_offset + COMMAND_SLOT_SIZE * NUM_PLAYERS * num_slots
+        if create:
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        else:
+            try:
+                # Only the game process owns the block, so the AI processes
+                # don't register it to the resource tracker (Python >= 3.13)
+                self._shm = shared_memory.SharedMemory(name=name, track=False)
+            except TypeError:
+                self._shm = shared_memory.SharedMemory(name=name)
+        self._is_owner = create
+        self._buf = self._shm.buf
+
+        if create:
+            for offset in range(0, self._command_offset, OBSERVATION_SLOT_SIZE):
+                SEQ.pack_into(self._buf, offset, WRITING)
+            for offset in range(self._command_offset, size, COMMAND_SLOT_SIZE):
+                SEQ.pack_into(self._buf, offset, WRITING)
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    def _command_slot(self, player, seq):
+        return self._command_offset + (player * self.num_slots + seq % self.num_slots) * COMMAND_SLOT_SIZE
+
+    def publish(self, seq, scene_info):
+        """
+        Write the scene info of the frame `seq` for both players. Called by the game.
+        """
+        offset = seq % self.num_slots * OBSERVATION_SLOT_SIZE
+        SEQ.pack_into(self._buf, offset, WRITING)
+        OBSERVATION.pack_into(
+            self._buf, offset + SEQ.size,
+            scene_info["frame"], _STATUS_CODES[scene_info["status"]],
+            scene_info["ball_served"], scene_info["serving_side"] == "1P",
+            *scene_info["ball"], *scene_info["ball_speed"],
+            *scene_info["platform_1P"], *scene_info["platform_2P"], *scene_info["blocker"])
+        SEQ.pack_into(self._buf, offset, seq)
+
+    def stop(self, seq):
+        """
+        Tell the AIs to stop at the frame `seq`. Called by the game.
+        """
+        offset = seq % self.num_slots * OBSERVATION_SLOT_SIZE
+        SEQ.pack_into(self._buf, offset, WRITING)
+        OBSERVATION.pack_into(self._buf, offset + SEQ.size, STOP_FRAME, *[0] * 13)
+        SEQ.pack_into(self._buf, offset, seq)
+
+    def wait_commands(self, seq, timeout=None) -> dict:
+        """
+        Wait for the commands of both players of the frame `seq`. Called by the game.
+
+        @return A dict mapping the ai name to the command
+        """
+        commands = {}
+        for player in range(NUM_PLAYERS):
+            offset = self._command_slot(player, seq)
+            _wait_for_seq(self._buf, offset, seq, timeout)
+            commands[get_ai_name(player)] = ACTIONS[COMMAND.unpack_from(self._buf, offset + SEQ.size)[0]].value
+        return commands
+
+    def read_observation(self, seq, timeout=None):
+        """
+        Wait for the observation of the frame `seq`. Called by the AIs.
+
+        @return A tuple of the fields of `OBSERVATION`, or None if the game is stopped
+        """
+        offset = seq % self.num_slots * OBSERVATION_SLOT_SIZE
+        _wait_for_seq(self._buf, offset, seq, timeout)
+        observation = OBSERVATION.unpack_from(self._buf, offset + SEQ.size)
+        if observation[0] == STOP_FRAME:
+            return None
+        return observation
+
+    def send_command(self, player, seq, command):
+        """
+        Write the command of the player of the frame `seq`. Called by the AIs.
+
+        @param player The index of the player. 0 for 1P, 1 for 2P.
+        @param command The command returned by `MLPlay.update`.
+               The command not in `PlatformAction` is sent as "NONE".
+        """
+        offset = self._command_slot(player, seq)
+        SEQ.pack_into(self._buf, offset, WRITING)
+        COMMAND.pack_into(self._buf, offset + SEQ.size, _ACTION_CODES.get(command, _NONE_CODE))
+        SEQ.pack_into(self._buf, offset, seq)
+
+    def close(self):
+        # Release the view before closing the shared memory
+        self._buf = None
+        self._shm.close()
+        if self._is_owner:
+            self._shm.unlink()
+
+
+def to_scene_info(observation) -> dict:
+    """
+    Convert the observation read by `read_observation` to the scene info dict
+    used by `MLPlay.update`
+    """
+    (frame, status, ball_served, serve_from_1P, ball_x, ball_y, ball_speed_x, ball_speed_y,
+     platform_1P_x, platform_1P_y, platform_2P_x, platform_2P_y, blocker_x, blocker_y) = observation
+    return {
+        "frame": frame,
+        "status": STATUSES[status],
+        "ball": (ball_x, ball_y),
+        "ball_speed": (ball_speed_x, ball_speed_y),
+        "ball_served": bool(ball_served),
+        "serving_side": "1P" if serve_from_1P else "2P",
+        "platform_1P": (platform_1P_x, platform_1P_y),
+        "platform_2P": (platform_2P_x, platform_2P_y),
+        "blocker": (blocker_x, blocker_y),
+    }
+
+
+def _wait_for_seq(buf, offset, seq, timeout):
+    deadline = None if timeout is None else time.perf_counter() + timeout
+    while SEQ.unpack_from(buf, offset)[0] != seq:
+        if deadline is not None and time.perf_counter() > deadline:
+            raise TimeoutError("timed out waiting for the frame {}".format(seq))
+        # Yield the CPU to the other processes
+        _yield_cpu()
+
+
+def host_match(game, transport, timeout=None):
+    """
+    Play a match of `game` with the AIs connected to `transport`, in the same
+    order as the mlgame executor
+
+    @return The number of the updated frames
+    """
+    seq = 0
+    num_frames = 0
+    while True:
+        transport.publish(seq, game.get_data_from_game_to_player()[get_ai_name(0)])
+        result = game.update(transport.wait_commands(seq, timeout))
+        seq += 1
+        num_frames += 1
+
+        if result in ("RESET", "QUIT"):
+            # Send the final scene info of the round, and the AIs will be reset
+            transport.publish(seq, game.get_data_from_game_to_player()[get_ai_name(0)])
+            transport.wait_commands(seq, timeout)
+            seq += 1
+            if result == "QUIT":
+                break
+            game.reset()
+
+    transport.stop(seq)
+    return num_frames
+
+
+def serve_ai(transport, player, ai, timeout=None):
+    """
+    Drive the `MLPlay` object with the observations from `transport`
+    until the game is stopped. It is run in the AI process.
+
+    @param player The index of the player. 0 for 1P, 1 for 2P.
+    """
+    seq = 0
+    while True:
+        observation = transport.read_observation(seq, timeout)
+        if observation is None:
+            break
+        scene_info = to_scene_info(observation)
+        transport.send_command(player, seq, ai.update(scene_info, []))
+        if scene_info["status"] != "GAME_ALIVE":
+            ai.reset()
+        seq += 1
@@ -0,0 +1,462 @@
+import random
+
+from mlgame.game.paia_game import GameStatus, GameResultState
+from mlgame.utils.enum import get_ai_name
+from mlgame.view.decorator import check_game_result
+from .game_object import (
+    Ball, Blocker, Platform, PlatformAction, SERVE_BALL_ACTIONS
+)
+from .rect import Rect
+from .profiler import PhaseProfiler
+from .replay import ReplayRecorder
+
+DRAW_BALL_SPEED = 40
+
+
+class PingPongSimulation:
+    """
+    The pure simulation of the pingpong game without pygame and rendering
+
+    It can be used directly by the headless workers, and `PingPong` adds
+    the view data and the keyboard control on top of it.
+    """
+
+    def __init__(self, difficulty, game_over_score, init_vel=7, seed=None, *args, **kwargs):
+        """
+        @param seed The seed of the random number generator of this match.
+               The match can be replayed exactly from the seed and the commands.
+               Use a random seed if it is None.
+        """
+        self._difficulty = difficulty
+        self._score = [0, 0]
+        self._game_over_score = game_over_score
+        self._frame_count = 0
+        self._game_status = GameStatus.GAME_ALIVE
+        self._ball_served = False
+        self._ball_served_frame = 0
+        self._init_vel = init_vel
+        self._seed = seed
+        self._random = random.Random(seed)
+        self._create_init_scene()
+        # The cached state of `_random` for `snapshot`.
+        # It is set to None whenever `_random` is used.
+        self._random_state = None
+        self._replay_recorder = None
+        self._profiler = None
+        self._profile_path = None
+        # The status and the data to the players of the current frame.
+        # They are computed at most once per frame, and set to None whenever
+        # the game objects are changed.
+        self._frame_status = None
+        self._observation = None
+
+    @property
+    def seed(self):
+        return self._seed
+
+    def record_replay(self, path):
+        """
+        Record the following frames to a replay file, which can be read by `ReplayReader`
+
+        @param path The path of the replay file
+        """
+        self.close_replay()
+        self._replay_recorder = ReplayRecorder(
+            path, self._difficulty, self._init_vel, self._game_over_score, self._seed)
+
+    def close_replay(self):
+        """
+        Stop recording the replay and close the replay file
+        """
+        if self._replay_recorder is not None:
+            self._replay_recorder.close()
+            self._replay_recorder = None
+
+    def _create_init_scene(self):
+        enable_slice_ball = False if self._difficulty == "EASY" else True
+        # The play area is never changed, so the game objects share it
+        play_area_rect = Rect(0, 0, 200, 500)
+        self._ball = Ball(play_area_rect, enable_slice_ball, init_vel=self._init_vel)
+        self._platform_1P = Platform((80, 420), play_area_rect, "1P")
+        self._platform_2P = Platform((80, 70), play_area_rect, "2P")
+
+        if self._difficulty != "HARD":
+            # Put the blocker at the end of the world
+            self._blocker = Blocker(1000, play_area_rect, self._random)
+        else:
+            self._blocker = Blocker(240, play_area_rect, self._random)
+
+        # Initialize the position of the ball
+        self._ball.stick_on_platform(self._platform_1P.rect, self._platform_2P.rect)
+
+    @property
+    def profiler(self):
+        return self._profiler
+
+    def enable_profiling(self, output_path=None):
+        """
+        Record the time and the number of calls of the phases of `update`
+
+        @param output_path Export the profile as JSON to this path when the game is over.
+               It is exported after the time of the last `update` or `step_n` is recorded.
+        @return The `PhaseProfiler` recording the phases
+        """
+        self.disable_profiling()
+        self._profiler = PhaseProfiler()
+        self._profiler.instrument_game(self, self._export_profile_if_over)
+        self._profile_path = output_path
+        return self._profiler
+
+    def _export_profile_if_over(self, _):
+        # `_game_status` may be overwritten by `get_game_status` in `step_n`, so check the score
+        if self._profile_path is not None and self._game_over_score in self._score:
+            self._profiler.export_json(self._profile_path)
+
+    def disable_profiling(self):
+        if self._profiler is not None:
+            self._profiler.restore()
+            self._profiler = None
+            self._profile_path = None
+
+    def update(self, commands):
+        command_1P, command_2P = self._parse_commands(commands)
+        result = self._update_frame(command_1P, command_2P)
+        if self._replay_recorder is not None:
+            self._replay_recorder.record(self, command_1P, command_2P)
+        return result
+
+    def step_n(self, commands, n, record_frames=True, event_driven=False):
+        """
+        Advance up to `n` frames with the same commands in one call
+
+        It stops early after the frame in which the round is ended ("RESET")
+        or the game is over ("QUIT"), so the caller can handle it like `update`.
+
+        @param commands The commands of both players used in every frame
+        @param n The maximum number of frames to advance
+        @param record_frames Whether to record the summary of each frame
+        @param event_driven Whether to skip the frames in which the ball flies
+               freely to the next collision or speed-up frame at once.
+               The results are exactly the same as advancing frame by frame.
+               No frame is skipped while recording the replay.
+        @return A tuple (result, scene_info, frame_summaries).
+                `result` is the return value of the last frame as `update`,
+                `scene_info` is the data to the players after the last frame, and
+                `frame_summaries` is a list of the tuples (frame, ball_x, ball_y,
+                ball_speed_x, ball_speed_y, platform_1P_x, platform_2P_x, blocker_x)
+                of each frame, which is empty if `record_frames` is False.
+        """
+        command_1P, command_2P = self._parse_commands(commands)
+        ball, platform_1P, platform_2P, blocker = (
+            self._ball, self._platform_1P, self._platform_2P, self._blocker)
+        frame_summaries = []
+        result = None
+        event_driven = event_driven and self._replay_recorder is None
+        while n > 0:
+            num_free_frames = min(self._free_flight_frames(), n) if event_driven else 0
+            if num_free_frames > 0:
+                if record_frames:
+                    frame_summaries.extend(
+                        self._free_flight_summaries(command_1P, command_2P, num_free_frames))
+                self._fast_forward(command_1P, command_2P, num_free_frames)
+                n -= num_free_frames
+                continue
+
+            result = self._update_frame(command_1P, command_2P)
+            n -= 1
+            if self._replay_recorder is not None:
+                self._replay_recorder.record(self, command_1P, command_2P)
+            if record_frames:
+                frame_summaries.append((
+                    self._frame_count, ball.rect.x, ball.rect.y, ball._speed[0], ball._speed[1],
+                    platform_1P.rect.x, platform_2P.rect.x, blocker.rect.x))
+            if result is not None:
+                break
+
+        return result, self.get_data_from_game_to_player(), frame_summaries
+
+    def _free_flight_frames(self):
+        """
+        Get the number of the following frames in which the ball moves in a straight
+        line without collision, speed-up or ending the round
+        """
+        if not self._ball_served:
+            return 0
+
+        # The ball is sped up every 100 frames after serving
+        frames_before_speed_up = 99 - (self._frame_count - self._ball_served_frame) % 100
+        return min(frames_before_speed_up, self._ball.frames_before_contact(
+            (self._platform_1P, self._platform_2P, self._blocker)))
+
+    def _free_flight_summaries(self, command_1P, command_2P, num_frames):
+        ball_x, ball_y = self._ball.pos
+        speed_x, speed_y = self._ball.speed
+        return [(self._frame_count + i, ball_x + speed_x * i, ball_y + speed_y * i, speed_x, speed_y,
+                 self._platform_1P.position_after(command_1P, i)[0],
+                 self._platform_2P.position_after(command_2P, i)[0],
+                 self._blocker.position_after(i)[0])
+                for i in range(1, num_frames + 1)]
+
+    def _fast_forward(self, command_1P, command_2P, num_frames):
+        self._frame_status = None
+        self._observation = None
+        self._frame_count += num_frames
+        self._platform_1P.fast_forward(command_1P, num_frames)
+        self._platform_2P.fast_forward(command_2P, num_frames)
+        self._blocker.fast_forward(num_frames)
+        self._ball.fast_forward(num_frames)
+
+    def _parse_commands(self, commands):
+        ai_1p_cmd = commands[get_ai_name(0)]
+        ai_2p_cmd = commands[get_ai_name(1)]
+        command_1P = (PlatformAction(ai_1p_cmd)
+                      if ai_1p_cmd in PlatformAction.__members__ else PlatformAction.NONE)
+        command_2P = (PlatformAction(ai_2p_cmd)
+                      if ai_2p_cmd in PlatformAction.__members__ else PlatformAction.NONE)
+        return command_1P, command_2P
+
+    def _update_frame(self, command_1P: PlatformAction, command_2P: PlatformAction):
+        self._frame_status = None
+        self._observation = None
+        self._frame_count += 1
+        self._platform_1P.move(command_1P)
+        self._platform_2P.move(command_2P)
+        self._blocker.move()
+
+        if not self._ball_served:
+            self._wait_for_serving_ball(command_1P, command_2P)
+        else:
+            self._ball_moving()
+
+        status = self.get_game_status()
+        if status != GameStatus.GAME_ALIVE:
+            if self._game_over(status):
+                self._print_result()
+                self._game_status = GameStatus.GAME_OVER
+                return "QUIT"
+            return "RESET"
+
+        if not self.is_running:
+            return "QUIT"
+
+    def _game_over(self, status):
+        """
+        Check if the game is over
+        """
+        if status == GameStatus.GAME_1P_WIN:
+            self._score[0] += 1
+        elif status == GameStatus.GAME_2P_WIN:
+            self._score[1] += 1
+        else:  # Draw game
+            self._score[0] += 1
+            self._score[1] += 1
+
+        is_game_over = (self._score[0] == self._game_over_score or
+                        self._score[1] == self._game_over_score)
+
+        return is_game_over
+
+    def _print_result(self):
+        """
+        Print the result
+        """
+        if self._score[0] > self._score[1]:
+            win_side = "1P"
+        elif self._score[0] == self._score[1]:
+            win_side = "No one"
+        else:
+            win_side = "2P"
+
+        print("{} wins! Final score: {}-{}".format(win_side, *self._score))
+
+    def _wait_for_serving_ball(self, action_1P: PlatformAction, action_2P: PlatformAction):
+        self._ball.stick_on_platform(self._platform_1P.rect, self._platform_2P.rect)
+
+        target_action = action_1P if self._ball.serve_from_1P else action_2P
+
+        # Force to serve the ball after 150 frames
+        if (self._frame_count >= 150 and
+                target_action not in SERVE_BALL_ACTIONS):
+            target_action = self._random.choice(SERVE_BALL_ACTIONS)
+            self._random_state = None
+
+        if target_action in SERVE_BALL_ACTIONS:
+            self._ball.serve(target_action)
+            self._ball_served = True
+            self._ball_served_frame = self._frame_count
+
+    def _ball_moving(self):
+        # Speed up the ball every 200 frames
+        if (self._frame_count - self._ball_served_frame) % 100 == 0:
+            # speed up per 100 frames
+            self._ball.speed_up()
+
+        self._ball.move()
+        self._ball.check_bouncing(self._platform_1P, self._platform_2P, self._blocker)
+
+    def get_data_from_game_to_player(self) -> dict:
+        """
+        Get the scene info of the current frame for both players
+
+        The data is built once per frame, and both players share the same dict.
+        """
+        if self._observation is not None:
+            return self._observation
+
+        scene_info = {
+            "frame": self._frame_count,
+            "status": self.get_game_status(),
+            "ball": self._ball.pos,
+            "ball_speed": self._ball.speed,
+            "ball_served":self._ball_served,
+            "serving_side":"1P" if self._ball.serve_from_1P else "2P",
+            "platform_1P": self._platform_1P.pos,
+            "platform_2P": self._platform_2P.pos
+        }
+
+        if self._difficulty == "HARD":
+            scene_info["blocker"] = self._blocker.pos
+        else:
+            scene_info["blocker"] = (0, 0)
+
+        self._observation = {get_ai_name(0): scene_info, get_ai_name(1): scene_info}
+        return self._observation
+
+    def get_game_status(self):
+        status = self._frame_status
+        if status is None:
+            ball_rect = self._ball.rect
+            ball_speed = self._ball._speed
+            if ball_rect.y > self._platform_1P.rect.bottom:
+                status = GameStatus.GAME_2P_WIN
+            elif ball_rect.bottom < self._platform_2P.rect.y:
+                status = GameStatus.GAME_1P_WIN
+            # The draw game if the slower speed component exceeds the limit
+            elif abs(ball_speed[0]) > DRAW_BALL_SPEED and abs(ball_speed[1]) > DRAW_BALL_SPEED:
+                status = GameStatus.GAME_DRAW
+            else:
+                status = GameStatus.GAME_ALIVE
+            self._frame_status = status
+
+        self._game_status = status
+        return status
+
+    def reset(self):
+        print("reset pingpong")
+        self._frame_count = 0
+        self._game_status = GameStatus.GAME_ALIVE
+        self._ball_served = False
+        self._ball_served_frame = 0
+        self._ball.reset()
+        self._platform_1P.reset()
+        self._platform_2P.reset()
+        self._blocker.reset()
+        self._random_state = None
+        self._frame_status = None
+        self._observation = None
+
+        # Initialize the position of the ball
+        self._ball.stick_on_platform(self._platform_1P.rect, self._platform_2P.rect)
+
+    def snapshot(self):
+        """
+        Capture the state of the match in a flat tuple for `restore`
+
+        The speed of the platforms and the last position of the ball are not
+        included, because they are overwritten before being used in `update`.
+        """
+        if self._random_state is None:
+            self._random_state = self._random.getstate()
+
+        ball = self._ball
+        return (ball.rect.x, ball.rect.y, ball._speed[0], ball._speed[1], ball.serve_from_1P,
+                self._platform_1P.rect.x, self._platform_2P.rect.x,
+                self._blocker.rect.x, self._blocker._speed[0],
+                self._frame_count, self._ball_served, self._ball_served_frame,
+                self._score[0], self._score[1], self._game_status,
+                self._random_state)
+
+    def restore(self, state):
+        """
+        Restore the state captured by `snapshot` in place without creating game objects
+        """
+        ball = self._ball
+        (ball.rect.x, ball.rect.y, ball._speed[0], ball._speed[1], ball.serve_from_1P,
+         self._platform_1P.rect.x, self._platform_2P.rect.x,
+         self._blocker.rect.x, self._blocker._speed[0],
+         self._frame_count, self._ball_served, self._ball_served_frame,
+         self._score[0], self._score[1], self._game_status,
+         random_state) = state
+        self._frame_status = None
+        self._observation = None
+        if random_state is not self._random_state:
+            self._random.setstate(random_state)
+            self._random_state = random_state
+
+    @property
+    def is_running(self):
+        # print(self.get_game_status())
+        return self._game_status != GameStatus.GAME_OVER
+
+    @check_game_result
+    def get_game_result(self) -> dict:
+        attachment = []
+        if self._score[0] > self._score[1]:
+            attachment = [
+                {
+                    "player": get_ai_name(0),
+                    "rank": 1,
+                    "score": self._score[0],
+                    "status": "GAME_PASS",
+                    "ball_speed": self._ball.speed,
+                },
+                {
+                    "player": get_ai_name(1),
+                    "rank": 2,
+                    "score": self._score[1],
+                    "status": "GAME_OVER",
+                    "ball_speed": self._ball.speed,
+                },
+
+            ]
+        elif self._score[0] < self._score[1]:
+            attachment = [
+                {
+                    "player": get_ai_name(0),
+                    "rank": 2,
+                    "score": self._score[0],
+                    "status": "GAME_OVER",
+                    "ball_speed": self._ball.speed,
+                },
+                {
+                    "player": get_ai_name(1),
+                    "rank": 1,
+                    "score": self._score[1],
+                    "status": "GAME_PASS",
+                    "ball_speed": self._ball.speed,
+
+                },
+            ]
+        else:
+            attachment = [
+                {
+                    "player": get_ai_name(0),
+                    "rank": 1,
+                    "score": self._score[0],
+                    "status": "GAME_DRAW",
+                    "ball_speed": self._ball.speed,
+                },
+                {
+                    "player": get_ai_name(1),
+                    "rank": 1,
+                    "score": self._score[1],
+                    "status": "GAME_DRAW",
+                    "ball_speed": self._ball.speed,
+                },
+            ]
+        return {
+            "frame_used": self._frame_count,
+            "state": GameResultState.FINISH,
+            "attachment": attachment
+
+        }
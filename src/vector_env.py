@@ -0,0 +1,96 @@
+"""
+The Gymnasium-style vectorized environment of the pingpong game for RL experiments
+"""
+import numpy as np
+
+from .vector_game import (
+    VectorPingPong, STATUS_1P_WIN, STATUS_2P_WIN, STATUS_ALIVE
+)
+
+# The columns of the observation array, in the same units as the scene info
+OBSERVATION_FIELDS = (
+    "frame", "ball_x", "ball_y", "ball_speed_x", "ball_speed_y", "ball_served",
+    "serve_from_1P", "platform_1P_x", "platform_2P_x", "blocker_x", "blocker_speed_x")
+
+
+class VectorPingPongEnv:
+    """
+    The vectorized environment of `num_envs` matches stepped in lockstep
+
+    The action of each match is a pair of integer action codes of 1P and 2P,
+    which is the index in `PlatformAction`. An episode is a round, which is
+    reset automatically like `PingPong.reset` when it is ended. The observation
+    after the last frame of a round is the initial observation of the next round,
+    and the observation of the last frame is given in `info["final_observation"]`
+    like the Gymnasium vector environments.
+
+    The returned arrays are preallocated and overwritten by the next `step`,
+    so copy them if they are kept.
+    """
+
+    def __init__(self, num_envs, difficulty="HARD", game_over_score=3, init_vel=7, seed=None):
+        self.num_envs = num_envs
+        self._is_hard = difficulty == "HARD"
+        self._game = VectorPingPong(num_envs, difficulty, game_over_score, init_vel, seed)
+
+        self._observations = np.zeros((num_envs, len(OBSERVATION_FIELDS)), dtype=np.float32)
+        # The rewards of 1P and 2P: 1 for winning the round, -1 for losing it
+        self._rewards = np.zeros((num_envs, 2), dtype=np.float32)
+        self._terminated = np.zeros(num_envs, dtype=bool)
+        # The matches are never truncated
+        self._truncated = np.zeros(num_envs, dtype=bool)
+
+    @property
+    def game(self) -> VectorPingPong:
+        return self._game
+
+    def reset(self, seed=None):
+        """
+        Restart all the matches
+
+        @return A tuple (observations, info)
+        """
+        self._game.reset(seed)
+        return self._observe(), {}
+
+    def step(self, actions):
+        """
+        Advance all the matches by one frame
+
+        @param actions An integer array in the shape (num_envs, 2) of the action codes
+               of 1P and 2P
+        @return A tuple (observations, rewards, terminated, truncated, info).
+                `rewards` is in the shape (num_envs, 2), and `terminated` tells if
+                the round is ended. `info` has the status codes of the frame and
+                whether the match is over. If any round is ended, `info` also has
+                "final_observation", a copy of the observations after this frame
+                before the reset, and "_final_observation", the mask of its valid rows.
+        """
+        actions = np.asarray(actions)
+        status = self._game.update(actions[:, 0], actions[:, 1], auto_reset=False)
+
+        rewards = self._rewards
+        rewards[:, 0] = (status == STATUS_1P_WIN)
+        rewards[:, 0] -= (status == STATUS_2P_WIN)
+        np.negative(rewards[:, 0], out=rewards[:, 1])
+        np.not_equal(status, STATUS_ALIVE, out=self._terminated)
+
+        info = {"status": status, "game_over": self._game.game_over}
+        if self._terminated.any():
+            info["final_observation"] = self._observe().copy()
+            info["_final_observation"] = self._terminated.copy()
+            self._game.reset_ended()
+        return self._observe(), rewards, self._terminated, self._truncated, info
+
+    def _observe(self):
+        game = self._game
+        observations = self._observations
+        columns = (game.frame_count, game.ball_x, game.ball_y, game.ball_speed_x, game.ball_speed_y,
+                   game.ball_served, game.serve_from_1P, game.platform_1P_x, game.platform_2P_x)
+        for i, column in enumerate(columns):
+            observations[:, i] = column
+        # The blocker is only shown on HARD, like the scene info
+        if self._is_hard:
+            observations[:, len(columns)] = game.blocker_x
+            observations[:, len(columns) + 1] = game.blocker_speed_x
+        return observations
@@ -0,0 +1,390 @@
+import numpy as np
+
+from mlgame.game.paia_game import GameStatus
+from .simulation import DRAW_BALL_SPEED
+from .game_object import PLATFORM_W, PLATFORM_H, PlatformAction
+
+AREA_W = 200
+AREA_H = 500
+BALL_SIZE = 5
+BLOCKER_W = 30
+BLOCKER_H = 20
+PLATFORM_SHIFT_SPEED = 5
+BLOCKER_SPEED = 5
+PLATFORM_1P_INIT_POS = (80, 420)
+PLATFORM_2P_INIT_POS = (80, 70)
+BLOCKER_INIT_X_CHOICES = np.arange(0, AREA_W - 10, 20)
+
+# The integer code of an action is its index in `PlatformAction`
+ACTIONS = tuple(PlatformAction)
+(ACTION_SERVE_TO_LEFT, ACTION_SERVE_TO_RIGHT,
+ ACTION_MOVE_LEFT, ACTION_MOVE_RIGHT, ACTION_NONE) = range(len(ACTIONS))
+
+STATUSES = (GameStatus.GAME_ALIVE, GameStatus.GAME_1P_WIN,
+            GameStatus.GAME_2P_WIN, GameStatus.GAME_DRAW)
+STATUS_ALIVE, STATUS_1P_WIN, STATUS_2P_WIN, STATUS_DRAW = range(len(STATUSES))
+
+
+def encode_actions(commands):
+    """
+    Convert the command strings to the integer action codes.
+    Unknown commands are treated as `PlatformAction.NONE`.
+    """
+    return np.array([ACTIONS.index(cmd) if cmd in PlatformAction.__members__ else ACTION_NONE
+                     for cmd in commands], dtype=np.int8)
+
+
+class VectorPingPong:
+    """
+    Step `num_matches` pingpong matches in lockstep
+
+    The state of every match is kept in NumPy arrays indexed by the match, and
+    each call of `update` advances all of them by one frame with the same rules
+    as `PingPong.update`. A round which is ended is reset like `PingPong.reset`,
+    and a match which reaches `game_over_score` is restarted as a new match.
+    """
+
+    def __init__(self, num_matches, difficulty, game_over_score, init_vel=7, seed=None):
+        self.num_matches = num_matches
+        self._difficulty = difficulty
+        self._game_over_score = game_over_score
+        self._init_vel = init_vel
+        self._enable_slice_ball = difficulty != "EASY"
+        # Put the blocker at the end of the world if it is not used
+        self._blocker_y = 240 if difficulty == "HARD" else 1000
+        self._rng = np.random.default_rng(seed)
+
+        n = num_matches
+        self.frame_count = np.zeros(n, dtype=np.int64)
+        self.ball_served = np.zeros(n, dtype=bool)
+        self.ball_served_frame = np.zeros(n, dtype=np.int64)
+        self.serve_from_1P = np.ones(n, dtype=bool)
+        self.ball_x = np.zeros(n, dtype=np.int64)
+        self.ball_y = np.zeros(n, dtype=np.int64)
+        self.ball_speed_x = np.zeros(n, dtype=np.int64)
+        self.ball_speed_y = np.zeros(n, dtype=np.int64)
+        self.platform_1P_x = np.zeros(n, dtype=np.int64)
+        self.platform_2P_x = np.zeros(n, dtype=np.int64)
+        self.platform_1P_speed_x = np.zeros(n, dtype=np.int64)
+        self.platform_2P_speed_x = np.zeros(n, dtype=np.int64)
+        self.blocker_x = np.zeros(n, dtype=np.int64)
+        self.blocker_speed_x = np.zeros(n, dtype=np.int64)
+        self.score = np.zeros((n, 2), dtype=np.int64)
+        # The result of the last `update`
+        self.status = np.zeros(n, dtype=np.int8)
+        self.game_over = np.zeros(n, dtype=bool)
+        self.final_score = np.zeros((n, 2), dtype=np.int64)
+        # The rounds ended in the last `update` but not reset yet
+        self._reset_pending = np.zeros(n, dtype=bool)
+
+        self._new_match(np.ones(n, dtype=bool))
+
+    def reset(self, seed=None):
+        """
+        Restart all the matches
+
+        @param seed Reseed the random number generator if it is not None
+        """
+        if seed is not None:
+            self._rng = np.random.default_rng(seed)
+        self._new_match(np.ones(self.num_matches, dtype=bool))
+
+    def _new_match(self, mask):
+        self.score[mask] = 0
+        self.serve_from_1P[mask] = True
+        self._reset_round_state(mask)
+
+    def _reset_round(self, mask):
+        # Change side next time
+        self.serve_from_1P[mask] = ~self.serve_from_1P[mask]
+        self._reset_round_state(mask)
+
+    def _reset_round_state(self, mask):
+        self.frame_count[mask] = 0
+        self.ball_served[mask] = False
+        self.ball_served_frame[mask] = 0
+        self.ball_speed_x[mask] = 0
+        self.ball_speed_y[mask] = 0
+        self.platform_1P_x[mask] = PLATFORM_1P_INIT_POS[0]
+        self.platform_2P_x[mask] = PLATFORM_2P_INIT_POS[0]
+        self.platform_1P_speed_x[mask] = 0
+        self.platform_2P_speed_x[mask] = 0
+
+        num_reset = np.count_nonzero(mask)
+        self.blocker_x[mask] = self._rng.choice(BLOCKER_INIT_X_CHOICES, num_reset)
+        self.blocker_speed_x[mask] = self._rng.choice((BLOCKER_SPEED, -BLOCKER_SPEED), num_reset)
+
+        self._stick_on_platform(mask)
+
+    def _stick_on_platform(self, mask):
+        platform_x = np.where(self.serve_from_1P, self.platform_1P_x, self.platform_2P_x)
+        ball_y = np.where(self.serve_from_1P,
+                          PLATFORM_1P_INIT_POS[1] - BALL_SIZE, PLATFORM_2P_INIT_POS[1] + PLATFORM_H)
+        # Align the center of the ball to the center of the platform
+        np.copyto(self.ball_x, platform_x + PLATFORM_W // 2 - BALL_SIZE // 2, where=mask)
+        np.copyto(self.ball_y, ball_y, where=mask)
+
+    def update(self, actions_1P, actions_2P, auto_reset=True):
+        """
+        Advance all the matches by one frame
+
+        @param actions_1P An integer array of the action codes of 1P
+        @param actions_2P An integer array of the action codes of 2P
+        @param auto_reset Whether to reset the ended rounds in this call. If it is False,
+               the state after the last frame of the ended rounds is kept until
+               `reset_ended` is called.
+        @return An integer array of the status codes of this frame
+        """
+        actions_1P = np.asarray(actions_1P)
+        actions_2P = np.asarray(actions_2P)
+
+        self.frame_count += 1
+        _move_platform(self.platform_1P_x, self.platform_1P_speed_x, actions_1P)
+        _move_platform(self.platform_2P_x, self.platform_2P_speed_x, actions_2P)
+        self._move_blocker()
+
+        waiting = ~self.ball_served
+        if waiting.any():
+            self._wait_for_serving_ball(waiting, actions_1P, actions_2P)
+        if not waiting.all():
+            self._ball_moving(~waiting)
+
+        status = self._get_game_status()
+        ended = status != STATUS_ALIVE
+        self.score[:, 0] += ended & (status != STATUS_2P_WIN)
+        self.score[:, 1] += ended & (status != STATUS_1P_WIN)
+        game_over = ended & ((self.score[:, 0] == self._game_over_score) |
+                             (self.score[:, 1] == self._game_over_score))
+
+        self.final_score[game_over] = self.score[game_over]
+        self.status[:] = status
+        self.game_over[:] = game_over
+        self._reset_pending[:] = ended
+        if auto_reset:
+            self.reset_ended()
+        return status
+
+    def reset_ended(self):
+        """
+        Reset the rounds ended in the last `update`, and restart the matches which are over
+        """
+        if self._reset_pending.any():
+            self._reset_round(self._reset_pending & ~self.game_over)
+            self._new_match(self._reset_pending & self.game_over)
+            self._reset_pending[:] = False
+
+    def _move_blocker(self):
+        self.blocker_x += self.blocker_speed_x
+        hit_left = self.blocker_x <= 0
+        hit_right = ~hit_left & (self.blocker_x + BLOCKER_W >= AREA_W)
+        self.blocker_x[hit_left] = 0
+        self.blocker_x[hit_right] = AREA_W - BLOCKER_W
+        self.blocker_speed_x[hit_left | hit_right] *= -1
+
+    def _wait_for_serving_ball(self, waiting, actions_1P, actions_2P):
+        self._stick_on_platform(waiting)
+
+        target_action = np.where(self.serve_from_1P, actions_1P, actions_2P)
+        is_serve_action = target_action <= ACTION_SERVE_TO_RIGHT
+
+        # Force to serve the ball after 150 frames
+        forced = waiting & ~is_serve_action & (self.frame_count >= 150)
+        if forced.any():
+            target_action[forced] = self._rng.integers(
+                ACTION_SERVE_TO_LEFT, ACTION_SERVE_TO_RIGHT + 1, np.count_nonzero(forced))
+            is_serve_action |= forced
+
+        serving = waiting & is_serve_action
+        np.copyto(self.ball_speed_x,
+                  np.where(target_action == ACTION_SERVE_TO_LEFT, -self._init_vel, self._init_vel),
+                  where=serving)
+        np.copyto(self.ball_speed_y,
+                  np.where(self.serve_from_1P, -self._init_vel, self._init_vel),
+                  where=serving)
+        self.ball_served |= serving
+        np.copyto(self.ball_served_frame, self.frame_count, where=serving)
+
+    def _ball_moving(self, moving):
+        # Speed up the ball every 100 frames
+        speed_up = moving & ((self.frame_count - self.ball_served_frame) % 100 == 0)
+        self.ball_speed_x += speed_up * np.where(self.ball_speed_x > 0, 1, -1)
+        self.ball_speed_y += speed_up * np.where(self.ball_speed_y > 0, 1, -1)
+
+        last_x, last_y = self.ball_x.copy(), self.ball_y.copy()
+        np.copyto(self.ball_x, last_x + self.ball_speed_x, where=moving)
+        np.copyto(self.ball_y, last_y + self.ball_speed_y, where=moving)
+
+        x, y, speed_x, speed_y = self._check_bouncing(last_x, last_y)
+        np.copyto(self.ball_x, x, where=moving)
+        np.copyto(self.ball_y, y, where=moving)
+        np.copyto(self.ball_speed_x, speed_x, where=moving)
+        np.copyto(self.ball_speed_y, speed_y, where=moving)
+
+    def _check_bouncing(self, last_x, last_y):
+        """
+        The vectorized version of `Ball.check_bouncing`
+
+        @return A tuple (x, y, speed_x, speed_y) of the ball after bouncing
+        """
+        speed_x, speed_y = self.ball_speed_x, self.ball_speed_y
+
+        # If the ball hits the play area, adjust the position first
+        # and preserve the speed after bouncing.
+        hit_left = self.ball_x <= 0
+        hit_right = self.ball_x + BALL_SIZE >= AREA_W
+        hit_top = self.ball_y <= 0
+        hit_bottom = self.ball_y + BALL_SIZE >= AREA_H
+        hit_box = hit_left | hit_right | hit_top | hit_bottom
+        x = np.where(hit_left, 0, np.where(hit_right, AREA_W - BALL_SIZE, self.ball_x))
+        y = np.where(hit_top, 0, np.where(hit_bottom, AREA_H - BALL_SIZE, self.ball_y))
+        speed_x_after_hit_box = np.where(hit_left | hit_right, -speed_x, speed_x)
+
+        # Find the first sprite in (1P platform, 2P platform, blocker) hit by the ball
+        sprites = (
+            (self.platform_1P_x, PLATFORM_1P_INIT_POS[1], PLATFORM_W, PLATFORM_H, self.platform_1P_speed_x),
+            (self.platform_2P_x, PLATFORM_2P_INIT_POS[1], PLATFORM_W, PLATFORM_H, self.platform_2P_speed_x),
+            (self.blocker_x, self._blocker_y, BLOCKER_W, BLOCKER_H, self.blocker_speed_x),
+        )
+        hit_index = np.full(self.num_matches, -1, dtype=np.int8)
+        for index, (rect_x, rect_y, width, height, _) in enumerate(sprites):
+            hit = (hit_index < 0) & _moving_collide_or_contact(
+                last_x, last_y, x, y, rect_x, rect_y, width, height)
+            hit_index[hit] = index
+        hit_sprite = hit_index >= 0
+        if not hit_sprite.any():
+            return x, y, np.where(hit_box, speed_x_after_hit_box, speed_x), speed_y
+
+        conditions = [hit_index == index for index in range(len(sprites))]
+        hit_rect_x, hit_rect_y, hit_width, hit_height, hit_speed_x = (
+            np.select(conditions, [np.broadcast_to(sprite[i], x.shape) for sprite in sprites])
+            for i in range(5))
+        bounce_x, bounce_y, bounce_speed_x, bounce_speed_y = _bounce_off(
+            x, y, speed_x, speed_y, hit_rect_x, hit_rect_y, hit_width, hit_height, hit_speed_x)
+
+        # Check slicing ball when the ball is caught by the platform
+        if self._enable_slice_ball:
+            slice_ball = (((hit_index == 0) & (bounce_speed_y < 0)) |
+                          ((hit_index == 1) & (bounce_speed_y > 0)))
+            bounce_speed_x = np.where(slice_ball, _slice_ball(speed_x, speed_y, hit_speed_x), bounce_speed_x)
+
+        # Decide the final speed
+        final_speed_x = np.where(hit_box, speed_x_after_hit_box,
+                                 np.where(hit_sprite, bounce_speed_x, speed_x))
+        final_speed_y = np.where(hit_sprite, bounce_speed_y, speed_y)
+        return (np.where(hit_sprite, bounce_x, x), np.where(hit_sprite, bounce_y, y),
+                final_speed_x, final_speed_y)
+
+    def _get_game_status(self):
+        return np.select(
+            [self.ball_y > PLATFORM_1P_INIT_POS[1] + PLATFORM_H,
+             self.ball_y + BALL_SIZE < PLATFORM_2P_INIT_POS[1],
+             np.minimum(np.abs(self.ball_speed_x), np.abs(self.ball_speed_y)) > DRAW_BALL_SPEED],
+            [STATUS_2P_WIN, STATUS_1P_WIN, STATUS_DRAW],
+            STATUS_ALIVE).astype(np.int8)
+
+
+def _move_platform(platform_x, speed_x, actions):
+    speed_x[:] = np.where(
+        (actions == ACTION_MOVE_LEFT) & (platform_x > 0), -PLATFORM_SHIFT_SPEED,
+        np.where((actions == ACTION_MOVE_RIGHT) & (platform_x + PLATFORM_W < AREA_W),
+                 PLATFORM_SHIFT_SPEED, 0))
+    platform_x += speed_x
+
+
+def _segment_slab(start, delta, low, high):
+    """
+    Get the range of the parameter t in [0, 1] of the segment `start + t * delta`
+    staying in the slab [low, high]
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t_low = (low - start) / delta
+        t_high = (high - start) / delta
+    in_slab = (low <= start) & (start <= high)
+    is_still = delta == 0
+    t_enter = np.where(is_still, np.where(in_slab, -np.inf, np.inf), np.minimum(t_low, t_high))
+    t_exit = np.where(is_still, np.where(in_slab, np.inf, -np.inf), np.maximum(t_low, t_high))
+    return t_enter, t_exit
+
+
+def _moving_collide_or_contact(last_x, last_y, x, y, rect_x, rect_y, width, height):
+    """
+    The vectorized version of `physics.moving_collide_or_contact` for the ball
+
+    The routine of each corner of the ball collides the rect if it doesn't start
+    from the rect (including the border) and it passes through the rect.
+    """
+    rect_right = rect_x + width
+    rect_bottom = rect_y + height
+    delta_x = x - last_x
+    delta_y = y - last_y
+
+    collide = np.zeros(np.shape(x), dtype=bool)
+    for offset_x, offset_y in ((0, 0), (BALL_SIZE, 0), (0, BALL_SIZE), (BALL_SIZE, BALL_SIZE)):
+        start_x = last_x + offset_x
+        start_y = last_y + offset_y
+        start_inside = ((rect_x <= start_x) & (start_x <= rect_right) &
+                        (rect_y <= start_y) & (start_y <= rect_bottom))
+
+        enter_x, exit_x = _segment_slab(start_x, delta_x, rect_x, rect_right)
+        enter_y, exit_y = _segment_slab(start_y, delta_y, rect_y, rect_bottom)
+        t_enter = np.maximum(np.maximum(enter_x, enter_y), 0)
+        t_exit = np.minimum(np.minimum(exit_x, exit_y), 1)
+        collide |= ~start_inside & (t_enter <= t_exit)
+
+    return collide
+
+
+def _bounce_off(x, y, speed_x, speed_y, hit_x, hit_y, hit_width, hit_height, hit_speed_x):
+    """
+    The vectorized version of `physics.bounce_off` for the ball
+
+    @return A tuple (x, y, speed_x, speed_y) of the ball after bouncing
+    """
+    # Treat the hit object as an unmovable object
+    speed_diff_x = speed_x - hit_speed_x
+    speed_diff_y = speed_y
+
+    # The relative position between top and bottom, and left and right
+    # of two objects at the last frame
+    diff_bT_hB = hit_y + hit_height - y + speed_diff_y
+    diff_bB_hT = hit_y - (y + BALL_SIZE) + speed_diff_y
+    diff_bL_hR = hit_x + hit_width - x + speed_diff_x
+    diff_bR_hL = hit_x - (x + BALL_SIZE) + speed_diff_x
+
+    at_bottom = (diff_bT_hB < 0) & (diff_bB_hT < 0)
+    at_top = (diff_bT_hB > 0) & (diff_bB_hT > 0)
+    surface_diff_y = np.select([at_bottom, at_top], [diff_bT_hB, diff_bB_hT],
+                               np.where(speed_diff_y > 0, -1, 1))
+    extract_pos_y = np.select([at_bottom, at_top], [hit_y + hit_height, hit_y - BALL_SIZE], y)
+
+    at_right = (diff_bL_hR < 0) & (diff_bR_hL < 0)
+    at_left = (diff_bL_hR > 0) & (diff_bR_hL > 0)
+    surface_diff_x = np.select([at_right, at_left], [diff_bL_hR, diff_bR_hL],
+                               np.where(speed_diff_x > 0, -1, 1))
+    extract_pos_x = np.select([at_right, at_left], [hit_x + hit_width, hit_x - BALL_SIZE], x)
+
+    # Calculate the duration to hit the surface for x and y coordination.
+    # It never hits the surface along the axis with zero relative speed.
+    with np.errstate(divide="ignore", invalid="ignore"):
+        time_hit_y = np.where(speed_diff_y == 0, -np.inf, surface_diff_y / speed_diff_y)
+        time_hit_x = np.where(speed_diff_x == 0, -np.inf, surface_diff_x / speed_diff_x)
+
+    flip_y = (time_hit_y >= 0) & (time_hit_y >= time_hit_x)
+    flip_x = (time_hit_x >= 0) & (time_hit_y <= time_hit_x)
+    return (np.where(flip_x, extract_pos_x, x), np.where(flip_y, extract_pos_y, y),
+            np.where(flip_x, -speed_x, speed_x), np.where(flip_y, -speed_y, speed_y))
+
+
+def _slice_ball(ball_speed_x, ball_speed_y, platform_speed_x):
+    """
+    The vectorized version of `Ball._slice_ball`
+    """
+    # The y speed won't be changed after ball slicing.
+    origin_ball_speed = np.abs(ball_speed_y)
+    direction = platform_speed_x * ball_speed_x
+
+    # Speed up the ball if the platform moves at the same direction as the ball,
+    # and reverse the ball direction if they move to the different direction.
+    origin_ball_speed = np.where(direction > 0, origin_ball_speed + 3,
+                                 np.where(direction < 0, -origin_ball_speed, origin_ball_speed))
+    return np.where(ball_speed_x > 0, origin_ball_speed, -origin_ball_speed)
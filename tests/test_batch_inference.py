@@ -0,0 +1,76 @@
+"""
+Tests of batching the model predictions of the concurrent matches
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import tournament
+from src.batch_inference import BatchInferenceService
+
+NUM_MATCHES = 4
+# Long enough that a batch predicted by the timeout makes the test fail
+MAX_DELAY = 10
+
+ML_PLAY_SOURCE = '''
+import numpy as np
+
+
+class _Model:
+    def predict(self, features):
+        return np.zeros(len(features), dtype=int)
+
+
+class MLPlay:
+    def __init__(self, ai_name, *args, **kwargs):
+        self.model = _Model()
+
+    def update(self, scene_info, *args, **kwargs):
+        return "NONE"
+
+    def reset(self):
+        pass
+'''
+
+
+class _SumModel:
+    def predict(self, features):
+        return features.sum(axis=1)
+
+
+def test_full_batch_is_predicted_without_waiting_for_the_timeout():
+    with BatchInferenceService(_SumModel(), max_batch_size=NUM_MATCHES, max_delay=MAX_DELAY) as service:
+        start_time = time.perf_counter()
+        with ThreadPoolExecutor(NUM_MATCHES) as executor:
+            predictions = list(executor.map(lambda i: service.predict([[i, 1]]), range(NUM_MATCHES)))
+        elapsed_time = time.perf_counter() - start_time
+
+    assert elapsed_time < MAX_DELAY / 10
+    assert [prediction.tolist() for prediction in predictions] == [[i + 1] for i in range(NUM_MATCHES)]
+    assert service.num_batches == 1
+    assert service.num_rows == NUM_MATCHES
+
+
+def test_worker_batches_one_row_per_concurrent_match(tmp_path):
+    ml_path = tmp_path / "ml_play.py"
+    ml_path.write_text(ML_PLAY_SOURCE)
+    tournament._init_worker((str(ml_path), str(ml_path)), {}, False, NUM_MATCHES)
+    try:
+        ai_sets = [tournament._worker["free_ai_sets"].get() for _ in range(NUM_MATCHES)]
+        for ais in ai_sets:
+            for ai in ais.values():
+                assert ai.model._service.max_batch_size == NUM_MATCHES
+        services = {ai.model._service for ais in ai_sets for ai in ais.values()}
+        assert len(services) == 2
+        for service in services:
+            service.max_delay = MAX_DELAY
+    finally:
+        tournament._worker.clear()
+
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(NUM_MATCHES) as executor:
+        list(executor.map(lambda ais: ais["1P"].model.predict(np.zeros((1, 9))), ai_sets))
+    assert time.perf_counter() - start_time < MAX_DELAY / 10
+    for service in services:
+        service.close()
@@ -0,0 +1,49 @@
+"""
+Tests of running `ml/pingpong_model_trainer.py` as a script like the users do
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+from ml.training_recorder import FEATURE_KEYS, TrainingRecorder
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TRAINER_PATH = os.path.join("ml", "pingpong_model_trainer.py")
+
+
+@pytest.fixture(autouse=True)
+def _require_sklearn():
+    try:
+        import sklearn.metrics, sklearn.model_selection, sklearn.neighbors  # noqa: F401
+    except Exception as e:  # scikit-learn is missing or built against another NumPy
+        pytest.skip(f"scikit-learn cannot be imported: {e}")
+
+
+def _run_trainer(*args):
+    # Run from the repo root without the repo on PYTHONPATH, so only the script path is on sys.path
+    env = {key: value for key, value in os.environ.items() if key != "PYTHONPATH"}
+    return subprocess.run([sys.executable, TRAINER_PATH, *args], cwd=REPO_ROOT, env=env,
+                          capture_output=True, text=True, timeout=60)
+
+
+def test_help():
+    result = _run_trainer("--help")
+    assert result.returncode == 0, result.stderr
+    assert "--data_folder" in result.stdout
+
+
+def test_recompute_prediction_on_recorded_data(tmp_path):
+    folder = str(tmp_path / "data")
+    recorder = TrainingRecorder(folder)
+    for i in range(5):
+        features = {key: 10.0 for key in FEATURE_KEYS}
+        features.update(ball_x=50 + i, ball_y=200, ball_speed_x=7, ball_speed_y=7, blocker_speed_x=5)
+        recorder.append(features, "NONE", "1P")
+    recorder.commit()
+
+    result = _run_trainer("--data_folder", folder, "--side", "1P", "--recompute_prediction",
+                          "--output_model", str(tmp_path / "model.pickle"))
+    assert result.returncode == 0, result.stderr
+    assert "predicted_center_calc" in result.stdout
@@ -0,0 +1,41 @@
+"""
+Regression tests of the bouncing in `src.physics` and the vectorized engine
+"""
+import numpy as np
+import pytest
+
+from src.physics import bounce_off
+from src.rect import Rect
+from src.vector_game import _bounce_off
+
+
+# (ball rect, ball speed, hit rect, hit speed, expected ball (x, y), expected ball speed)
+BOUNCE_CASES = [
+    # Falling onto the top of the blocker moving at the same x speed
+    ((115, 237, 5, 5), [5, 7], (100, 240, 30, 20), [5, 0], (115, 235), [5, -7]),
+    ((115, 237, 5, 5), [-5, 7], (100, 240, 30, 20), [-5, 0], (115, 235), [-5, -7]),
+    # Rising onto the bottom of the blocker moving at the same x speed
+    ((110, 258, 5, 5), [5, -7], (100, 240, 30, 20), [5, 0], (110, 260), [5, 7]),
+    # Hitting the left side of the blocker
+    ((97, 250, 5, 5), [7, 7], (100, 240, 30, 20), [0, 0], (95, 250), [-7, 7]),
+    # Falling onto the top of a still platform
+    ((100, 418, 5, 5), [7, 7], (80, 420, 40, 10), [0, 0], (100, 415), [7, -7]),
+]
+
+
+@pytest.mark.parametrize("ball_rect, ball_speed, hit_rect, hit_speed, expected_pos, expected_speed",
+                         BOUNCE_CASES)
+def test_bounce_off(ball_rect, ball_speed, hit_rect, hit_speed, expected_pos, expected_speed):
+    new_rect, new_speed = bounce_off(Rect(*ball_rect), ball_speed, Rect(*hit_rect), hit_speed)
+    assert (new_rect.x, new_rect.y) == expected_pos
+    assert new_speed == expected_speed
+
+
+@pytest.mark.parametrize("ball_rect, ball_speed, hit_rect, hit_speed, expected_pos, expected_speed",
+                         BOUNCE_CASES)
+def test_vector_bounce_off(ball_rect, ball_speed, hit_rect, hit_speed, expected_pos, expected_speed):
+    x, y, speed_x, speed_y = _bounce_off(
+        np.array([ball_rect[0]]), np.array([ball_rect[1]]), np.array([ball_speed[0]]), np.array([ball_speed[1]]),
+        np.array([hit_rect[0]]), np.array([hit_rect[1]]), hit_rect[2], hit_rect[3], np.array([hit_speed[0]]))
+    assert (int(x[0]), int(y[0])) == expected_pos
+    assert [int(speed_x[0]), int(speed_y[0])] == expected_speed
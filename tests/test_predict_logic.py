@@ -0,0 +1,130 @@
+"""
+Property tests of the landing predictors against the reference loop `predict_pingpong_landing`
+"""
+import random
+
+import numpy as np
+import pytest
+
+from ml.landing_table import SCALE, LandingTable, build_landing_table
+from ml.predict_logic import (
+    SCREEN_WIDTH, BALL_SIZE, WALL_ERROR, predict_pingpong_landing, predict_pingpong_landing_batch,
+    predict_pingpong_landing_fast
+)
+
+NUM_STATES = 20000
+# The speeds covered by the landing table built in the test
+TABLE_MAX_SPEED = 8
+
+
+def _random_rows(seed, num_rows=NUM_STATES):
+    """
+    Get the random rows (side, ball_x, ball_y, ball_speed_x, ball_speed_y,
+    platform_1P_x, platform_2P_x, blocker_x, blocker_speed_x). A negative
+    blocker_x means no blocker.
+    """
+    rng = random.Random(seed)
+    speeds = [sign * speed for sign in (1, -1) for speed in range(3, 45)]
+    return [(rng.choice(("1P", "2P")), rng.randint(0, 195), rng.randint(0, 495),
+             rng.choice([0] + speeds), rng.choice(speeds),
+             rng.randrange(0, 161, 5), rng.randrange(0, 161, 5),
+             rng.choice((rng.randint(0, 170), 0, -1)), rng.choice((-5, 0, 5)))
+            for _ in range(num_rows)]
+
+
+def _scene_info(row):
+    _, ball_x, ball_y, ball_speed_x, ball_speed_y, platform_1P_x, platform_2P_x, blocker_x, _ = row
+    return {
+        "ball": (ball_x, ball_y),
+        "ball_speed": (ball_speed_x, ball_speed_y),
+        "platform_1P": (platform_1P_x, 420),
+        "platform_2P": (platform_2P_x, 70),
+        "blocker": (blocker_x, 240) if blocker_x >= 0 else None,
+    }
+
+
+def _num_walls_hit(row):
+    # The number of the walls hit by the ball flying straight to the platform line
+    side, ball_x, ball_y, ball_speed_x, ball_speed_y = row[:5]
+    line_y = 420 - BALL_SIZE if side == "1P" else 80
+    x = ball_x + ball_speed_x * (line_y - ball_y) / ball_speed_y
+    return int(abs(x // (SCREEN_WIDTH - BALL_SIZE)))
+
+
+def _tolerance(row):
+    # The reference loop leaves the ball at the wall instead of 0.01 px off it when
+    # the float error stops it just short of the wall, which shifts the landing by
+    # at most WALL_ERROR per wall bounce
+    return WALL_ERROR * _num_walls_hit(row) + 1e-9
+
+
+def _assert_close(predicted, expected, tolerance, row):
+    assert (predicted is None) == (expected is None), row
+    if expected is not None:
+        assert abs(predicted - expected) <= tolerance, row
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_fast_matches_reference(seed):
+    rows = _random_rows(seed)
+    num_none = num_walls = 0
+    for row in rows:
+        scene_info, side, blocker_speed_x = _scene_info(row), row[0], row[8]
+        expected = predict_pingpong_landing(scene_info, side, blocker_speed_x)
+        _assert_close(predict_pingpong_landing_fast(scene_info, side, blocker_speed_x), expected,
+                      _tolerance(row), row)
+        num_none += expected is None
+        num_walls += expected is not None and _num_walls_hit(row) > 0
+
+    # The random states cover the balls flying away and bouncing off the walls
+    assert num_none > NUM_STATES // 10
+    assert num_walls > NUM_STATES // 10
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_batch_matches_reference_and_fast(seed):
+    rows = _random_rows(seed)
+    side, *columns = (np.array(column) for column in zip(*rows))
+    predicted = predict_pingpong_landing_batch(side, *columns)
+
+    for row, batch_value in zip(rows, predicted):
+        scene_info, row_side, blocker_speed_x = _scene_info(row), row[0], row[8]
+        batch_value = None if np.isnan(batch_value) else float(batch_value)
+        _assert_close(batch_value, predict_pingpong_landing(scene_info, row_side, blocker_speed_x),
+                      _tolerance(row), row)
+        _assert_close(batch_value, predict_pingpong_landing_fast(scene_info, row_side, blocker_speed_x), 1e-9, row)
+
+
+@pytest.mark.parametrize("predict", [predict_pingpong_landing, predict_pingpong_landing_fast])
+def test_known_landings(predict):
+    scene_info = {"ball": (100, 300), "ball_speed": (7, 7), "platform_1P": (80, 420),
+                  "platform_2P": (80, 70), "blocker": None}
+    # Straight down to the 1P line at y=415: x = 100 + 115
+    # which bounces off the right wall at 195 back to 195 - 20 = 175
+    assert predict(scene_info, "1P") == pytest.approx(175 + BALL_SIZE / 2, abs=WALL_ERROR)
+    # Flying away from 2P
+    assert predict(scene_info, "2P") is None
+
+
+def test_table_matches_reference(tmp_path):
+    table_path = tmp_path / "landing_table.npy"
+    np.save(table_path, build_landing_table(TABLE_MAX_SPEED))
+    table = LandingTable(str(table_path))
+    rng = random.Random(0)
+    num_walls = 0
+    try:
+        for _ in range(NUM_STATES):
+            speed_y = rng.randint(1, TABLE_MAX_SPEED) * rng.choice((1, -1))
+            speed_x = (abs(speed_y) + rng.choice((0, 3))) * rng.choice((1, -1))
+            # The states covered by the table: no moving blocker, as on EASY and NORMAL
+            row = (rng.choice(("1P", "2P")), rng.randint(0, 195), rng.randint(80, 415), speed_x, speed_y,
+                   rng.randrange(0, 161, 5), rng.randrange(0, 161, 5), 0, 0)
+            scene_info, side = _scene_info(row), row[0]
+            expected = predict_pingpong_landing(scene_info, side)
+            # The landings are stored in 1 / SCALE px
+            _assert_close(table.predict(scene_info, side), expected, _tolerance(row) + 0.5 / SCALE, row)
+            num_walls += expected is not None and _num_walls_hit(row) > 0
+    finally:
+        table.close()
+
+    assert num_walls > NUM_STATES // 10
@@ -0,0 +1,36 @@
+"""
+Tests of the opt-in profiling of `PingPongSimulation`
+"""
+import json
+
+from src.simulation import PingPongSimulation
+
+
+def test_exported_profile_counts_every_update(tmp_path):
+    path = tmp_path / "profile.json"
+    game = PingPongSimulation("HARD", game_over_score=1, seed=0)
+    game.enable_profiling(str(path))
+    num_frames = 0
+    result = None
+    while result != "QUIT":
+        result = game.update({"1P": "SERVE_TO_LEFT", "2P": "NONE"})
+        num_frames += 1
+
+    profile = json.loads(path.read_text())
+    assert profile["update"]["calls"] == num_frames
+    assert profile["Blocker.move"]["calls"] == num_frames
+
+
+def test_exported_profile_after_step_n(tmp_path):
+    path = tmp_path / "profile.json"
+    game = PingPongSimulation("HARD", game_over_score=1, seed=0)
+    game.enable_profiling(str(path))
+    result = None
+    num_calls = 0
+    while result != "QUIT":
+        result, _, _ = game.step_n({"1P": "SERVE_TO_LEFT", "2P": "NONE"}, 50, event_driven=True)
+        num_calls += 1
+
+    profile = json.loads(path.read_text())
+    assert profile["step_n"]["calls"] == num_calls
+    assert "update" not in profile
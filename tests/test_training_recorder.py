@@ -0,0 +1,107 @@
+"""
+Tests of the columnar training data recorded by `TrainingRecorder`
+"""
+import multiprocessing
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from ml.training_recorder import COLUMNS, COMMANDS, FEATURE_KEYS, TrainingRecorder, load_recorded_data
+
+NUM_PROCESSES = 4
+ROUNDS_PER_PROCESS = 20
+ROWS_PER_ROUND = 50
+
+
+def _features(value):
+    return {key: value + i for i, key in enumerate(FEATURE_KEYS)}
+
+
+def _record(folder, worker_id):
+    # Small chunks to interleave the appends of the processes
+    recorder = TrainingRecorder(folder, chunk_size=16)
+    for round_id in range(ROUNDS_PER_PROCESS):
+        for row in range(ROWS_PER_ROUND):
+            value = (worker_id * ROUNDS_PER_PROCESS + round_id) * ROWS_PER_ROUND + row
+            recorder.append(_features(value), COMMANDS[value % len(COMMANDS)], "1P" if value % 2 else "2P")
+        recorder.commit()
+
+
+def _assert_rows_intact(shards, num_workers):
+    # Every row is recorded once and is consistent across the columns
+    values = np.concatenate([columns["ball_x"] for columns in shards])
+    assert sorted(values) == list(range(num_workers * ROUNDS_PER_PROCESS * ROWS_PER_ROUND))
+    for columns in shards:
+        for i, key in enumerate(FEATURE_KEYS):
+            np.testing.assert_array_equal(columns[key], columns["ball_x"] + i)
+        np.testing.assert_array_equal(columns["command"], columns["ball_x"] % len(COMMANDS))
+        np.testing.assert_array_equal(columns["side"], 1 - columns["ball_x"] % 2)
+
+
+def test_concurrent_processes_write_their_own_shards(tmp_path):
+    folder = str(tmp_path / "data")
+    processes = [multiprocessing.Process(target=_record, args=(folder, worker_id))
+                 for worker_id in range(NUM_PROCESSES)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+
+    shards = load_recorded_data(folder)
+    assert len(shards) == NUM_PROCESSES
+    _assert_rows_intact(shards, NUM_PROCESSES)
+
+
+def test_recorders_in_one_process_share_a_shard(tmp_path):
+    folder = str(tmp_path / "data")
+    # A recorder per round, like the collectors created again in each match
+    for value in range(3):
+        recorder = TrainingRecorder(folder)
+        recorder.append(_features(value), "NONE", "1P")
+        recorder.append(_features(value), "NONE", "1P")
+        recorder.discard()
+        recorder.append(_features(value), "NONE", "1P")
+        recorder.commit()
+        assert recorder.num_rows == value + 1
+
+    assert len(os.listdir(folder)) == 2  # schema.json and the shard
+    assert len(os.listdir(recorder.shard_folder)) == len(COLUMNS)
+    shards = load_recorded_data(folder)
+    assert len(shards) == 1
+    assert shards[0]["ball_x"].tolist() == [0.0, 1.0, 2.0]
+
+
+def test_concurrent_commits_in_one_process_keep_the_rows_intact(tmp_path):
+    folder = str(tmp_path / "data")
+    with ThreadPoolExecutor(NUM_PROCESSES) as executor:
+        list(executor.map(lambda worker_id: _record(folder, worker_id), range(NUM_PROCESSES)))
+
+    shards = load_recorded_data(folder)
+    assert len(shards) == 1
+    _assert_rows_intact(shards, NUM_PROCESSES)
+
+
+def test_load_recorded_features_reads_all_shards_in_chunks(tmp_path):
+    try:
+        from ml.pingpong_model_trainer import load_recorded_features
+    except Exception as e:  # scikit-learn is missing or built against another NumPy
+        pytest.skip(f"the trainer cannot be imported: {e}")
+
+    folder = str(tmp_path / "data")
+    for worker_id in range(2):
+        _record(folder, worker_id)
+    # A row with a missing feature is skipped
+    recorder = TrainingRecorder(folder)
+    recorder.append({"ball_x": 1.0}, "NONE", "1P")
+    recorder.commit()
+
+    features, labels = load_recorded_features(folder, "1P", chunk_size=7)
+    values = np.arange(2 * ROUNDS_PER_PROCESS * ROWS_PER_ROUND)
+    expected = values[values % 2 == 1]
+    order = np.argsort(features[:, 0])
+    np.testing.assert_array_equal(features[order, 0], expected)
+    np.testing.assert_array_equal(features[order], expected[:, None] + np.arange(len(FEATURE_KEYS)))
+    np.testing.assert_array_equal(labels[order], expected % len(COMMANDS))
@@ -0,0 +1,40 @@
+"""
+Tests of the auto-reset of `VectorPingPongEnv`
+"""
+import numpy as np
+
+from src.vector_env import OBSERVATION_FIELDS, VectorPingPongEnv
+from src.vector_game import ACTION_NONE, ACTION_SERVE_TO_LEFT
+
+BALL_Y = OBSERVATION_FIELDS.index("ball_y")
+BALL_SERVED = OBSERVATION_FIELDS.index("ball_served")
+
+
+def test_final_observation_on_auto_reset():
+    env = VectorPingPongEnv(8, "NORMAL", seed=0)
+    env.reset()
+    actions = np.array([[ACTION_SERVE_TO_LEFT, ACTION_NONE]] * env.num_envs)
+    for _ in range(1000):
+        observations, rewards, terminated, truncated, info = env.step(actions)
+        if terminated.any():
+            break
+    else:
+        raise AssertionError("no round is ended")
+
+    np.testing.assert_array_equal(info["_final_observation"], terminated)
+    final_observations = info["final_observation"][terminated]
+    # The last frame of the round: the ball passed a platform while it was served
+    assert ((final_observations[:, BALL_Y] > 420) | (final_observations[:, BALL_Y] < 75)).all()
+    assert (final_observations[:, BALL_SERVED] == 1).all()
+    # The returned observation is the first one of the next round
+    assert (observations[terminated, BALL_SERVED] == 0).all()
+    # The rows of the matches still running are the returned observations
+    np.testing.assert_array_equal(info["final_observation"][~terminated], observations[~terminated])
+
+
+def test_no_final_observation_without_termination():
+    env = VectorPingPongEnv(4, "HARD", seed=0)
+    env.reset()
+    _, _, terminated, _, info = env.step(np.full((4, 2), ACTION_NONE))
+    assert not terminated.any()
+    assert "final_observation" not in info
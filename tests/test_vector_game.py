@@ -0,0 +1,85 @@
+"""
+Check `VectorPingPong` against the scalar `PingPongSimulation` frame by frame
+"""
+import random
+
+import numpy as np
+import pytest
+
+from src.simulation import PingPongSimulation
+from src.vector_game import ACTIONS, STATUS_ALIVE, VectorPingPong, encode_actions
+
+NUM_MATCHES = 4
+NUM_FRAMES = 3000
+
+
+def _sync_blocker(game, sims):
+    # The engines draw the initial blocker from different random generators
+    for i, sim in enumerate(sims):
+        game.blocker_x[i] = sim._blocker.rect.x
+        game.blocker_speed_x[i] = sim._blocker._speed[0]
+
+
+def _assert_same_state(game, sims, frame):
+    for i, sim in enumerate(sims):
+        ball = sim._ball
+        expected = (ball.rect.x, ball.rect.y, ball._speed[0], ball._speed[1],
+                    sim._platform_1P.rect.x, sim._platform_2P.rect.x,
+                    sim._blocker.rect.x, sim._blocker._speed[0], sim._ball_served)
+        actual = (game.ball_x[i], game.ball_y[i], game.ball_speed_x[i], game.ball_speed_y[i],
+                  game.platform_1P_x[i], game.platform_2P_x[i],
+                  game.blocker_x[i], game.blocker_speed_x[i], game.ball_served[i])
+        assert tuple(int(v) for v in actual) == tuple(int(v) for v in expected), (
+            "match {} differs at frame {}".format(i, frame))
+
+
+@pytest.mark.parametrize("difficulty", ["EASY", "NORMAL", "HARD"])
+@pytest.mark.parametrize("init_vel", [5, 7, 10])
+def test_vector_game_matches_simulation(difficulty, init_vel):
+    command_random = random.Random(init_vel)
+    sims = [PingPongSimulation(difficulty, game_over_score=1000000, init_vel=init_vel, seed=seed)
+            for seed in range(NUM_MATCHES)]
+    game = VectorPingPong(NUM_MATCHES, difficulty, game_over_score=1000000, init_vel=init_vel, seed=0)
+    _sync_blocker(game, sims)
+    _assert_same_state(game, sims, 0)
+
+    num_rounds = 0
+    for frame in range(1, NUM_FRAMES + 1):
+        commands = [(command_random.choice(ACTIONS), command_random.choice(ACTIONS))
+                    for _ in range(NUM_MATCHES)]
+        status = game.update(encode_actions([c[0] for c in commands]),
+                             encode_actions([c[1] for c in commands]))
+        for i, sim in enumerate(sims):
+            result = sim.update({"1P": commands[i][0], "2P": commands[i][1]})
+            assert (result == "RESET") == (status[i] != STATUS_ALIVE)
+            if result == "RESET":
+                sim.reset()
+                num_rounds += 1
+        if (status != STATUS_ALIVE).any():
+            _sync_blocker(game, sims)
+        _assert_same_state(game, sims, frame)
+        np.testing.assert_array_equal(game.score, [sim._score for sim in sims])
+
+    assert num_rounds > 0
+
+
+@pytest.mark.parametrize("direction", [1, -1])
+def test_ball_falling_onto_blocker_at_same_x_speed(direction):
+    sim = PingPongSimulation("HARD", game_over_score=1000000, seed=0)
+    game = VectorPingPong(1, "HARD", game_over_score=1000000, seed=0)
+    sim.update({"1P": "SERVE_TO_LEFT", "2P": "NONE"})
+    game.update(encode_actions(["SERVE_TO_LEFT"]), encode_actions(["NONE"]))
+
+    # The ball is about to fall onto the top of the blocker moving with it
+    ball_x, ball_y, speed = 110, 230, 5 * direction
+    sim._ball.rect.x, sim._ball.rect.y = ball_x, ball_y
+    sim._ball._speed[:] = [speed, 7]
+    sim._blocker.rect.x, sim._blocker._speed[0] = 100, speed
+    game.ball_x[0], game.ball_y[0], game.ball_speed_x[0], game.ball_speed_y[0] = ball_x, ball_y, speed, 7
+    game.blocker_x[0], game.blocker_speed_x[0] = 100, speed
+
+    sim.update({"1P": "NONE", "2P": "NONE"})
+    game.update(encode_actions(["NONE"]), encode_actions(["NONE"]))
+    _assert_same_state(game, [sim], 2)
+    assert sim._ball._speed == [speed, -7]
+    assert sim._ball.rect.y == 240 - 5
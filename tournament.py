@@ -0,0 +1,251 @@
+"""
+Play many headless pingpong matches between two `MLPlay` scripts in a process pool
+
+Usage:
+    python tournament.py --ml_1P ml/ml_play_P1_F74101115.py --ml_2P ml/ml_play_P2_F74101115.py \
+        --difficulty HARD --num_matches 1000
+"""
+import argparse
+import importlib.util
+import json
+import os
+import queue
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from multiprocessing.util import Finalize
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from mlgame.utils.enum import get_ai_name
+from src.batch_inference import BatchInferenceService, BatchedModel
+from src.simulation import PingPongSimulation
+
+
+def load_ml_play_class(path):
+    """
+    Load the `MLPlay` class from the script like the mlgame AI client does
+    """
+    module_name = os.path.splitext(os.path.basename(path))[0]
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.MLPlay
+
+
+def play_match(game_params, ais, seed=None):
+    """
+    Play a match until either side reaches `game_over_score`
+
+    The AIs are driven in the same order as the mlgame executor: they receive
+    the scene info before each frame, and they receive the final scene info
+    and get reset when a round is ended.
+
+    @param game_params The keyword arguments for `PingPongSimulation`
+    @param ais A dict mapping the ai name ("1P" or "2P") to the `MLPlay` object
+    @param seed The seed of the match. The global `random` used by the AIs
+           is also seeded with it, so that the match can be replayed.
+    @return A dict of the match result
+    """
+    if seed is not None:
+        random.seed(seed)
+    game = PingPongSimulation(**game_params, seed=seed)
+    total_frames = 0
+    while True:
+        scene_info = game.get_data_from_game_to_player()
+        commands = {name: ai.update(scene_info[name], []) for name, ai in ais.items()}
+        result = game.update(commands)
+        total_frames += 1
+
+        if result in ("RESET", "QUIT"):
+            scene_info = game.get_data_from_game_to_player()
+            for name, ai in ais.items():
+                ai.update(scene_info[name], [])
+                ai.reset()
+            if result == "QUIT":
+                break
+            game.reset()
+
+    game_result = game.get_game_result()
+    attachment = game_result["attachment"]
+    if attachment[0]["status"] == "GAME_PASS":
+        winner = get_ai_name(0)
+    elif attachment[1]["status"] == "GAME_PASS":
+        winner = get_ai_name(1)
+    else:
+        winner = "DRAW"
+
+    return {
+        "seed": seed,
+        "winner": winner,
+        "score": [player["score"] for player in attachment],
+        "frame_used": game_result["frame_used"],
+        "total_frames": total_frames,
+        "ball_speed": list(attachment[0]["ball_speed"]),
+    }
+
+
+class TournamentStats:
+    """
+    Aggregate the match results into win rates and means
+    """
+
+    def __init__(self):
+        self.num_matches = 0
+        self.wins = {get_ai_name(0): 0, get_ai_name(1): 0, "DRAW": 0}
+        self._frame_used_sum = 0
+        self._total_frames_sum = 0
+        self._ball_speed_sum = [0, 0]
+
+    def add(self, match_result):
+        self.num_matches += 1
+        self.wins[match_result["winner"]] += 1
+        self._frame_used_sum += match_result["frame_used"]
+        self._total_frames_sum += match_result["total_frames"]
+        self._ball_speed_sum[0] += abs(match_result["ball_speed"][0])
+        self._ball_speed_sum[1] += abs(match_result["ball_speed"][1])
+
+    def summary(self) -> dict:
+        n = max(self.num_matches, 1)
+        return {
+            "num_matches": self.num_matches,
+            "win_rate": {side: count / n for side, count in self.wins.items()},
+            "mean_frame_used": self._frame_used_sum / n,
+            "mean_total_frames": self._total_frames_sum / n,
+            "mean_final_ball_speed": [speed / n for speed in self._ball_speed_sum],
+        }
+
+
+# The state of the worker process, which is set by `_init_worker`
+_worker = {}
+
+
+def _init_worker(ml_paths, game_params, quiet, concurrent_matches=1):
+    if quiet:
+        # Silence the prints of the game and the AIs
+        sys.stdout = open(os.devnull, "w")
+
+    # The AIs are created once per process and reset between matches.
+    # Each of the concurrent matches has its own AIs.
+    ml_play_classes = [load_ml_play_class(path) for path in ml_paths]
+    ai_sets = [{get_ai_name(i): ml_play_class(ai_name=get_ai_name(i), game_params=game_params)
+                for i, ml_play_class in enumerate(ml_play_classes)}
+               for _ in range(concurrent_matches)]
+    if concurrent_matches > 1:
+        # Batch the model predictions of the concurrent matches of each side
+        for i in range(len(ml_paths)):
+            model = getattr(ai_sets[0][get_ai_name(i)], "model", None)
+            if model is None:
+                continue
+            # Each match waits for the prediction of one row, so a batch is full
+            # once every concurrent match has submitted and need not wait for the timeout
+            service = BatchInferenceService(model, max_batch_size=concurrent_matches)
+            # Stop the service thread when the worker exits. The `atexit` handlers
+            # are not run in the worker processes, but the finalizers are.
+            Finalize(service, service.close, exitpriority=10)
+            batched_model = BatchedModel(service)
+            for ais in ai_sets:
+                ais[get_ai_name(i)].model = batched_model
+
+    _worker["game_params"] = game_params
+    _worker["free_ai_sets"] = queue.SimpleQueue()
+    for ais in ai_sets:
+        _worker["free_ai_sets"].put(ais)
+    _worker["concurrent_matches"] = concurrent_matches
+
+
+def _play_match_with_free_ais(seed):
+    ais = _worker["free_ai_sets"].get()
+    try:
+        return play_match(_worker["game_params"], ais, seed)
+    finally:
+        _worker["free_ai_sets"].put(ais)
+
+
+def _play_matches(seeds):
+    if _worker["concurrent_matches"] == 1:
+        return [_play_match_with_free_ais(seed) for seed in seeds]
+    with ThreadPoolExecutor(_worker["concurrent_matches"]) as executor:
+        return list(executor.map(_play_match_with_free_ais, seeds))
+
+
+def run_tournament(ml_paths, game_params, num_matches, processes=None, chunk_size=10, quiet=True,
+                   seed=None, concurrent_matches=1):
+    """
+    Play the matches in a process pool and yield the match results as they finish
+
+    @param ml_paths The paths of the `MLPlay` scripts of 1P and 2P
+    @param game_params The keyword arguments for `PingPongSimulation`
+    @param num_matches The number of matches to play
+    @param processes The number of worker processes. Use all the cores if it is None.
+    @param chunk_size The number of matches played by a worker per task
+    @param quiet Whether to silence the output of the game and the AIs
+    @param seed The seed of the first match. The i-th match uses `seed + i`.
+           Use random seeds if it is None.
+    @param concurrent_matches The number of matches played concurrently in threads by
+           a worker, whose model predictions are batched by `BatchInferenceService`.
+           The matches are only reproducible from the seed if it is 1, because the AIs
+           share the global `random`.
+    """
+    seeds = [None if seed is None else seed + i for i in range(num_matches)]
+    with ProcessPoolExecutor(processes, initializer=_init_worker,
+                             initargs=(ml_paths, game_params, quiet, concurrent_matches)) as executor:
+        futures = [executor.submit(_play_matches, seeds[start:start + chunk_size])
+                   for start in range(0, num_matches, chunk_size)]
+        for future in as_completed(futures):
+            yield from future.result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play headless pingpong matches between two MLPlay scripts.")
+    parser.add_argument("--ml_1P", type=str, required=True, help="The MLPlay script of 1P.")
+    parser.add_argument("--ml_2P", type=str, required=True, help="The MLPlay script of 2P.")
+    parser.add_argument("--difficulty", type=str, default="NORMAL", choices=["EASY", "NORMAL", "HARD"])
+    parser.add_argument("--game_over_score", type=int, default=3)
+    parser.add_argument("--init_vel", type=int, default=7)
+    parser.add_argument("--num_matches", type=int, default=100)
+    parser.add_argument("--processes", type=int, default=None,
+                        help="The number of worker processes. [default: the number of cores]")
+    parser.add_argument("--chunk_size", type=int, default=10,
+                        help="The number of matches played by a worker per task.")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="The seed of the first match. The i-th match uses seed + i.")
+    parser.add_argument("--concurrent_matches", type=int, default=1,
+                        help="The number of matches played concurrently by a worker with batched "
+                             "model predictions. The seeded matches are only reproducible if it is 1.")
+    parser.add_argument("--output", type=str, default=None,
+                        help="Write the summary and the match results to this JSON file.")
+    parser.add_argument("--verbose", action="store_true", help="Show the output of the game and the AIs.")
+    args = parser.parse_args()
+
+    game_params = {
+        "difficulty": args.difficulty,
+        "game_over_score": args.game_over_score,
+        "init_vel": args.init_vel,
+    }
+    stats = TournamentStats()
+    match_results = []
+    start_time = time.perf_counter()
+    for match_result in run_tournament((args.ml_1P, args.ml_2P), game_params, args.num_matches,
+                                       args.processes, args.chunk_size, quiet=not args.verbose,
+                                       seed=args.seed, concurrent_matches=args.concurrent_matches):
+        stats.add(match_result)
+        match_results.append(match_result)
+        if stats.num_matches % args.chunk_size == 0 or stats.num_matches == args.num_matches:
+            summary = stats.summary()
+            print("[{}/{}] 1P: {:.3f}, 2P: {:.3f}, draw: {:.3f}, mean frame_used: {:.1f}".format(
+                stats.num_matches, args.num_matches, summary["win_rate"]["1P"],
+                summary["win_rate"]["2P"], summary["win_rate"]["DRAW"], summary["mean_frame_used"]),
+                flush=True)
+
+    summary = stats.summary()
+    summary["elapsed_time"] = time.perf_counter() - start_time
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"game_params": game_params, "seed": args.seed, "summary": summary, "matches": match_results}, f)
+
+
+if __name__ == '__main__':
+    main()